@@ -1,6 +1,12 @@
 /** @type {import('next').NextConfig} */
 const nextConfig = {
   output: 'standalone',
+  experimental: {
+    // Shards lus via fs par src/lib/pages.ts : à embarquer dans le build standalone
+    outputFileTracingIncludes: {
+      '/**': ['./data/index/**/*'],
+    },
+  },
 };
 
 module.exports = nextConfig;
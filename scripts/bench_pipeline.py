@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Benchmarks du pipeline de pages — chaque phase chronométrée, avec pic mémoire.
+
+Taxonomies synthétiques : les règles de taxonomy.RULES sont croisées avec une
+dimension « lot » de taille N (×1 ≈ 6k pages, ×10 ≈ 60k, ×100 ≈ 600k).
+L'enrichissement tourne contre le stub Haloscan local, les descriptions
+contre le backend stub de content.py (latence et taux d'erreur réglables) :
+ni réseau, ni quota.
+
+Tout s'exécute dans un répertoire temporaire (POUBELLES_OUTPUT_DIR) ; les
+résultats sont ajoutés à un fichier JSONL et comparés au run précédent.
+
+Usage :
+  python3 bench_pipeline.py                       # ×1, ×10, ×100
+  python3 bench_pipeline.py --scales 1,10 --latency 0.05 --error-rate 0.02
+  python3 bench_pipeline.py --scales 100 --jobs 8         # génération sur 8 process
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+import contextlib
+from pathlib import Path
+from datetime import datetime
+
+BASE_DIR = Path(__file__).parent.parent
+RESULTS_FILE = BASE_DIR / "output" / "bench_results.jsonl"
+
+# Le pipeline écrit ses artefacts dans un répertoire jetable
+os.environ["POUBELLES_OUTPUT_DIR"] = tempfile.mkdtemp(prefix="bench-poubelles-")
+
+import haloscan_client
+import haloscan_stub
+import generate_pages as g
+from content import StubBackend
+from page_store import PageStore
+from taxonomy import RULES, Rule, Page, Dimension
+
+
+# ─── Taxonomie synthétique ────────────────────────────────────────────────────
+
+def _suffixed(rule):
+    """Copie de la règle (et de ses enfants) dont les slugs/titres portent le lot."""
+    return Rule(rule.name, rule.category, rule.dims,
+                [Page(t.slug + "-{lot}", t.title + " {lot.label}", t.priority, t.category) for t in rule.pages],
+                rule.where, [_suffixed(c) for c in rule.children], rule.label)
+
+def scaled_rules(factor):
+    """RULES × `factor` lots ; ×1 renvoie la taxonomie réelle."""
+    if factor <= 1:
+        return RULES
+    lot = Dimension("lot", {f"l{i}": f"lot {i}" for i in range(factor)})
+    return [Rule(r.name, r.category, [lot], children=[_suffixed(r)], label=r.label) for r in RULES]
+
+
+# ─── Mesure ───────────────────────────────────────────────────────────────────
+
+def _reset_peak():
+    """Remet à zéro le pic RSS du process (Linux) ; sans effet ailleurs."""
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+        return True
+    except OSError:
+        return False
+
+def _peak_mb():
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def measure(name, fn, *args, **kwargs):
+    """Exécute une phase (sortie du pipeline masquée) ; renvoie (résultat, mesure)."""
+    _reset_peak()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn(*args, **kwargs)
+    return result, {"phase": name, "seconds": round(time.perf_counter() - t0, 4),
+                    "peak_mb": round(_peak_mb(), 1)}
+
+
+# ─── Scénario ─────────────────────────────────────────────────────────────────
+
+def bench_scale(factor, enrich_limit, workers, rps, batch_size=1, jobs=1, latency=0.0, error_rate=0.0):
+    rules = scaled_rules(factor)
+    results = []
+
+    def run(name, fn, *args, **kwargs):
+        result, m = measure(name, fn, *args, **kwargs)
+        results.append(m)
+        return result
+
+    for path in (g.PAGES_FILE, g.JOURNAL_FILE, g.CACHE_FILE, g.CONTENT_CACHE_FILE):
+        if path.exists():
+            path.unlink()
+
+    pages = run("generate_systematic", g.generate_systematic, PageStore(), rules, jobs=jobs)
+    run("save_pages", g.save_pages, pages)
+    pages = run("load_pages", g.load_pages)
+    run("export_csv", g.export_csv, pages)
+    run("export_indexes", g.export_indexes, pages)
+    related = run("export_related", g.export_related, pages)
+    run("export_fragments", g.export_fragments, pages, related, jobs=jobs)
+    run("print_stats", g.print_stats, pages)
+    run("enrich_haloscan", g.enrich_haloscan, pages, limit=enrich_limit, workers=workers, rps=rps,
+        batch_size=batch_size)
+    run("enrich_content", g.enrich_content, pages, StubBackend(latency=latency, error_rate=error_rate),
+        limit=enrich_limit, workers=workers)
+
+    for m in results:
+        m["pages"] = len(pages)
+        m["scale"] = factor
+    return results
+
+
+def git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def previous_run(path):
+    """Dernière mesure connue par (scale, phase)."""
+    last = {}
+    if path.exists():
+        for line in path.read_text().splitlines():
+            try:
+                r = json.loads(line)
+            except ValueError:
+                continue
+            last[(r["scale"], r["phase"])] = r
+    return last
+
+def print_report(results, previous):
+    print(f"\n{'phase':22s} {'pages':>9s} {'secondes':>10s} {'Δ':>8s} {'pic Mo':>8s}")
+    for r in results:
+        prev = previous.get((r["scale"], r["phase"]))
+        delta = f"{(r['seconds'] / prev['seconds'] - 1):+.0%}" if prev and prev["seconds"] else ""
+        print(f"{r['phase']:22s} {r['pages']:9d} {r['seconds']:10.3f} {delta:>8s} {r['peak_mb']:8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", default="1,10,100", help="Facteurs de taille (×1 ≈ 6k pages)")
+    parser.add_argument("--enrich-limit", type=int, default=500, help="Requêtes Haloscan (et descriptions) par scénario")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--rps", type=float, default=1000.0)
+    parser.add_argument("--batch-size", type=int, default=1, help="Keywords par requête (bulk si > 1)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latence du stub (secondes)")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Taux d'erreur du stub (0-1)")
+    parser.add_argument("--jobs", type=int, default=1, help="Process de génération (--jobs du générateur)")
+    parser.add_argument("--out", type=Path, default=RESULTS_FILE, help="Fichier JSONL des résultats")
+    args = parser.parse_args()
+
+    stub = haloscan_stub.serve(latency=args.latency, error_rate=args.error_rate)
+    haloscan_client.API_URL = "http://%s:%d" % stub.server_address
+    if not _reset_peak():
+        print("⚠ pic mémoire cumulé (clear_refs indisponible) : seule la hausse est significative",
+              file=sys.stderr)
+
+    run_meta = {"run_at": datetime.now().isoformat(timespec="seconds"), "git": git_rev(),
+                "python": sys.version.split()[0], "latency": args.latency, "error_rate": args.error_rate,
+                "batch_size": args.batch_size, "jobs": args.jobs}
+    previous = previous_run(args.out)
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+
+    for factor in (int(s) for s in args.scales.split(",")):
+        print(f"\n=== ×{factor} ===", flush=True)
+        results = bench_scale(factor, args.enrich_limit, args.workers, args.rps, args.batch_size, args.jobs,
+                              args.latency, args.error_rate)
+        print_report(results, previous)
+        with open(args.out, "a", encoding="utf-8") as f:
+            for r in results:
+                f.write(json.dumps({**run_meta, **r}) + "\n")
+
+    stub.shutdown()
+    print(f"\nRésultats ajoutés à {args.out}")
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Génération des descriptions de pages par un modèle de langage (roadmap,
+phase 4).
+
+Le prompt d'une page est construit à partir de son titre, de sa catégorie et
+de ses facettes (libellés de la taxonomie). Les prompts partent par lots vers
+un backend interchangeable :
+
+  stub     déterministe, en process, sans réseau (tests et benchmarks)
+  openai   API chat completions compatible OpenAI (CONTENT_API_URL,
+           CONTENT_API_KEY, CONTENT_MODEL) ; un lot = une requête, réponse JSON
+  module:Classe   tout autre backend importable (generate(requests) → textes)
+
+Chaque texte est mis en cache (SQLite) sous l'empreinte du prompt — modèle
+et consigne système compris : relancer la phase ne coûte aucun appel pour
+les pages déjà traitées, et changer le prompt ou le modèle invalide le cache
+de lui-même.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import importlib
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from haloscan_client import ConnectionPool
+
+API_URL = os.environ.get("CONTENT_API_URL", "https://api.openai.com")
+API_KEY = os.environ.get("CONTENT_API_KEY") or os.environ.get("OPENAI_API_KEY", "")
+MODEL   = os.environ.get("CONTENT_MODEL", "gpt-4o")
+CHAT_PATH = "/v1/chat/completions"
+
+SYSTEM = (
+    "Tu es rédacteur SEO pour un guide d'achat en ligne de poubelles, "
+    "cache-poubelles et accessoires de tri. Pour chaque page, écris sa description : "
+    "une ou deux phrases en français, 140 à 160 caractères, naturelles, sans guillemets "
+    "ni emoji, qui reprennent le sujet de la page et donnent envie de la lire."
+)
+
+
+class ContentError(Exception):
+    """Appel au backend en échec ou réponse inexploitable ; `kind` la classe
+    pour les métriques (comme HaloscanError)."""
+
+    def __init__(self, message, kind="api"):
+        super().__init__(message)
+        self.kind = kind
+
+
+@dataclass(frozen=True)
+class ContentRequest:
+    slug: str
+    title: str
+    prompt: str
+    key: str      # empreinte du prompt : clé du cache
+
+
+# ─── Prompts ──────────────────────────────────────────────────────────────────
+
+def facet_labels(rules):
+    """(dimension, clé) → libellé, sur toutes les règles et leurs enfants."""
+    labels = {}
+    stack = list(rules)
+    while stack:
+        rule = stack.pop()
+        for dim in rule.dims:
+            for f in dim.facets:
+                labels.setdefault((dim.name, f.key), f.label)
+        stack.extend(rule.children)
+    return labels
+
+def build_prompt(page, labels):
+    lines = [f"Page : {page['title']}", f"Catégorie : {page['category']}"]
+    facets = [f"{dim} = {labels.get((dim, key), key)}" for dim, key in page["facets"].items()]
+    if facets:
+        lines.append("Caractéristiques : " + " ; ".join(facets))
+    return "\n".join(lines)
+
+def prompt_key(model, prompt):
+    return hashlib.sha256(f"{model}\x1f{SYSTEM}\x1f{prompt}".encode("utf-8")).hexdigest()
+
+def make_request(slug, page, labels, model):
+    prompt = build_prompt(page, labels)
+    return ContentRequest(slug, page["title"], prompt, prompt_key(model, prompt))
+
+
+# ─── Cache ────────────────────────────────────────────────────────────────────
+
+class ContentCache:
+    """Cache empreinte du prompt → texte généré (sans expiration : le prompt
+    fixe le texte)."""
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(path), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS content (
+                key        TEXT PRIMARY KEY,
+                model      TEXT NOT NULL,
+                text       TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )""")
+        self.db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            row = self.db.execute("SELECT text FROM content WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    def put_many(self, model, items):
+        """Mémorise [(clé, texte)] en une transaction."""
+        now = time.time()
+        with self.lock:
+            self.db.executemany("INSERT OR REPLACE INTO content VALUES (?, ?, ?, ?)",
+                                [(key, model, text, now) for key, text in items])
+            self.db.commit()
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self):
+        return f"{self.hits} hits, {self.misses} miss ({self.hit_rate():.0%})"
+
+    def close(self):
+        self.db.close()
+
+
+# ─── Backends ─────────────────────────────────────────────────────────────────
+
+STUB_PHRASES = (
+    "comparatif des modèles, critères de choix et conseils d'entretien.",
+    "notre sélection, les prix constatés et les points à vérifier avant d'acheter.",
+    "guide d'achat complet : dimensions, matériaux et meilleures références.",
+    "avis, mesures et astuces pour bien choisir selon votre usage.",
+)
+
+class StubBackend:
+    """Backend local déterministe : le texte ne dépend que de l'empreinte du
+    prompt, deux runs donnent le même corpus. `latency` (secondes par lot) et
+    `error_rate` (lots en échec, choisis par empreinte) servent aux benchmarks."""
+
+    def __init__(self, model="stub-1", latency=0.0, error_rate=0.0):
+        self.model = model
+        self.latency = latency
+        self.error_rate = error_rate
+
+    def generate(self, requests):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and int(requests[0].key[:8], 16) / 0xFFFFFFFF < self.error_rate:
+            raise ContentError("erreur simulée par le stub", kind="stub")
+        return [f"{r.title} : {STUB_PHRASES[int(r.key[:8], 16) % len(STUB_PHRASES)]}" for r in requests]
+
+    def close(self):
+        pass
+
+
+class OpenAIBackend:
+    """Chat completions compatible OpenAI. Un lot = une requête : les prompts
+    sont numérotés et la réponse attendue est {"descriptions": [...]} dans
+    l'ordre du lot."""
+
+    def __init__(self, model=MODEL, base_url=None, api_key=API_KEY, pool_size=8, timeout=120):
+        if not api_key:
+            raise ContentError("clé d'API absente (CONTENT_API_KEY ou OPENAI_API_KEY)", kind="config")
+        self.model = model
+        self.pool = ConnectionPool(base_url or API_URL, size=pool_size, timeout=timeout)
+        self.headers = {"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"}
+
+    def generate(self, requests):
+        pages = "\n\n".join(f"[{i}]\n{r.prompt}" for i, r in enumerate(requests, 1))
+        body = json.dumps({
+            "model": self.model,
+            "response_format": {"type": "json_object"},
+            "messages": [
+                {"role": "system", "content": SYSTEM},
+                {"role": "user", "content": f"{pages}\n\nRéponds en JSON : "
+                 f'{{"descriptions": [...]}}, {len(requests)} descriptions dans l\'ordre des pages.'},
+            ],
+        }).encode("utf-8")
+        status, raw = self.pool.request("POST", CHAT_PATH, body, self.headers)
+        if status != 200:
+            raise ContentError(f"HTTP {status} sur {CHAT_PATH}", kind=f"http_{status}")
+        try:
+            texts = json.loads(json.loads(raw)["choices"][0]["message"]["content"])["descriptions"]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise ContentError(f"réponse illisible : {e}", kind="invalid_json") from e
+        if len(texts) != len(requests) or not all(isinstance(t, str) and t.strip() for t in texts):
+            raise ContentError(f"{len(texts)} descriptions pour {len(requests)} pages", kind="count_mismatch")
+        return [t.strip() for t in texts]
+
+    def close(self):
+        self.pool.close()
+
+
+BACKENDS = {"stub": StubBackend, "openai": OpenAIBackend}
+
+def make_backend(name, **options):
+    """Backend par nom (BACKENDS) ou chemin « module:Classe » ; ContentError
+    (kind "config") si le backend est introuvable ou mal configuré."""
+    if ":" in name:
+        module, cls = name.split(":", 1)
+        try:
+            factory = getattr(importlib.import_module(module), cls)
+        except (ImportError, AttributeError) as e:
+            raise ContentError(f"backend introuvable : {name} ({e})", kind="config") from e
+    elif name in BACKENDS:
+        factory = BACKENDS[name]
+    else:
+        raise ContentError(f"backend inconnu : {name} ({', '.join(BACKENDS)}, ou module:Classe)", kind="config")
+    return factory(**options)
+
+
+# ─── Lots ─────────────────────────────────────────────────────────────────────
+
+def run_batches(backend, requests, batch_size=20, workers=4, observe=None):
+    """Envoie `requests` par lots de `batch_size`, au plus `workers` lots en vol.
+    Rend (lot, textes | exception) au fil des réponses ; `observe(secondes)`
+    reçoit la durée de chaque appel."""
+
+    def call(batch):
+        t0 = time.perf_counter()
+        try:
+            texts = backend.generate(batch)
+        finally:
+            if observe:
+                observe(time.perf_counter() - t0)
+        if len(texts) != len(batch):
+            raise ContentError(f"{len(texts)} textes pour {len(batch)} prompts", kind="count_mismatch")
+        return texts
+
+    step = max(1, batch_size)
+    batches = [requests[i:i + step] for i in range(0, len(requests), step)]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(call, batch): batch for batch in batches}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
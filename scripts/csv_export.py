@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Export CSV du corpus en flux, à mémoire bornée.
+
+Schéma (stable, identique à data/pages.csv) — une ligne d'en-tête puis une
+ligne par page :
+
+  slug             identifiant URL de la page
+  category         catégorie (cluster)
+  title            titre
+  description      description (vide si non rédigée)
+  priority         top / high / medium / low
+  haloscan_volume  volume mensuel ; vide = pas encore enrichi, NA = inconnu de Haloscan
+  haloscan_kd      allintitle (même convention)
+  haloscan_cpc     CPC en euros (même convention)
+
+Les lignes sont triées par (category, title), à égalité dans l'ordre du
+corpus. Le tri est externe : les pages sont lues par paquets de `chunk_size`,
+chaque paquet trié est écrit dans un fichier temporaire, puis les paquets
+sont fusionnés (heapq.merge). La mémoire consommée par l'export ne dépend
+donc que de `chunk_size`, pas de la taille du corpus.
+"""
+
+import io
+import os
+import csv
+import gzip
+import heapq
+import tempfile
+from itertools import islice
+from contextlib import contextmanager
+from operator import itemgetter
+
+COLUMNS = ("slug", "category", "title", "description", "priority",
+           "haloscan_volume", "haloscan_kd", "haloscan_cpc")
+CHUNK_SIZE = 100_000
+
+_sort_key = itemgetter(1, 2)   # (category, title)
+
+
+def cell(value):
+    """None → vide ; le reste tel quel (NA, nombres, texte)."""
+    return "" if value is None else value
+
+
+def page_rows(pages):
+    """Lignes du schéma COLUMNS, dans l'ordre du corpus."""
+    for p in pages.values():
+        yield tuple(cell(p[c]) for c in COLUMNS)
+
+
+def _sorted_runs(rows, chunk_size):
+    """Découpe `rows` en paquets triés, chacun dans un fichier temporaire."""
+    runs = []
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return runs
+        chunk.sort(key=_sort_key)
+        run = tempfile.TemporaryFile("w+", newline="", encoding="utf-8")
+        csv.writer(run).writerows(chunk)
+        run.seek(0)
+        runs.append(run)
+
+
+def external_sort(rows, chunk_size=CHUNK_SIZE):
+    """Itère `rows` triées par (category, title) ; tri stable, mémoire ~ chunk_size."""
+    runs = _sorted_runs(iter(rows), chunk_size)
+    try:
+        if len(runs) == 1:
+            # Un seul paquet : inutile de fusionner
+            yield from csv.reader(runs[0])
+        else:
+            yield from heapq.merge(*(csv.reader(r) for r in runs), key=_sort_key)
+    finally:
+        for r in runs:
+            r.close()
+
+
+@contextmanager
+def open_output(path, compress):
+    """Ouvre `path` en écriture texte, compressé gzip si demandé. L'en-tête gzip
+    ne porte ni nom ni date : même corpus → même fichier, octet pour octet."""
+    if not compress:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            yield f
+        return
+    with open(path, "wb") as raw, gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as gz, \
+            io.TextIOWrapper(gz, encoding="utf-8", newline="") as f:
+        yield f
+
+
+def write_csv(pages, path, compress=None, chunk_size=CHUNK_SIZE):
+    """Écrit le corpus trié dans `path` (atomique : fichier temporaire puis rename),
+    compressé si `compress` ou si le nom finit par .gz. Renvoie le nombre de lignes."""
+    if compress is None:
+        compress = path.suffix == ".gz"
+    tmp = path.with_name(path.name + ".tmp")
+    n = 0
+    with open_output(tmp, compress) as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for row in external_sort(page_rows(pages), chunk_size):
+            writer.writerow(row)
+            n += 1
+    os.replace(tmp, path)
+    return n
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Fragments HTML pré-rendus des pages, pour le build Next.js.
+
+Pour chaque page, le générateur rend ce que [slug]/page.tsx calculait à
+chaque build — en-tête (titre, description, tags) et liste des pages liées —
+dans un fichier JSON :
+
+  {"slug", "title", "description", "header": "<header…>", "related": "<section…>"}
+
+Le nom du fichier est l'empreinte des entrées du rendu (champs affichés,
+titres des pages liées, RENDER_VERSION) :
+
+  fragments/ab/ab12….json    fragment, adressé par son contenu
+  fragments/index.json       slug → empreinte
+
+Une page dont les entrées n'ont pas changé garde son fichier : seuls les
+fragments nouveaux sont rendus, sur un pool de process ; les fichiers que
+plus aucune page ne référence sont supprimés. Le site n'a plus qu'à lire
+index.json et assembler les fragments.
+"""
+
+import os
+import json
+import multiprocessing
+from html import escape
+from hashlib import blake2b
+
+RENDER_VERSION = 2    # à incrémenter quand le gabarit change : tout est re-rendu
+INDEX_NAME = "index.json"
+CHUNK = 256           # fragments par tâche du pool
+
+
+def render_inputs(page, related):
+    """Tuple des seules données affichées ; `related` : [(slug, titre)]."""
+    return (page["slug"], page["category"], page["title"], page["description"], page["priority"],
+            page["haloscan_volume"], page["haloscan_kd"], tuple(related))
+
+def input_digest(inputs):
+    blob = json.dumps([RENDER_VERSION, inputs], ensure_ascii=False)
+    return blake2b(blob.encode("utf-8"), digest_size=16).hexdigest()
+
+def fragment_path(out_dir, digest):
+    return os.path.join(out_dir, digest[:2], digest + ".json")
+
+
+# ─── Rendu ────────────────────────────────────────────────────────────────────
+
+_FR = str.maketrans({",": " ", ".": ","})
+
+def _is_number(value):
+    """typeof value === 'number' côté TSX : entier ou flottant, pas booléen."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _plain(value):
+    """Nombre tel que JS l'affiche : 12.0 → 12."""
+    return int(value) if isinstance(value, float) and value.is_integer() else value
+
+def _count(value):
+    """Nombre à la française (toLocaleString('fr-FR') : espace fine insécable,
+    virgule décimale, 3 décimales au plus)."""
+    value = _plain(value)
+    text = f"{value:,}" if isinstance(value, int) else f"{value:,.3f}".rstrip("0").rstrip(".")
+    return text.translate(_FR)
+
+def render(inputs):
+    """Fragment d'une page : même balisage que [slug]/page.tsx."""
+    slug, category, title, description, priority, volume, kd, related = inputs
+    tags = [f'<span class="tag">{escape(category)}</span>',
+            f'<span class="tag">priorite : {escape(priority)}</span>']
+    if _is_number(volume):
+        tags.append(f'<span class="tag">{_count(volume)} rech./mois</span>')
+    if _is_number(kd):
+        tags.append(f'<span class="tag">KD : {_plain(kd)}</span>')
+    header = f'<header class="article-header"><h1>{escape(title)}</h1>'
+    if description:
+        header += f'<p style="color:var(--gray-600)">{escape(description)}</p>'
+    header += f'<div class="article-tags" style="margin-top:0.75rem">{"".join(tags)}</div></header>'
+    links = "".join(f'<li><a href="/{escape(s)}">{escape(t)}</a></li>' for s, t in related)
+    section = (f'<section class="related-section"><h2>Pages similaires</h2>'
+               f'<ul class="page-list">{links}</ul></section>') if related else ""
+    return {"slug": slug, "title": title, "description": description, "header": header, "related": section}
+
+def _render_chunk(task):
+    """Tâche du pool : rend et écrit une tranche de fragments [(empreinte, entrées)]."""
+    out_dir, chunk = task
+    for digest, inputs in chunk:
+        path = fragment_path(out_dir, digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(render(inputs), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    return len(chunk)
+
+
+# ─── Écriture ─────────────────────────────────────────────────────────────────
+
+def write_fragments(inputs_by_slug, out_dir, jobs=1):
+    """Rend les fragments absents de `out_dir` (slug → entrées de render_inputs),
+    réécrit l'index et supprime les fragments orphelins. Renvoie
+    {pages, rendered, kept, removed}."""
+    out_dir = str(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    index, todo = {}, {}
+    for slug, inputs in inputs_by_slug.items():
+        digest = index[slug] = input_digest(inputs)
+        if digest not in todo and not os.path.exists(fragment_path(out_dir, digest)):
+            todo[digest] = inputs
+
+    items = list(todo.items())
+    tasks = [(out_dir, items[i:i + CHUNK]) for i in range(0, len(items), CHUNK)]
+    if jobs > 1 and len(tasks) > 1 and "fork" in multiprocessing.get_all_start_methods():
+        with multiprocessing.get_context("fork").Pool(jobs) as pool:
+            rendered = sum(pool.imap_unordered(_render_chunk, tasks))
+    else:
+        rendered = sum(map(_render_chunk, tasks))
+
+    index_path = os.path.join(out_dir, INDEX_NAME)
+    tmp = index_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, index_path)
+
+    live, removed = set(index.values()), 0
+    for sub in os.scandir(out_dir):
+        if not sub.is_dir():
+            continue
+        for entry in os.scandir(sub.path):
+            if entry.name.endswith(".json") and entry.name[:-5] not in live:
+                os.unlink(entry.path)
+                removed += 1
+    return {"pages": len(index), "rendered": rendered, "kept": len(index) - rendered, "removed": removed}
@@ -7,668 +7,1132 @@ Phases :
   1. Génération systématique de toutes les combinaisons
   2. Enrichissement Haloscan (volumes, KD, CPC)
   3. Expansion créative (comparatifs, guides, accessoires)
+  4. Descriptions par LLM (content.py : backend OpenAI, ou stub local)
 
 Usage :
   python3 poubelles_pages.py --phase all
   python3 poubelles_pages.py --phase systematic
+  python3 poubelles_pages.py --phase systematic --jobs 8   # règles réparties sur 8 process
+  python3 poubelles_pages.py --phase plan          # pages par règle, sans générer
   python3 poubelles_pages.py --phase haloscan
-  python3 poubelles_pages.py --phase creative
+  python3 poubelles_pages.py --phase haloscan --workers 8 --rps 5
+  python3 poubelles_pages.py --phase haloscan --batch-size 50   # endpoint bulk
+  python3 poubelles_pages.py --phase cluster       # rapport de quasi-doublons
+  python3 poubelles_pages.py --phase score         # priorités relevées sur les volumes observés
+  python3 poubelles_pages.py --phase render --jobs 8   # fragments HTML pré-rendus (aussi fait par export)
+  python3 poubelles_pages.py --phase sitemap       # sitemaps gzip + index (aussi fait par export)
+  python3 poubelles_pages.py --phase daemon --workers 4 --daily-quota 3000
+  python3 poubelles_pages.py --phase content --content-backend stub   # descriptions, backend local
+  python3 poubelles_pages.py --phase content --content-limit 500 --content-batch 20 --content-workers 4
+  python3 poubelles_pages.py --phase products --products-workers 8 --products-rps 5
   python3 poubelles_pages.py --stats
+  python3 poubelles_pages.py --status        # résumé (status.json), sans charger le corpus
+  python3 poubelles_pages.py --select 'category~cache-poubelle*' 'priority>=high'   # → index/deploy.json
+  python3 poubelles_pages.py --retry-dead    # remet les keywords dead-letter dans la file du démon
 """
 
-import json
-import csv
 import sys
+
+if __name__ == "__main__" and "--status" in sys.argv[1:]:
+    # Chemin court : status.json seul, avant d'importer la taxonomie et le reste
+    from status import main as status_main
+    sys.exit(status_main([a for a in sys.argv[1:] if a != "--status"]))
+
+if __name__ == "__main__" and "--select" in sys.argv[1:]:
+    # Idem : filtres évalués sur select.idx, sans charger le corpus
+    from selection import main as select_main
+    sys.exit(select_main([a for a in sys.argv[1:] if a != "--select"]))
+
+import json
 import os
 import time
 import argparse
+import math
 import itertools
-import subprocess
+import socket
+import signal
+import fcntl
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+from haloscan_client import HaloscanClient, KeywordMetrics, error_kind
+from keyword_cache import KeywordCache, DAY, normalize_keyword
+from taxonomy import RULES, plan, make_slug
+from page_store import PageStore
+from csv_export import write_csv
+from scoring import PRIORITY_RANK, score_pages, enrichment_queue, ranked_slugs, rescore_priorities
+from work_queue import WorkQueue, DEAD, read_counts
+from manifest import Manifest, rule_fingerprint, page_hashes, subtree_names, changeset, merge_changes
+from clustering import cluster_pages, cluster_report
+from shards import ShardPool, rule_records
+from telemetry import Logger, Metrics
+from sitemap import SITE_URL, MAX_URLS, url_entries, write_sitemaps
+from status import STATUS_FILE, PRIORITIES, read_status, write_status
+from content import ContentCache, ContentError, facet_labels, make_request, make_backend, run_batches
+from products import API_URL as PRODUCTS_API_URL, ProductClient, ProductStore, query_groups
+from fragments import render_inputs, write_fragments
+from page_file import PAGE_FILE_DIR, write_page_file
+from selection import INDEX_FILE as SELECT_INDEX_FILE, write_index as write_select_index
 
 # ─── Paths ────────────────────────────────────────────────────────────────────
 BASE_DIR   = Path(__file__).parent.parent
-OUTPUT_DIR = BASE_DIR / "output" / "poubelles"
+OUTPUT_DIR = Path(os.environ.get("POUBELLES_OUTPUT_DIR", BASE_DIR / "output" / "poubelles"))
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 PAGES_FILE   = OUTPUT_DIR / "pages.json"
-HALOSCAN_FILE = OUTPUT_DIR / "haloscan_data.json"
-LOG_FILE     = OUTPUT_DIR / "progress.log"
-HALOSCAN_SCRIPT = BASE_DIR / "scripts" / "haloscan.py"
-PYTHON_BIN   = "/home/ubuntu/.venv/bin/python3"
-
-def log(msg):
-    ts = datetime.now().strftime("%H:%M:%S")
-    line = f"[{ts}] {msg}"
-    print(line, flush=True)
-    with open(LOG_FILE, "a") as f:
-        f.write(line + "\n")
+CACHE_FILE   = OUTPUT_DIR / "haloscan_cache.sqlite"
+JOURNAL_FILE = OUTPUT_DIR / "pages.journal.jsonl"
+COLLISIONS_FILE = OUTPUT_DIR / "collisions.json"
+MANIFEST_FILE = OUTPUT_DIR / "manifest.json"
+CHANGESET_FILE = OUTPUT_DIR / "changeset.json"
+CLUSTERS_FILE = OUTPUT_DIR / "clusters.json"
+INDEX_DIR    = OUTPUT_DIR / "index"
+FRAGMENTS_DIR = INDEX_DIR / "fragments"
+SITEMAP_DIR  = OUTPUT_DIR / "sitemap"            # à publier à la racine du site
+SITEMAP_STATE = OUTPUT_DIR / "sitemap_state.json"
+QUEUE_FILE   = OUTPUT_DIR / "haloscan_queue.sqlite"
+CONTENT_CACHE_FILE = OUTPUT_DIR / "content_cache.sqlite"
+PRODUCTS_FILE = OUTPUT_DIR / "products.sqlite"
+LOCK_FILE    = OUTPUT_DIR / "enrich.lock"
+COMPACT_EVERY = 1000   # enrichissements entre deux compactions du journal
+LOG_FILE     = OUTPUT_DIR / "progress.jsonl"
+# Répertoire des métriques (metrics-<phase>.prom/.json) : celui du textfile collector de node_exporter
+METRICS_DIR  = Path(os.environ.get("POUBELLES_METRICS_DIR", OUTPUT_DIR))
+
+LOGGER  = Logger(LOG_FILE)
+METRICS = Metrics("pipeline")
+
+def log(msg, **fields):
+    """Ligne console + événement JSON (bufferisé) dans progress.jsonl ; `fields`
+    s'ajoutent à l'événement."""
+    LOGGER.log(msg, **fields)
+
+# ─── Télémétrie ───────────────────────────────────────────────────────────────
+
+@contextmanager
+def phase(name):
+    """Chronomètre une phase (phase_seconds, phase_success) et marque ses logs ;
+    si elle échoue, les métriques sont écrites avant que l'exception remonte."""
+    LOGGER.context["phase"] = name
+    t0 = time.perf_counter()
+    ok = 0
+    try:
+        yield
+        ok = 1
+    finally:
+        METRICS.set("phase_seconds", round(time.perf_counter() - t0, 3), help="Durée de la phase (s)", phase=name)
+        METRICS.set("phase_success", ok, help="1 si la phase s'est terminée sans exception", phase=name)
+        LOGGER.context.pop("phase", None)
+        if not ok:
+            # Run interrompu : les métriques disent quelle phase a échoué
+            write_metrics()
+
+def record_error(error):
+    METRICS.inc("haloscan_errors_total", help="Erreurs Haloscan par type", type=error_kind(error))
+
+def record_cache(cache):
+    """Compteurs du cache Haloscan (KeywordCache) en jauges."""
+    for result, n in (("hit", cache.hits), ("negative_hit", cache.negative_hits), ("miss", cache.misses)):
+        METRICS.set("cache_lookups", n, help="Consultations du cache Haloscan par résultat", result=result)
+    METRICS.set("cache_hit_ratio", round(cache.hit_rate(), 4), help="Part des consultations servies par le cache")
+
+def write_metrics(pages=None):
+    if pages is not None:
+        METRICS.set("pages_total", len(pages), help="Pages du corpus")
+    METRICS.set("last_write_timestamp_seconds", int(time.time()), help="Dernière écriture des métriques")
+    METRICS.write(METRICS_DIR)
+    LOGGER.flush()
 
 def load_pages():
-    if PAGES_FILE.exists():
-        return json.loads(PAGES_FILE.read_text())
-    return {}
+    """Snapshot pages.json + rejeu du journal d'enrichissement."""
+    pages = PageStore(json.loads(PAGES_FILE.read_text()) if PAGES_FILE.exists() else None)
+    replayed = replay_journal(pages)
+    if replayed:
+        log(f"Journal rejoué : {replayed} enrichissements")
+    return pages
 
 def save_pages(pages):
-    PAGES_FILE.write_text(json.dumps(pages, ensure_ascii=False, indent=2))
-
-# ─── Taxonomie complète ───────────────────────────────────────────────────────
-
-# Types principaux
-TYPES_PRINCIPAUX = {
-    "poubelle": "Poubelle",
-    "corbeille": "Corbeille à papier",
-    "bac": "Bac",
-    "container": "Container",
-    "poubelle-roulante": "Poubelle roulante",
-}
-
-# Usages / fonctions
-USAGES = {
-    "cuisine":           "cuisine",
-    "salle-de-bain":     "salle de bain",
-    "bureau":            "bureau",
-    "salon":             "salon",
-    "chambre":           "chambre",
-    "garage":            "garage",
-    "jardin":            "jardin",
-    "exterieur":         "extérieur",
-    "terrasse":          "terrasse",
-    "cave":              "cave",
-    "van":               "van",
-    "camping-car":       "camping-car",
-    "camping":           "camping",
-    "bateaux":           "bateau",
-    "restaurant":        "restaurant",
-    "hotel":             "hôtel",
-    "bureau-open-space": "open space",
-    "ecole":             "école",
-    "hopital":           "hôpital",
-    "collectivites":     "collectivités",
-    "industrie":         "industrie",
-}
-
-# Usages fonctionnels (type de déchet)
-FONCTIONS = {
-    "ordures-menageres":   "ordures ménagères",
-    "tri-selectif":        "tri sélectif",
-    "recyclage-papier":    "recyclage papier",
-    "recyclage-plastique": "recyclage plastique",
-    "recyclage-verre":     "recyclage verre",
-    "compost":             "compost",
-    "biodechets":          "biodéchets",
-    "carton":              "carton",
-    "metal":               "métal",
-    "alimentaire":         "déchets alimentaires",
-    "sanitaire":           "déchets sanitaires",
-    "couches":             "couches bébé",
-    "medical":             "déchets médicaux",
-    "electronique":        "DEEE",
-}
-
-# Matériaux
-MATERIAUX = {
-    "plastique":  "plastique",
-    "inox":       "inox",
-    "acier":      "acier",
-    "bambou":     "bambou",
-    "bois":       "bois",
-    "rotin":      "rotin",
-    "osier":      "osier",
-    "metal":      "métal",
-    "aluminium":  "aluminium",
-    "cuir":       "cuir",
-    "tissu":      "tissu",
-    "silicone":   "silicone",
-    "beton":      "béton",
-    "resine":     "résine",
-    "pierre":     "pierre",
-    "chrome":     "chrome",
-    "zinc":       "zinc",
-}
-
-# Couleurs
-COULEURS = {
-    "blanc":    "blanc",
-    "noir":     "noir",
-    "gris":     "gris",
-    "beige":    "beige",
-    "marron":   "marron",
-    "rouge":    "rouge",
-    "bleu":     "bleu",
-    "vert":     "vert",
-    "rose":     "rose",
-    "jaune":    "jaune",
-    "orange":   "orange",
-    "violet":   "violet",
-    "or":       "or",
-    "cuivre":   "cuivre",
-    "argent":   "argent",
-    "turquoise":"turquoise",
-    "nude":     "nude",
-    "anthracite":"anthracite",
-    "taupe":    "taupe",
-    "emeraude": "émeraude",
-}
-
-# Volumes / tailles
-VOLUMES = {
-    "1l": "1L", "2l": "2L", "3l": "3L", "5l": "5L",
-    "7l": "7L", "8l": "8L", "10l": "10L", "12l": "12L",
-    "15l": "15L", "16l": "16L", "20l": "20L", "25l": "25L",
-    "30l": "30L", "40l": "40L", "50l": "50L", "60l": "60L",
-    "70l": "70L", "80l": "80L", "90l": "90L", "100l": "100L",
-    "120l": "120L", "140l": "140L", "180l": "180L",
-    "240l": "240L", "360l": "360L", "600l": "600L", "1100l": "1100L",
-}
-
-# Mécanismes d'ouverture
-MECANISMES = {
-    "pedale":        "à pédale",
-    "automatique":   "automatique",
-    "capteur":       "à capteur",
-    "balancier":     "à balancier",
-    "push":          "à couvercle push",
-    "couvercle":     "avec couvercle",
-    "sans-couvercle":"sans couvercle",
-    "rabattable":    "à couvercle rabattable",
-    "coulissant":    "coulissant",
-}
-
-# Nombre de compartiments
-COMPARTIMENTS = {
-    "1-bac": "1 bac", "2-bacs": "2 bacs",
-    "3-bacs": "3 bacs", "4-bacs": "4 bacs", "5-bacs": "5 bacs",
-}
-
-# Styles design
-STYLES = {
-    "design":       "design",
-    "minimaliste":  "minimaliste",
-    "scandinave":   "scandinave",
-    "industriel":   "industriel",
-    "vintage":      "vintage",
-    "retro":        "rétro",
-    "moderne":      "moderne",
-    "luxe":         "luxe",
-    "fantaisie":    "fantaisie",
-    "enfant":       "pour enfant",
-    "fun":          "fun",
-    "deco":         "décoratif",
-    "transparent":  "transparent",
-    "personnalisable":"personnalisable",
-}
-
-# Caractéristiques spéciales
-CARACTERISTIQUES = {
-    "anti-odeur":       "anti-odeur",
-    "filtre-charbon":   "filtre à charbon",
-    "etanche":          "étanche",
-    "avec-roues":       "avec roues",
-    "empilable":        "empilable",
-    "compresseur":      "avec compresseur",
-    "demontable":       "démontable",
-    "silencieux":       "silencieux",
-    "verrouillable":    "verrouillable",
-    "mural":            "mural",
-    "encastrable":      "encastrable",
-    "pliant":           "pliable",
-    "suspendu":         "suspendu",
-    "portable":         "portable",
-}
-
-# Marques (affiliation)
-MARQUES = {
-    "brabantia":    "Brabantia",
-    "simplehuman":  "simplehuman",
-    "joseph-joseph":"Joseph Joseph",
-    "ikea":         "IKEA",
-    "addis":        "Addis",
-    "curver":       "Curver",
-    "authentics":   "Authentics",
-    "wesco":        "Wesco",
-    "burak":        "Burak",
-    "rotho":        "Rotho",
-    "sulo":         "Sulo",
-    "vileda":       "Vileda",
-    "elletipi":     "Elletipi",
-    "umbra":        "Umbra",
-    "alessi":       "Alessi",
-    "magis":        "Magis",
-}
-
-# Produits connexes / cache-poubelle
-CACHE_POUBELLE_MATERIAUX = {
-    "bois":    "bois", "metal": "métal", "pvc": "PVC",
-    "resine":  "résine", "beton": "béton", "osier": "osier",
-    "rotin":   "rotin", "bambou": "bambou", "acier": "acier",
-    "grillage":"grillage", "parpaing": "parpaing",
-}
-
-CACHE_POUBELLE_NBACS = {
-    "1-bac": "1 bac", "2-bacs": "2 bacs",
-    "3-bacs": "3 bacs", "4-bacs": "4 bacs",
-}
-
-# Accessoires
-ACCESSOIRES = {
-    "sac-poubelle":           "sac poubelle",
-    "sac-compostable":        "sac compostable",
-    "sac-biodegradable":      "sac biodégradable",
-    "filtre-a-charbon":       "filtre à charbon",
-    "chariot-poubelle":       "chariot poubelle",
-    "support-poubelle":       "support poubelle",
-    "couvercle-remplacement": "couvercle de remplacement",
-    "pedal-remplacement":     "pédale de remplacement",
-    "bac-interieur":          "bac intérieur",
-    "notice-tri":             "notice de tri",
-    "autocollant-tri":        "autocollant tri sélectif",
-    "seau-compost":           "seau compost",
-    "composteur":             "composteur",
-    "vermicomposteur":        "vermicomposteur",
-    "bac-collecte":           "bac de collecte",
-}
-
-# Sacs poubelle (dimensions)
-SAC_VOLUMES = ["10l","15l","20l","25l","30l","35l","40l","45l","50l",
-               "60l","70l","80l","100l","110l","130l","150l","240l"]
+    """Compaction : snapshot complet écrit dans un fichier temporaire puis renommé
+    atomiquement — pages.json n'est jamais à moitié écrit. Le journal, désormais
+    inclus dans le snapshot, est ensuite vidé. page_file/ (pages.jsonl +
+    pages.idx, page_file.py : accès direct par slug) et select.idx (selection.py :
+    filtres de --select) suivent le même snapshot."""
+    tmp = PAGES_FILE.with_name(PAGES_FILE.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        pages.write_json(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, PAGES_FILE)
+    write_page_file(pages, PAGE_FILE_DIR)
+    write_select_index(pages, SELECT_INDEX_FILE)
+    if JOURNAL_FILE.exists():
+        JOURNAL_FILE.write_text("")
+    save_status(pages)
+
+RUN = {"phase": None, "pid": os.getpid(), "started_at": datetime.now().isoformat(timespec="seconds"),
+       "finished_at": None}
+
+def save_status(pages, finished=False):
+    """Résumé du corpus pour --status (status.py), réécrit à chaque sauvegarde
+    et en fin de run. Garde la trace du dernier run terminé."""
+    if finished:
+        RUN["finished_at"] = datetime.now().isoformat(timespec="seconds")
+    previous = read_status() or {}
+    enriched = pages.enriched_count()
+    prios = pages.counts("priority")
+    write_status({
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+        "total": len(pages),
+        "enriched": enriched,
+        "remaining": len(pages) - enriched,
+        "by_priority": {p: prios.get(p, 0) for p in PRIORITIES},
+        "by_category": dict(pages.counts("category").most_common()),
+        "queue": read_counts(QUEUE_FILE),
+        "run": dict(RUN),
+        "last_finished": dict(RUN) if finished else previous.get("last_finished"),
+    }, STATUS_FILE)
+
+# ─── Journal d'enrichissement ─────────────────────────────────────────────────
+
+class Journal:
+    """Journal JSONL en ajout seul : une ligne {"slug", "fields"} par enrichissement.
+
+    append() coûte O(1) ; checkpoint() se contente d'un flush + fsync. Le corpus
+    complet n'est réécrit qu'à la compaction (save_pages).
+    """
+
+    def __init__(self, path=None):
+        self.f = open(path or JOURNAL_FILE, "a", encoding="utf-8")
+
+    def append(self, slug, fields):
+        self.f.write(json.dumps({"slug": slug, "fields": fields}, ensure_ascii=False) + "\n")
+
+    def checkpoint(self):
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def close(self):
+        self.checkpoint()
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def replay_journal(pages, path=None):
+    """Applique le journal à `pages` ; ignore une dernière ligne tronquée par un crash."""
+    path = path or JOURNAL_FILE
+    if not path.exists():
+        return 0
+    replayed = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            if entry["slug"] in pages:
+                pages[entry["slug"]].update(entry["fields"])
+                replayed += 1
+    return replayed
 
 # ─── Générateur de pages ─────────────────────────────────────────────────────
 
-def make_slug(*parts):
-    return "-".join(p.strip().lower().replace(" ", "-").replace("'", "").replace("é","e").replace("è","e").replace("à","a").replace("ê","e").replace("â","a").replace("î","i").replace("ô","o").replace("û","u") for p in parts if p)
+class SlugIndex:
+    """slug → (catégorie, règle) : les collisions sont comptées et gardées, pas perdues.
 
-def add_page(pages, category, slug, title, description="", priority="medium"):
-    if slug not in pages:
-        pages[slug] = {
+    Une page déjà présente au démarrage (règle inconnue) n'est en collision
+    qu'avec une autre catégorie ; dans un même run, toute seconde revendication
+    d'un slug est une collision.
+    """
+
+    def __init__(self, pages=None):
+        self.owner = {slug: (p["category"], None) for slug, p in (pages or {}).items()}
+        self.collisions = []
+
+    def claim(self, slug, category, rule, title=""):
+        owner = self.owner.get(slug)
+        if owner is None or (owner[1] is None and owner[0] == category):
+            self.owner[slug] = (category, rule)
+            return True
+        self.collisions.append({
             "slug": slug,
-            "category": category,
-            "title": title,
-            "description": description,
-            "priority": priority,
-            "haloscan_volume": None,
-            "haloscan_kd": None,
-            "haloscan_cpc": None,
-        }
-
-def generate_systematic(pages):
+            "kept":    {"category": owner[0], "rule": owner[1]},
+            "dropped": {"category": category, "rule": rule, "title": title},
+        })
+        return False
+
+    def report(self):
+        from collections import Counter
+        cross = sum(1 for c in self.collisions if c["kept"]["category"] != c["dropped"]["category"])
+        pairs = Counter((c["kept"]["rule"], c["dropped"]["rule"]) for c in self.collisions)
+        return cross, pairs
+
+def add_page(pages, category, slug, title, description="", priority="medium", rule=None, index=None,
+             facets=None):
+    if index is not None and not index.claim(slug, category, rule, title):
+        return
+    if slug not in pages:
+        pages.append(slug, category, title, description, priority, facets)
+    elif facets and not pages[slug].get("facets") and pages[slug]["category"] == category:
+        pages[slug]["facets"] = facets  # corpus antérieur aux facets
+
+def add_pages(pages, records, index):
+    """add_page en lot pour la génération : records = (catégorie, slug, titre,
+    priorité, règle, facets), revendiqués un par un dans l'ordre (première page
+    gardée, collisions comptées), puis ajoutés au store d'un bloc. Renvoie le
+    nombre de slugs revendiqués."""
+    claim = index.claim
+    accepted = 0
+    new = ([], [], [], [], [])    # colonnes slug, catégorie, titre, priorité, facets
+    slugs, categories, titles, priorities, facet_col = new
+    for category, slug, title, priority, rule, facets in records:
+        if not claim(slug, category, rule, title):
+            continue
+        accepted += 1
+        # Un slug n'est accepté deux fois que s'il était déjà au corpus : `new` est sans doublon
+        if slug not in pages:
+            slugs.append(slug)
+            categories.append(category)
+            titles.append(title)
+            priorities.append(priority)
+            facet_col.append(facets)
+        elif facets and not pages[slug].get("facets") and pages[slug]["category"] == category:
+            pages[slug]["facets"] = dict(facets)  # corpus antérieur aux facets
+    pages.extend(*new)
+    return accepted
+
+RULE_PAGES = {"help": "Pages revendiquées par la règle (générées, ou reprises du manifest)"}
+
+def generate_systematic(pages, rules=RULES, previous=None, index=None, jobs=1):
+    """Déroule les règles de taxonomy.RULES dans l'ordre ; add_pages garde la première
+    page pour chaque slug.
+
+    Avec `previous` (Manifest du run précédent), une règle dont l'empreinte n'a
+    pas changé n'est pas re-déroulée : ses slugs sont revendiqués tels quels
+    depuis le manifest (reclaim_rule).
+
+    Avec `jobs` > 1, les règles à dérouler le sont sur un pool de process
+    (shards.py) ; les pages sont ajoutées dans le même ordre qu'en série."""
     log("=== PHASE 1 : Génération systématique ===")
     count_start = len(pages)
-
-    # ── 1. Pages par type + pièce/usage
-    log("  → Type × Usage")
-    for uk, uv in USAGES.items():
-        add_page(pages, "type-usage", f"poubelle-{uk}", f"Poubelle {uv}", priority="high")
-        add_page(pages, "type-usage", f"corbeille-{uk}", f"Corbeille {uv}", priority="medium")
-
-    # ── 2. Pages par volume seul
-    log("  → Volumes")
-    for vk, vv in VOLUMES.items():
-        add_page(pages, "volume", f"poubelle-{vk}", f"Poubelle {vv}", priority="high")
-        add_page(pages, "volume", f"bac-{vk}", f"Bac {vv}", priority="low")
-
-    # ── 3. Volume × Usage (ex: poubelle-50l-cuisine)
-    log("  → Volume × Usage")
-    for vk, vv in VOLUMES.items():
-        for uk, uv in USAGES.items():
-            add_page(pages, "volume-usage", f"poubelle-{vk}-{uk}", f"Poubelle {vv} {uv}", priority="high")
-
-    # ── 4. Volume × Mécanisme (ex: poubelle-30l-pedale)
-    log("  → Volume × Mécanisme")
-    for vk, vv in VOLUMES.items():
-        for mk, mv in MECANISMES.items():
-            add_page(pages, "volume-mecanisme", f"poubelle-{vk}-{mk}", f"Poubelle {vv} {mv}", priority="medium")
-
-    # ── 5. Couleur seule
-    log("  → Couleurs")
-    for ck, cv in COULEURS.items():
-        add_page(pages, "couleur", f"poubelle-{ck}", f"Poubelle {cv}", priority="medium")
-        add_page(pages, "couleur", f"corbeille-{ck}", f"Corbeille {cv}", priority="low")
-
-    # ── 6. Couleur × Usage
-    log("  → Couleur × Usage")
-    for ck, cv in COULEURS.items():
-        for uk, uv in USAGES.items():
-            add_page(pages, "couleur-usage", f"poubelle-{ck}-{uk}", f"Poubelle {cv} {uv}", priority="low")
-
-    # ── 7. Couleur × Volume
-    log("  → Couleur × Volume")
-    for ck, cv in COULEURS.items():
-        for vk, vv in VOLUMES.items():
-            add_page(pages, "couleur-volume", f"poubelle-{ck}-{vk}", f"Poubelle {cv} {vv}", priority="low")
-
-    # ── 8. Matériau seul
-    log("  → Matériaux")
-    for mk, mv in MATERIAUX.items():
-        add_page(pages, "materiau", f"poubelle-{mk}", f"Poubelle {mv}", priority="medium")
-        add_page(pages, "materiau", f"corbeille-{mk}", f"Corbeille {mv}", priority="low")
-
-    # ── 9. Matériau × Usage
-    log("  → Matériau × Usage")
-    for mk, mv in MATERIAUX.items():
-        for uk, uv in USAGES.items():
-            add_page(pages, "materiau-usage", f"poubelle-{mk}-{uk}", f"Poubelle {mv} {uv}", priority="medium")
-
-    # ── 10. Matériau × Volume
-    log("  → Matériau × Volume")
-    for mk, mv in MATERIAUX.items():
-        for vk, vv in VOLUMES.items():
-            add_page(pages, "materiau-volume", f"poubelle-{mk}-{vk}", f"Poubelle {mv} {vv}", priority="low")
-
-    # ── 11. Matériau × Couleur
-    log("  → Matériau × Couleur")
-    for mk, mv in MATERIAUX.items():
-        for ck, cv in COULEURS.items():
-            add_page(pages, "materiau-couleur", f"poubelle-{mk}-{ck}", f"Poubelle {mv} {cv}", priority="low")
-
-    # ── 12. Mécanisme seul
-    log("  → Mécanismes")
-    for mk, mv in MECANISMES.items():
-        add_page(pages, "mecanisme", f"poubelle-{mk}", f"Poubelle {mv}", priority="high")
-
-    # ── 13. Mécanisme × Usage
-    log("  → Mécanisme × Usage")
-    for mk, mv in MECANISMES.items():
-        for uk, uv in USAGES.items():
-            add_page(pages, "mecanisme-usage", f"poubelle-{mk}-{uk}", f"Poubelle {mv} {uv}", priority="medium")
-
-    # ── 14. Tri sélectif : compartiments × usage
-    log("  → Tri sélectif × Compartiments")
-    for ck, cv in COMPARTIMENTS.items():
-        add_page(pages, "tri-compartiments", f"poubelle-tri-{ck}", f"Poubelle de tri sélectif {cv}", priority="high")
-        for uk, uv in {k:v for k,v in USAGES.items() if k in ["cuisine","bureau","garage","exterieur","collectivites"]}.items():
-            add_page(pages, "tri-compartiments-usage", f"poubelle-tri-{ck}-{uk}", f"Poubelle tri sélectif {cv} {uv}", priority="high")
-
-    # ── 15. Fonctions/type de déchet
-    log("  → Fonctions × Usage")
-    for fk, fv in FONCTIONS.items():
-        add_page(pages, "fonction", f"poubelle-{fk}", f"Poubelle {fv}", priority="high")
-        for uk, uv in USAGES.items():
-            add_page(pages, "fonction-usage", f"poubelle-{fk}-{uk}", f"Poubelle {fv} {uv}", priority="medium")
-        for vk, vv in VOLUMES.items():
-            add_page(pages, "fonction-volume", f"poubelle-{fk}-{vk}", f"Poubelle {fv} {vv}", priority="medium")
-
-    # ── 16. Style/Design
-    log("  → Styles")
-    for sk, sv in STYLES.items():
-        add_page(pages, "style", f"poubelle-{sk}", f"Poubelle {sv}", priority="medium")
-        for uk, uv in USAGES.items():
-            add_page(pages, "style-usage", f"poubelle-{sk}-{uk}", f"Poubelle {sv} {uv}", priority="low")
-        for mk, mv in MATERIAUX.items():
-            add_page(pages, "style-materiau", f"poubelle-{sk}-{mk}", f"Poubelle {sv} {mv}", priority="low")
-
-    # ── 17. Caractéristiques spéciales
-    log("  → Caractéristiques")
-    for ck, cv in CARACTERISTIQUES.items():
-        add_page(pages, "caracteristique", f"poubelle-{ck}", f"Poubelle {cv}", priority="medium")
-        for uk, uv in USAGES.items():
-            add_page(pages, "caracteristique-usage", f"poubelle-{ck}-{uk}", f"Poubelle {cv} {uv}", priority="low")
-
-    # ── 18. Marques
-    log("  → Marques")
-    for brk, brv in MARQUES.items():
-        add_page(pages, "marque", f"poubelle-{brk}", f"Poubelle {brv}", priority="medium")
-        add_page(pages, "marque-avis", f"avis-{brk}", f"Avis {brv} — guide complet", priority="medium")
-        for uk, uv in {k:v for k,v in USAGES.items() if k in ["cuisine","bureau","salle-de-bain","exterieur"]}.items():
-            add_page(pages, "marque-usage", f"poubelle-{brk}-{uk}", f"Poubelle {brv} {uv}", priority="medium")
-
-    # ── 19. Cache-poubelle (sous-niche prioritaire)
-    log("  → Cache-poubelle")
-    add_page(pages, "cache-poubelle", "cache-poubelle", "Cache-poubelle", priority="top")
-    add_page(pages, "cache-poubelle", "cache-poubelle-exterieur", "Cache-poubelle extérieur", priority="top")
-    add_page(pages, "cache-poubelle", "cache-poubelle-jardin", "Cache-poubelle jardin", priority="top")
-    add_page(pages, "cache-poubelle", "abri-poubelle", "Abri poubelle", priority="top")
-    add_page(pages, "cache-poubelle", "abri-bac-roulant", "Abri bac roulant", priority="top")
-
-    for mk, mv in CACHE_POUBELLE_MATERIAUX.items():
-        add_page(pages, "cache-poubelle-materiau", f"cache-poubelle-{mk}", f"Cache-poubelle {mv}", priority="high")
-        add_page(pages, "cache-poubelle-materiau", f"cache-poubelle-exterieur-{mk}", f"Cache-poubelle extérieur {mv}", priority="high")
-        add_page(pages, "cache-poubelle-materiau", f"abri-poubelle-{mk}", f"Abri poubelle {mk}", priority="high")
-
-    for nk, nv in CACHE_POUBELLE_NBACS.items():
-        add_page(pages, "cache-poubelle-nbacs", f"cache-poubelle-{nk}", f"Cache-poubelle {nv}", priority="high")
-        add_page(pages, "cache-poubelle-nbacs", f"cache-poubelle-exterieur-{nk}", f"Cache-poubelle extérieur {nv}", priority="high")
-        add_page(pages, "cache-poubelle-nbacs", f"abri-poubelle-{nk}", f"Abri poubelle {nv}", priority="high")
-        for mk, mv in CACHE_POUBELLE_MATERIAUX.items():
-            add_page(pages, "cache-poubelle-materiau-nbacs", f"cache-poubelle-{mk}-{nk}", f"Cache-poubelle {mv} {nv}", priority="high")
-            add_page(pages, "cache-poubelle-materiau-nbacs", f"abri-poubelle-{mk}-{nk}", f"Abri poubelle {mv} {nv}", priority="medium")
-
-    # Cache-poubelle × usage
-    for uk, uv in {"exterieur":"extérieur","jardin":"jardin","terrasse":"terrasse","garage":"garage"}.items():
-        for mk, mv in CACHE_POUBELLE_MATERIAUX.items():
-            add_page(pages, "cache-poubelle-usage-materiau",
-                     f"cache-poubelle-{uk}-{mk}",
-                     f"Cache-poubelle {uv} {mv}", priority="medium")
-
-    # ── 20. Accessoires
-    log("  → Accessoires")
-    for ak, av in ACCESSOIRES.items():
-        add_page(pages, "accessoire", ak, av.capitalize(), priority="medium")
-
-    # Sacs poubelle × volume
-    log("  → Sacs × Volume")
-    for sv in SAC_VOLUMES:
-        add_page(pages, "sac-volume", f"sac-poubelle-{sv}", f"Sac poubelle {sv.upper()}", priority="medium")
-        add_page(pages, "sac-volume", f"sac-compostable-{sv}", f"Sac compostable {sv.upper()}", priority="medium")
-        add_page(pages, "sac-volume", f"sac-biodegradable-{sv}", f"Sac biodégradable {sv.upper()}", priority="low")
-
-    # ── 21. Comparatifs
-    log("  → Comparatifs")
-    comparatifs = [
-        ("comparatif-poubelle-cuisine", "Comparatif poubelles de cuisine"),
-        ("comparatif-poubelle-tri", "Comparatif poubelles de tri sélectif"),
-        ("comparatif-poubelle-automatique", "Comparatif poubelles automatiques"),
-        ("comparatif-poubelle-compost", "Comparatif poubelles à compost"),
-        ("comparatif-poubelle-inox", "Comparatif poubelles inox"),
-        ("comparatif-poubelle-bambou", "Comparatif poubelles bambou"),
-        ("comparatif-poubelle-pedale", "Comparatif poubelles à pédale"),
-        ("comparatif-cache-poubelle", "Comparatif cache-poubelle extérieur"),
-        ("comparatif-simplehuman-brabantia", "Comparatif simplehuman vs Brabantia"),
-        ("comparatif-poubelle-enfant", "Comparatif poubelles enfant"),
-        ("comparatif-composteur-interieur", "Comparatif composteurs intérieurs"),
-        ("comparatif-bac-roulant", "Comparatif bacs roulants"),
-    ]
-    for uk in USAGES:
-        comparatifs.append((f"comparatif-poubelle-{uk}", f"Comparatif poubelles {USAGES[uk]}"))
-    for vk in ["10l","20l","30l","50l","80l","120l"]:
-        comparatifs.append((f"comparatif-poubelle-{vk}", f"Comparatif poubelles {vk.upper()}"))
-    for brk in MARQUES:
-        comparatifs.append((f"meilleure-poubelle-{brk}", f"Meilleure poubelle {MARQUES[brk]}"))
-
-    for slug, title in comparatifs:
-        add_page(pages, "comparatif", slug, title, priority="high")
-
-    # ── 22. Guides informationnels
-    log("  → Guides informationnels")
-    guides = [
-        ("comment-choisir-poubelle-cuisine", "Comment choisir sa poubelle de cuisine"),
-        ("comment-choisir-poubelle-tri", "Comment choisir une poubelle de tri sélectif"),
-        ("comment-choisir-cache-poubelle", "Comment choisir un cache-poubelle"),
-        ("quelle-taille-poubelle-cuisine", "Quelle taille de poubelle pour la cuisine ?"),
-        ("quelle-taille-poubelle-salle-de-bain", "Quelle taille de poubelle pour la salle de bain ?"),
-        ("comment-recycler-plastique", "Comment recycler le plastique"),
-        ("comment-recycler-verre", "Comment recycler le verre"),
-        ("comment-recycler-papier", "Comment recycler le papier"),
-        ("comment-composter", "Comment composter chez soi"),
-        ("loi-agec-biodechets", "Loi AGEC : biodéchets obligatoires — ce qu'il faut savoir"),
-        ("guide-tri-selectif-maison", "Guide du tri sélectif à la maison"),
-        ("couleurs-bacs-poubelles-france", "Couleurs des bacs poubelles en France"),
-        ("trier-dechets-appartement", "Comment trier ses déchets en appartement"),
-        ("compost-appartement", "Faire son compost en appartement"),
-        ("poubelle-bac-roulant-difference", "Différence entre poubelle et bac roulant"),
-        ("nettoyer-poubelle", "Comment nettoyer sa poubelle"),
-        ("poubelle-anti-odeur-test", "Poubelles anti-odeur : quelles sont les meilleures ?"),
-        ("poubelle-automatique-vaut-il", "Poubelle automatique : ça vaut vraiment le coup ?"),
-        ("matiere-poubelle-guide", "Quel matériau choisir pour sa poubelle ?"),
-        ("entretien-bac-roulant", "Comment entretenir son bac roulant"),
-        ("volume-poubelle-personne", "Quel volume de poubelle selon le nombre de personnes ?"),
-        ("poubelle-cuisine-meilleure-marque", "Quelle est la meilleure marque de poubelle cuisine ?"),
-        ("poubelle-design-pas-cher", "Poubelle design pas chère : les meilleures options"),
-        ("biodechets-obligations-2024", "Biodéchets : obligations 2024 (loi AGEC)"),
-        ("fabriquer-cache-poubelle-diy", "Fabriquer un cache-poubelle soi-même"),
-        ("installer-cache-poubelle", "Comment installer un cache-poubelle extérieur"),
-        ("poubelle-professionnelle-guide", "Choisir sa poubelle professionnelle"),
-        ("poubelle-hopital-normes", "Poubelles hôpital : normes et obligations"),
-        ("poubelle-restaurant-reglementation", "Poubelles restaurant : réglementation"),
-        ("composteur-vs-vermicomposteur", "Composteur vs vermicomposteur : que choisir ?"),
-        ("bac-compost-interieur-exterieur", "Compost intérieur ou extérieur : lequel choisir ?"),
-        ("poubelle-cuisine-encastrable", "Poubelle de cuisine encastrable : guide"),
-        ("poubelle-sous-evier", "Poubelle sous évier : les meilleures"),
-        ("poubelle-mural-cuisine", "Poubelle murale pour cuisine"),
-        ("bac-roulant-120l-240l", "Bac roulant 120L ou 240L : que choisir ?"),
-        ("poubelle-noire-jaune-verte", "Poubelle noire, jaune ou verte : à quoi ça correspond ?"),
-    ]
-    for uk in USAGES:
-        guides.append((f"guide-poubelle-{uk}", f"Guide poubelle {USAGES[uk]}"))
-    for fk in FONCTIONS:
-        guides.append((f"guide-{fk}", f"Guide {FONCTIONS[fk]}"))
-
-    for slug, title in guides:
-        add_page(pages, "guide", slug, title, priority="high")
-
-    # ── 23. Questions (PAA — People Also Ask)
-    log("  → Questions PAA")
-    questions = [
-        ("quelle-poubelle-sdb", "Quelle poubelle pour la salle de bain ?"),
-        ("poubelle-sdb-taille", "Quelle taille de poubelle pour la salle de bain ?"),
-        ("poubelle-cuisine-30l-assez", "30 litres suffisent pour une poubelle cuisine ?"),
-        ("poubelle-automatique-hygienique", "La poubelle automatique est-elle plus hygiénique ?"),
-        ("bambou-poubelle-ecologique", "La poubelle en bambou est-elle vraiment écologique ?"),
-        ("inox-ou-plastique-poubelle", "Poubelle inox ou plastique : laquelle choisir ?"),
-        ("poubelle-pedale-ou-capteur", "Poubelle à pédale ou capteur : quelle différence ?"),
-        ("comment-eviter-mauvaises-odeurs", "Comment éviter les mauvaises odeurs de poubelle ?"),
-        ("poubelle-tri-cuisine-pratique", "Comment organiser le tri sélectif dans la cuisine ?"),
-        ("quelle-couleur-bac-recyclage", "Quelle couleur pour le bac de recyclage ?"),
-        ("poubelle-compost-odeur", "La poubelle à compost sent-elle mauvais ?"),
-        ("sac-poubelle-30l-dimensions", "Dimensions d'un sac poubelle 30L ?"),
-        ("cache-poubelle-exterieur-diy", "Comment faire un cache-poubelle extérieur soi-même ?"),
-        ("quelle-poubelle-van", "Quelle poubelle pour un van ?"),
-        ("poubelle-bureau-quelle-taille", "Quelle taille de poubelle pour le bureau ?"),
-        ("bac-jaune-quoi-dedans", "Que met-on dans le bac jaune ?"),
-        ("poubelle-noire-que-mettre", "Que mettre dans la poubelle noire ?"),
-        ("verre-poubelle-verte", "Le verre va-t-il dans la poubelle verte ?"),
-        ("poubelle-camping-car-quelle", "Quelle poubelle pour camping-car ?"),
-        ("poubelle-hopital-couleur", "Quelles sont les couleurs des poubelles à l'hôpital ?"),
-    ]
-    for slug, title in questions:
-        add_page(pages, "question-paa", slug, title, priority="medium")
-
-    # ── 24. Pages locales / géographiques
-    log("  → Pages locales")
-    villes = [
-        "paris","lyon","marseille","toulouse","nice","nantes","bordeaux",
-        "strasbourg","lille","rennes","reims","saint-etienne","toulon",
-        "grenoble","dijon","angers","nimes","villeurbanne","le-mans",
-        "aix-en-provence","clermont-ferrand","brest","limoges","tours",
-        "amiens","metz","besancon","perpignan","orleans","rouen",
-        "mulhouse","caen","nancy","argenteuil","montreuil","versailles"
-    ]
-    for v in villes:
-        add_page(pages, "local", f"collecte-dechets-{v}", f"Collecte des déchets à {v.replace('-',' ').title()}", priority="low")
-        add_page(pages, "local", f"jours-collecte-{v}", f"Jours de collecte des ordures à {v.replace('-',' ').title()}", priority="low")
-        add_page(pages, "local", f"bac-roulant-{v}", f"Commander un bac roulant à {v.replace('-',' ').title()}", priority="low")
-
-    # ── 25. Saisonnalité / événements
-    log("  → Saisonnalité")
-    saisonnier = [
-        ("poubelle-noel-promo", "Promo poubelle Noël"),
-        ("poubelle-soldes", "Poubelle : les meilleures offres des soldes"),
-        ("poubelle-black-friday", "Poubelle Black Friday"),
-        ("poubelle-saint-valentin", "Poubelle Saint-Valentin"),
-        ("poubelle-demenagement", "Quelle poubelle choisir pour un déménagement"),
-        ("poubelle-cuisine-renovation", "Quelle poubelle pour une cuisine rénovée"),
-        ("poubelle-jardin-ete", "Poubelle jardin été : les meilleures options"),
-        ("poubelle-pas-chere-budget", "Poubelle pas chère : les meilleures options budget"),
-        ("poubelle-haut-de-gamme", "Poubelles haut de gamme : les meilleures"),
-    ]
-    for slug, title in saisonnier:
-        add_page(pages, "saisonnalite", slug, title, priority="low")
-
-    # ── 26. Trilingual / international (si expansion)
-    log("  → Variantes BE/CH")
-    intl = [
-        ("poubelle-belgique", "Poubelle Belgique : guide complet"),
-        ("poubelle-suisse", "Poubelle Suisse : guide complet"),
-        ("sac-poubelle-officiel-belgique", "Sac poubelle officiel Belgique"),
-        ("taxe-dechets-suisse", "Taxe déchets en Suisse : ce qu'il faut savoir"),
-    ]
-    for slug, title in intl:
-        add_page(pages, "international", slug, title, priority="low")
+    index = SlugIndex(pages) if index is None else index
+    produced = previous.by_rule() if previous is not None else {}
+    unchanged = [previous is not None and previous.rules.get(rule.name) == rule_fingerprint(rule)
+                 for rule in rules]
+    todo = [n for n, same in enumerate(unchanged) if not same]
+    skipped = 0
+
+    with ShardPool(rules, todo, jobs, tmp_root=OUTPUT_DIR) as shards:
+        if shards.parallel:
+            log(f"  {len(shards.tasks)} tranches sur {jobs} process")
+        for n, rule in enumerate(rules):
+            if unchanged[n]:
+                reclaimed = reclaim_rule(pages, index, rule, produced, previous.shadowed.get(rule.name, ()))
+                if reclaimed is not None:
+                    METRICS.set("rule_pages", reclaimed, **RULE_PAGES, rule=rule.name, source="reclaimed")
+                    skipped += 1
+                    continue
+            log(f"  → {rule.label}")
+            records = shards.records(n) if shards.parallel and not unchanged[n] else rule_records(rule)
+            claimed = add_pages(pages, records, index)
+            METRICS.set("rule_pages", claimed, **RULE_PAGES, rule=rule.name, source="generated")
 
     added = len(pages) - count_start
-    log(f"  ✓ Phase 1 terminée : {added} pages ajoutées, total = {len(pages)}")
+    log(f"  ✓ Phase 1 terminée : {added} pages ajoutées, total = {len(pages)}"
+        + (f", {skipped} règles inchangées" if skipped else ""),
+        added=added, total=len(pages), rules_reclaimed=skipped)
+    METRICS.set("slug_collisions", len(index.collisions), help="Slugs perdus en collision")
+    report_collisions(index)
     return pages
 
-# ─── Enrichissement Haloscan ──────────────────────────────────────────────────
+def reclaim_rule(pages, index, rule, produced, shadowed):
+    """Reprend sans les re-dérouler les pages d'une règle inchangée ; renvoie le
+    nombre de slugs repris. Impossible (None, la règle sera déroulée) si une de
+    ses pages a disparu du corpus, ou si un slug qu'elle avait perdu en
+    collision est désormais libre."""
+    slugs = [(s, name) for name in dict.fromkeys(subtree_names(rule)) for s in produced.get(name, ())]
+    if any(s not in pages for s, _ in slugs):
+        return None
+    for slug, category, title, name in shadowed:
+        owner = index.owner.get(slug)
+        if owner is None or owner[1] is None:
+            return None
+    for slug, name in slugs:
+        index.claim(slug, pages[slug]["category"], name)
+    for slug, category, title, name in shadowed:
+        index.claim(slug, category, name, title)
+    return len(slugs)
+
+def generate_incremental(pages, rules=RULES, full=False, jobs=1):
+    """Génération + manifest (manifest.py) : seules les règles modifiées sont
+    déroulées (toutes avec `full`), les pages que plus aucune règle ne produit
+    sont retirées, et le changeset du run est cumulé dans CHANGESET_FILE ;
+    un corpus modifié est sauvegardé. Renvoie (pages, changeset du run)."""
+    previous = Manifest.load(MANIFEST_FILE)
+    index = SlugIndex(pages)
+    generate_systematic(pages, rules, previous=None if full else previous, index=index, jobs=jobs)
+
+    # Pages d'une règle que plus rien ne produit
+    gone = [s for s, (rule, *_) in previous.pages.items()
+            if rule is not None and s in pages and index.owner.get(s, (None, None))[1] is None]
+    for slug in gone:
+        del pages[slug]
+
+    rules_fp = {r.name: rule_fingerprint(r) for r in rules}
+    if (not full and not gone and rules_fp == previous.rules and len(pages) == len(previous.pages)
+            and previous.stamp is not None and previous.stamp == corpus_stamp()):
+        # Run à vide : mêmes règles, corpus sur disque intact depuis les derniers hash
+        log("  ✓ Changeset : +0 ~0 -0 (corpus inchangé)")
+        return pages, {"added": [], "modified": [], "removed": []}
+
+    top = {name: r.name for r in rules for name in subtree_names(r)}
+    shadowed = {}
+    for c in index.collisions:
+        d = c["dropped"]
+        shadowed.setdefault(top.get(d["rule"], d["rule"]), []).append(
+            [c["slug"], d["category"], d["title"], d["rule"]])
+    manifest = Manifest(
+        rules_fp,
+        {slug: (index.owner.get(slug, (None, None))[1], h) for slug, h in page_hashes(pages).items()},
+        shadowed)
+    changes = record_changes(previous, manifest, pages)
+    return pages, changes
+
+def corpus_stamp():
+    """Taille et date de pages.json et du journal : s'ils n'ont pas bougé, le
+    corpus non plus."""
+    return [[f.stat().st_size, f.stat().st_mtime_ns] if f.exists() else None
+            for f in (PAGES_FILE, JOURNAL_FILE)]
+
+def record_changes(previous, manifest, pages=None):
+    """Enregistre le manifest et cumule le changeset dans CHANGESET_FILE
+    (remis à zéro par l'export des index du site). Avec `pages`, le corpus est
+    d'abord sauvegardé s'il a changé : le manifest est daté (corpus_stamp) sur
+    le pages.json qu'il décrit."""
+    changes = changeset(previous, manifest)
+    if pages is not None and any(changes.values()):
+        save_pages(pages)
+    manifest.date_changes(previous, date.today().isoformat())
+    pending = json.loads(CHANGESET_FILE.read_text()) if CHANGESET_FILE.exists() else {}
+    merged = merge_changes(pending, changes)
+    merged["updated_at"] = datetime.now().isoformat(timespec="seconds")
+    CHANGESET_FILE.write_text(json.dumps(merged, ensure_ascii=False, indent=2))
+    manifest.stamp = corpus_stamp()
+    manifest.save(MANIFEST_FILE)
+    log(f"  ✓ Changeset : +{len(changes['added'])} ~{len(changes['modified'])} -{len(changes['removed'])} "
+        f"(en attente : +{len(merged['added'])} ~{len(merged['modified'])} -{len(merged['removed'])})")
+    return changes
+
+def refresh_manifest(pages):
+    """Met à jour les hash du manifest après une phase qui modifie les pages
+    (enrichissement, scoring), sans rien re-générer."""
+    previous = Manifest.load(MANIFEST_FILE)
+    manifest = Manifest(previous.rules,
+                        {slug: (previous.pages.get(slug, (None,))[0], h) for slug, h in page_hashes(pages).items()},
+                        previous.shadowed)
+    return record_changes(previous, manifest)
+
+def report_collisions(index):
+    """Log des collisions de slug + détail dans collisions.json."""
+    COLLISIONS_FILE.write_text(json.dumps(index.collisions, ensure_ascii=False, indent=2))
+    if not index.collisions:
+        return
+    cross, pairs = index.report()
+    log(f"  ⚠ {len(index.collisions)} collisions de slug ({cross} entre catégories) → {COLLISIONS_FILE.name}")
+    for (kept, dropped), n in pairs.most_common(5):
+        log(f"    {kept or '(existante)'} ← {dropped} : {n}")
+
+def print_plan(rules=RULES):
+    """Pages produites par chaque règle (avant dédoublonnage), sans rien générer."""
+    report = plan(rules)
+    print(f"\n{'='*50}")
+    for rule, n in report:
+        print(f"  {rule.name:40s} : {n}")
+    print(f"\nTOTAL CANDIDATS : {sum(n for _, n in report)}")
+    print(f"{'='*50}\n")
 
-def enrich_haloscan(pages, limit=200):
-    """Interroge Haloscan sur les keywords les plus prioritaires."""
-    log(f"=== PHASE 2 : Enrichissement Haloscan (max {limit} requêtes) ===")
+# ─── Quasi-doublons ───────────────────────────────────────────────────────────
+
+def find_clusters(pages):
+    """Clusters de pages en concurrence sur la même requête (clustering)."""
+    clusters = cluster_pages(pages)
+    log(f"  → {len(clusters)} clusters de quasi-doublons "
+        f"({sum(len(m) - 1 for m in clusters)} pages redondantes)")
+    return clusters
+
+def export_clusters(pages, clusters):
+    """Rapport clusters.json : pour chaque cluster, le représentant à garder et
+    les pages qui le cannibalisent."""
+    report = cluster_report(pages, clusters)
+    CLUSTERS_FILE.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+    for group in report["groups"][:5]:
+        log(f"    {group['size']:3d} × {group['tokens']} → {group['representative']}")
+    log(f"  ✓ Rapport de clusters : {CLUSTERS_FILE}")
+    return report
 
-    # Prioriser les pages sans données Haloscan
-    to_enrich = [p for p in pages.values() if p["haloscan_volume"] is None and p["priority"] in ("top","high")]
-    to_enrich = to_enrich[:limit]
-    log(f"  → {len(to_enrich)} pages à enrichir")
+# ─── Enrichissement Haloscan ──────────────────────────────────────────────────
 
+class TokenBucket:
+    """Limiteur de débit partagé par tous les workers (rate jetons/seconde)."""
+
+    def __init__(self, rate, burst=None):
+        if not rate > 0:
+            raise ValueError(f"débit invalide : {rate} req/s (doit être > 0)")
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def rate_arg(text):
+    """Type argparse des débits (--rps, --products-rps) : nombre > 0."""
+    try:
+        rate = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"nombre attendu, pas {text!r}") from None
+    if not rate > 0:
+        raise argparse.ArgumentTypeError(f"débit > 0 attendu, pas {text}")
+    return rate
+
+def fetch_haloscan(client, keywords, limiter, bulk=False):
+    """Une requête Haloscan — un keyword, ou un lot via l'endpoint bulk.
+    Renvoie keyword → réponse brute (ou HaloscanError pour un keyword raté du lot)."""
+    limiter.acquire()
+    if bulk:
+        return timed_request(client.fetch_many, keywords, "bulk")
+    return {kw: timed_request(client.fetch, kw, "single") for kw in keywords}
+
+def timed_request(fetch, arg, mode):
+    """Appel Haloscan chronométré (histogramme haloscan_request_seconds), erreurs comprises."""
+    t0 = time.perf_counter()
+    try:
+        return fetch(arg)
+    finally:
+        METRICS.observe("haloscan_request_seconds", time.perf_counter() - t0,
+                        help="Latence des requêtes Haloscan (s)", mode=mode)
+
+def apply_metrics(pages, slug, metrics, journal):
+    fields = {
+        "haloscan_volume": metrics.volume,
+        "haloscan_kd":     metrics.allintitle,
+        "haloscan_cpc":    metrics.cpc,
+    }
+    pages[slug].update(fields)
+    journal.append(slug, fields)
+    METRICS.inc("pages_enriched_total", help="Pages enrichies (Haloscan ou cache)")
+
+def keyword_groups(pages, ranked):
+    """Regroupe la file classée `ranked` par requête Haloscan : [(keyword,
+    slugs en attente)], dans l'ordre de la file. Seules les pages dont le titre
+    donne le même keyword normalisé partagent une requête : les quasi-doublons
+    (clustering) ont des volumes réels trop différents pour se les recopier
+    (« poubelle cuisine » 30, « poubelle de cuisine » 4500)."""
+    groups = {}
+    for slug in ranked:
+        keyword = pages[slug]["title"]
+        groups.setdefault(normalize_keyword(keyword), (keyword, []))[1].append(slug)
+    return list(groups.values())
+
+def purge_cache(cache):
+    """Supprime les entrées expirées du cache keyword avant une passe."""
+    purged = cache.purge_expired()
+    if purged:
+        log(f"  → {purged} entrées expirées purgées du cache keyword")
+
+
+def enrich_haloscan(pages, limit=200, workers=1, rps=2.0,
+                    cache_ttl=30 * DAY, negative_ttl=3 * DAY, batch_size=1):
+    """Interroge Haloscan sur les keywords de plus forte valeur attendue
+    (scoring.enrichment_queue : estimations tirées des pages déjà enrichies).
+
+    Le cache disque est consulté avant le réseau : seuls les miss comptent dans
+    `limit`. Les requêtes partent en parallèle sur `workers` threads ; un seul
+    TokenBucket plafonne le débit global à `rps` requêtes/seconde. Les
+    résultats sont appliqués à `pages` depuis le thread principal.
+
+    Un keyword n'est demandé qu'une fois pour toutes les pages qui le
+    partagent (keyword_groups) ; la réponse de l'un n'est jamais recopiée
+    sur un autre keyword.
+
+    Avec `batch_size` > 1, les keywords partent par lots sur l'endpoint bulk :
+    chaque réponse est redistribuée sur les slugs du lot, et un keyword en
+    échec est traité seul (cache négatif) sans invalider le reste du lot.
+    """
+    mode = f"lots de {batch_size}" if batch_size > 1 else "unitaire"
+    log(f"=== PHASE 2 : Enrichissement Haloscan (max {limit} requêtes, {workers} workers, {rps} req/s, {mode}) ===")
+
+    cache = KeywordCache(CACHE_FILE, ttl=cache_ttl, negative_ttl=negative_ttl)
+    purge_cache(cache)
+    journal = Journal()
     enriched = 0
-    for page in to_enrich:
-        keyword = page["title"]
-        try:
-            result = subprocess.run(
-                [PYTHON_BIN, str(HALOSCAN_SCRIPT), "keyword", keyword, "highlights"],
-                capture_output=True, text=True, timeout=30
-            )
-            if result.returncode == 0:
-                data = json.loads(result.stdout)
-                results = data.get("results", [])
-                if results:
-                    top = results[0]
-                    pages[page["slug"]]["haloscan_volume"] = top.get("volume")
-                    pages[page["slug"]]["haloscan_kd"]     = top.get("allintitle")
-                    pages[page["slug"]]["haloscan_cpc"]    = top.get("cpc")
+
+    # File classée par valeur attendue (scoring) ; le cache répond d'abord.
+    # Toute la file est parcourue pour appliquer les hits : `limit` ne borne
+    # que les miss retenus pour le réseau.
+    groups = keyword_groups(pages, enrichment_queue(score_pages(pages)))
+    slugs_by_keyword = {}
+    for keyword, slugs in groups:
+        entry = cache.get(keyword)
+        if entry is None:
+            if len(slugs_by_keyword) < limit:
+                slugs_by_keyword[keyword] = slugs
+        elif entry.response is not None:
+            metrics = KeywordMetrics.from_response(keyword, entry.response)
+            if metrics is not None:
+                for slug in slugs:
+                    apply_metrics(pages, slug, metrics, journal)
+                    enriched += 1
+    keywords = list(slugs_by_keyword)
+    log(f"  → {len(keywords)} keywords à interroger ({sum(map(len, slugs_by_keyword.values()))} pages), "
+        f"cache : {cache.summary()}", keywords=len(keywords))
+    METRICS.inc("haloscan_keywords_sent_total", len(keywords), help="Keywords envoyés à Haloscan (quota consommé)")
+
+    step = max(1, batch_size)
+    batches = [keywords[i:i + step] for i in range(0, len(keywords), step)]
+
+    limiter = TokenBucket(rps)
+    with HaloscanClient(pool_size=max(1, workers)) as client, \
+         ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(fetch_haloscan, client, batch, limiter, batch_size > 1): batch
+                   for batch in batches}
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                # Requête entière en échec : tous les keywords du lot
+                results = dict.fromkeys(futures[future], e)
+            for keyword, data in results.items():
+                if isinstance(data, Exception):
+                    cache.put_error(keyword, data)
+                    record_error(data)
+                    log(f"    ⚠ Haloscan error pour '{keyword}': {data}",
+                        event="haloscan_error", keyword=keyword, error=error_kind(data))
+                    continue
+                cache.put(keyword, data)
+                metrics = KeywordMetrics.from_response(keyword, data)
+                if metrics is None:
+                    continue
+                for slug in slugs_by_keyword[keyword]:
+                    apply_metrics(pages, slug, metrics, journal)
                     enriched += 1
-            time.sleep(0.5)  # respecter rate limit
-        except Exception as e:
-            log(f"    ⚠ Haloscan error pour '{keyword}': {e}")
-            continue
 
-        if enriched % 20 == 0 and enriched > 0:
-            save_pages(pages)
-            log(f"    → Sauvegarde : {enriched} enrichis")
+                    if enriched % COMPACT_EVERY == 0:
+                        journal.checkpoint()
+                        save_pages(pages)
+                        log(f"    → Compaction : {enriched} enrichis")
+                    elif enriched % 20 == 0:
+                        journal.checkpoint()
+                        log(f"    → Checkpoint journal : {enriched} enrichis")
 
+    journal.close()
     save_pages(pages)
-    log(f"  ✓ Phase 2 : {enriched} pages enrichies")
+    log(f"  ✓ Phase 2 : {enriched} pages enrichies — cache : {cache.summary()}", enriched=enriched)
+    record_cache(cache)
+    cache.close()
+    return pages
+
+# ─── Démon d'enrichissement ───────────────────────────────────────────────────
+
+def refill_queue(pages, queue):
+    """(Re)classe le corpus et pousse ses keywords non enrichis dans la file ;
+    le score d'un item est son rang inversé dans la file d'enrichissement."""
+    groups = keyword_groups(pages, enrichment_queue(score_pages(pages)))
+    return queue.enqueue((keyword, slugs, float(len(groups) - rank))
+                         for rank, (keyword, slugs) in enumerate(groups))
+
+def seconds_until_tomorrow():
+    now = datetime.now()
+    return ((now + timedelta(days=1)).replace(hour=0, minute=0, second=5, microsecond=0) - now).total_seconds()
+
+def run_daemon(workers=1, rps=2.0, batch_size=1, daily_quota=3000, poll=60, once=False,
+               cache_ttl=30 * DAY, negative_ttl=3 * DAY):
+    """Enrichissement en continu depuis la file persistante (work_queue).
+
+    Un seul démon à la fois (verrou exclusif sur LOCK_FILE) : ses leases encore
+    ouverts au démarrage sont donc orphelins et rendus à la file. Un item n'est
+    marqué fait qu'une fois la réponse en cache et le journal synchronisé : un
+    crash entre les deux se rattrape au redémarrage par un hit de cache, sans
+    nouvelle requête. Les erreurs repassent en file avec backoff, puis en
+    dead-letter. Quota quotidien atteint : le démon dort jusqu'au lendemain.
+    `once` : s'arrête quand plus rien n'est prêt au lieu d'attendre.
+    """
+    lock = open(LOCK_FILE, "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        log("Démon Haloscan déjà actif : rien à faire")
+        return None
+
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+
+    log(f"=== Démon Haloscan ({workers} workers, {rps} req/s, quota {daily_quota}/jour) ===")
+    pages = load_pages()
+    queue = WorkQueue(QUEUE_FILE)
+    cache = KeywordCache(CACHE_FILE, ttl=cache_ttl, negative_ttl=negative_ttl)
+    purge_cache(cache)
+    journal = Journal()
+    orphans = queue.release()
+    if orphans:
+        log(f"  → {orphans} leases orphelins rendus à la file")
+    log(f"  → {refill_queue(pages, queue)} keywords ajoutés — file : {queue.summary()}")
+
+    limiter = TokenBucket(rps)
+    step = max(1, batch_size)
+    enriched = since_refill = 0
+    METRICS.set("haloscan_quota_daily", daily_quota, help="Quota quotidien Haloscan du démon")
+
+    def report():
+        """Métriques du démon, réécrites à chaque compaction et à chaque pause."""
+        METRICS.set("haloscan_quota_used_today", queue.quota_used(), help="Keywords Haloscan consommés aujourd'hui")
+        for state, n in queue.counts().items():
+            METRICS.set("queue_items", n, help="Items de la file d'enrichissement par état", state=state)
+        record_cache(cache)
+        write_metrics(pages)
+
+    def settle(item, data):
+        nonlocal enriched, since_refill
+        metrics = KeywordMetrics.from_response(item.title, data)
+        if metrics is None:
+            return
+        for slug in item.slugs:
+            if slug in pages:
+                apply_metrics(pages, slug, metrics, journal)
+                enriched += 1
+                since_refill += 1
+                if enriched % COMPACT_EVERY == 0:
+                    journal.checkpoint()
+                    save_pages(pages)
+                    log(f"    → Compaction : {enriched} enrichis — file : {queue.summary()}", enriched=enriched)
+                    report()
+
+    with HaloscanClient(pool_size=max(1, workers)) as client, \
+         ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while not stop.is_set():
+            remaining = daily_quota - queue.quota_used()
+            if remaining <= 0:
+                if once:
+                    break
+                log(f"  ⏸ Quota du jour atteint ({daily_quota}) : reprise demain", event="quota_exhausted")
+                report()
+                stop.wait(seconds_until_tomorrow())
+                continue
+
+            items = queue.lease(owner, min(step * max(1, workers), remaining))
+            if not items:
+                next_at = queue.next_ready_at()
+                if once and next_at is None:
+                    break
+                wait = poll if next_at is None else min(poll, max(1.0, next_at - time.time()))
+                report()
+                stop.wait(wait)
+                continue
+
+            # Le cache répond d'abord : un item déjà interrogé ne coûte rien
+            done, misses = [], []
+            for item in items:
+                entry = cache.get(item.title)
+                if entry is not None and entry.response is not None:
+                    settle(item, entry.response)
+                    done.append(item)
+                else:
+                    misses.append(item)
+
+            queue.spend(len(misses))
+            METRICS.inc("haloscan_keywords_sent_total", len(misses), help="Keywords envoyés à Haloscan (quota consommé)")
+            batches = [misses[i:i + step] for i in range(0, len(misses), step)]
+            futures = {pool.submit(fetch_haloscan, client, [it.title for it in b], limiter, batch_size > 1): b
+                       for b in batches}
+            for future in as_completed(futures):
+                try:
+                    results = future.result()
+                except Exception as e:
+                    results = {it.title: e for it in futures[future]}
+                for item in futures[future]:
+                    data = results.get(item.title)
+                    if isinstance(data, Exception):
+                        record_error(data)
+                        if queue.fail(item, owner, data) == DEAD:
+                            METRICS.inc("queue_dead_letters_total", help="Items passés en dead-letter")
+                            log(f"    ✗ Dead-letter : '{item.title}' ({data})",
+                                event="dead_letter", keyword=item.title, error=error_kind(data))
+                        continue
+                    cache.put(item.title, data)
+                    settle(item, data)
+                    done.append(item)
+
+            journal.checkpoint()
+            for item in done:
+                queue.complete(item, owner)
+
+            if since_refill >= COMPACT_EVERY:
+                since_refill = 0
+                refill_queue(pages, queue)
+
+    queue.release(owner)
+    journal.close()
+    save_pages(pages)
+    report()
+    log(f"  ✓ Démon arrêté : {enriched} pages enrichies — file : {queue.summary()}, "
+        f"quota du jour : {queue.quota_used()}/{daily_quota}")
+    for title, attempts, error in queue.dead_letters(5):
+        log(f"    ✗ {title} ({attempts} essais) : {error}")
+    cache.close()
+    queue.close()
+    lock.close()
+    return pages
+
+# ─── Descriptions (LLM) ───────────────────────────────────────────────────────
+
+def content_targets(pages, min_priority="medium", limit=None):
+    """Slugs sans description jusqu'à `min_priority` incluse, par priorité
+    puis volume observé ou estimé (scoring.ranked_slugs)."""
+    max_rank = PRIORITY_RANK[min_priority]
+    targets = [slug for slug in ranked_slugs(score_pages(pages))
+               if PRIORITY_RANK.get(pages[slug]["priority"], len(PRIORITY_RANK)) <= max_rank
+               and not pages[slug]["description"]]
+    return targets[:limit] if limit else targets
+
+def apply_description(pages, slug, text, journal):
+    pages[slug]["description"] = text
+    journal.append(slug, {"description": text})
+    METRICS.inc("pages_described_total", help="Descriptions écrites dans le corpus (backend ou cache)")
+
+def enrich_content(pages, backend, limit=None, min_priority="medium", batch_size=20, workers=4, rules=RULES):
+    """Écrit la description des pages qui n'en ont pas (content_targets).
+
+    Le prompt de chaque page est tiré de ses facettes ; le cache (empreinte du
+    prompt) répond d'abord, seuls les miss partent au backend, par lots de
+    `batch_size` avec au plus `workers` lots en vol. Chaque réponse est mise
+    en cache et journalisée dès son arrivée : un run interrompu reprend là où
+    il s'est arrêté, sans rappeler le backend pour les textes déjà obtenus.
+    """
+    log(f"=== PHASE 4 : Descriptions ({backend.model}, lots de {batch_size}, {workers} workers) ===")
+    cache = ContentCache(CONTENT_CACHE_FILE)
+    journal = Journal()
+    labels = facet_labels(rules)
+    written = 0
+
+    misses = []
+    for slug in content_targets(pages, min_priority, limit):
+        request = make_request(slug, pages[slug], labels, backend.model)
+        text = cache.get(request.key)
+        if text is None:
+            misses.append(request)
+        else:
+            apply_description(pages, slug, text, journal)
+            written += 1
+    log(f"  → {written} descriptions depuis le cache, {len(misses)} à générer", misses=len(misses))
+    METRICS.inc("content_prompts_sent_total", len(misses), help="Prompts envoyés au backend de contenu")
+
+    def observe(seconds):
+        METRICS.observe("content_request_seconds", seconds, help="Latence des appels au backend de contenu (s)",
+                        backend=backend.model)
+
+    for batch, texts in run_batches(backend, misses, batch_size, workers, observe):
+        if isinstance(texts, Exception):
+            METRICS.inc("content_errors_total", len(batch), help="Prompts en échec par type d'erreur",
+                        type=getattr(texts, "kind", type(texts).__name__))
+            log(f"    ⚠ Lot de {len(batch)} en échec : {texts}", event="content_error")
+            continue
+        cache.put_many(backend.model, [(r.key, text) for r, text in zip(batch, texts)])
+        for request, text in zip(batch, texts):
+            apply_description(pages, request.slug, text, journal)
+            written += 1
+            if written % COMPACT_EVERY == 0:
+                journal.checkpoint()
+                save_pages(pages)
+                log(f"    → Compaction : {written} descriptions")
+        journal.checkpoint()
+
+    journal.close()
+    save_pages(pages)
+    for result, n in (("hit", cache.hits), ("miss", cache.misses)):
+        METRICS.set("content_cache_lookups", n, help="Consultations du cache de contenu par résultat", result=result)
+    log(f"  ✓ Phase 4 : {written} descriptions — cache : {cache.summary()}", written=written)
+    cache.close()
+    backend.close()
+    return pages
+
+# ─── Produits ─────────────────────────────────────────────────────────────────
+
+def fetch_products(pages, limit=0, workers=4, rps=2.0, ttl=7 * DAY, rules=RULES, out_dir=None):
+    """Produits d'affiliation de chaque page, par requête canonique (products.py).
+
+    Les pages qui cherchent les mêmes produits partagent une requête ; seules
+    les requêtes absentes ou expirées de la table produits partent au
+    réseau (au plus `limit`, pages prioritaires d'abord), sur `workers`
+    threads sous un TokenBucket à `rps`. Exporte ensuite pour le site :
+
+      index/products.json       id → fiche produit
+      index/page_products.json  slug → ids produits
+    """
+    log(f"=== Produits ({workers} workers, {rps} req/s) ===")
+    store = ProductStore(PRODUCTS_FILE, ttl=ttl)
+    groups = query_groups(pages, ranked_slugs(score_pages(pages)), facet_labels(rules))
+    store.set_links(groups)
+
+    fresh = store.fresh_queries()
+    todo = [q for q in groups if q not in fresh]
+    if limit:
+        todo = todo[:limit]
+    log(f"  → {len(pages)} pages, {len(groups)} requêtes uniques, {len(groups) - len(todo)} en cache, "
+        f"{len(todo)} à interroger", queries=len(groups), todo=len(todo))
+    METRICS.set("product_queries", len(groups), help="Requêtes produits uniques du corpus")
+    METRICS.inc("product_requests_total", len(todo), help="Requêtes envoyées à la passerelle produits")
+
+    def search(client, limiter, query):
+        limiter.acquire()
+        t0 = time.perf_counter()
+        try:
+            return client.search(query)
+        finally:
+            METRICS.observe("product_request_seconds", time.perf_counter() - t0,
+                            help="Latence des requêtes produits (s)")
+
+    fetched = 0
+    limiter = TokenBucket(rps)
+    with ProductClient(pool_size=max(1, workers)) as client, \
+         ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(search, client, limiter, q): q for q in todo}
+        for future in as_completed(futures):
+            query = futures[future]
+            try:
+                store.put_results(query, future.result())
+                fetched += 1
+            except Exception as e:
+                METRICS.inc("product_errors_total", help="Erreurs produits par type",
+                            type=getattr(e, "kind", type(e).__name__))
+                log(f"    ⚠ Produits : erreur pour '{query}': {e}", event="product_error", query=query)
+
+    links = store.page_products()
+    catalog = store.products({pid for ids in links.values() for pid in ids})
+    out_dir = out_dir or INDEX_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, data in (("products.json", catalog), ("page_products.json", links)):
+        (out_dir / name).write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+    store.close()
+    METRICS.set("pages_with_products", len(links), help="Pages liées à au moins un produit")
+    log(f"  ✓ Produits : {fetched} requêtes, {len(catalog)} produits, {len(links)} pages liées → {out_dir}",
+        fetched=fetched)
+    return links
+
+# ─── Scoring ─────────────────────────────────────────────────────────────────
+
+def score_priorities(pages):
+    """Promeut les pages dont le volume Haloscan observé le justifie
+    (scoring.rescore_priorities) ; les estimations, recalculées à chaque
+    classement, ne sont pas stockées."""
+    log("=== Scoring : priorités ===")
+    scores = score_pages(pages)
+    if not scores.n_observed:
+        log("  → aucune page enrichie : aucune priorité à relever")
+        return pages
+    promoted = rescore_priorities(pages, scores)
+    for (old, new), n in sorted(promoted.items()):
+        log(f"  ↑ {old} → {new} : {n} pages")
+    log(f"  ✓ {sum(promoted.values())} priorités relevées "
+        f"(volumes observés de {scores.n_observed} pages enrichies)")
+    if promoted:
+        save_pages(pages)
     return pages
 
 # ─── Export CSV ──────────────────────────────────────────────────────────────
 
-def export_csv(pages):
-    csv_file = OUTPUT_DIR / "pages.csv"
-    categories = {}
-    for p in pages.values():
-        cat = p["category"]
-        categories.setdefault(cat, []).append(p)
-
-    with open(csv_file, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["Catégorie","Slug","Titre","Priorité","Volume","KD","CPC"])
-        for cat in sorted(categories):
-            for p in sorted(categories[cat], key=lambda x: x["title"]):
-                writer.writerow([
-                    cat, p["slug"], p["title"], p["priority"],
-                    p["haloscan_volume"] or "", p["haloscan_kd"] or "", p["haloscan_cpc"] or ""
-                ])
-    log(f"  ✓ CSV exporté : {csv_file}")
+def export_csv(pages, compress=False):
+    """pages.csv (ou pages.csv.gz) au schéma de data/pages.csv, trié par
+    (category, title) en tri externe — voir csv_export."""
+    csv_file = OUTPUT_DIR / ("pages.csv.gz" if compress else "pages.csv")
+    n = write_csv(pages, csv_file, compress=compress)
+    log(f"  ✓ CSV exporté : {csv_file} ({n} lignes)")
     return csv_file
 
+# ─── Index de requêtes (site) ─────────────────────────────────────────────────
+
+def export_indexes(pages, out_dir=None):
+    """Artefacts précalculés pour le build Next.js (src/lib/pages.ts) :
+
+      index/categories.json       catégorie → slugs (ordre du corpus)
+      index/priorities.json       priorité → slugs
+      index/category_counts.json  [{category, count}] par effectif décroissant
+      index/shards/<cat>.json     pages d'une catégorie, slug → page
+
+    Le site fait ainsi des lookups O(1) et ne charge que les shards utiles.
+    """
+    out_dir = out_dir or INDEX_DIR
+    shard_dir = out_dir / "shards"
+    shard_dir.mkdir(parents=True, exist_ok=True)
+
+    by_category = pages.slugs_by("category")
+    by_priority = pages.slugs_by("priority")
+    counts = sorted(({"category": c, "count": len(s)} for c, s in by_category.items()),
+                    key=lambda c: -c["count"])
+
+    def dump(path, data):
+        path.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+
+    dump(out_dir / "categories.json", by_category)
+    dump(out_dir / "priorities.json", by_priority)
+    dump(out_dir / "category_counts.json", counts)
+    for cat, slugs in by_category.items():
+        dump(shard_dir / f"{cat}.json", {s: dict(pages[s]) for s in slugs})
+    for stale in shard_dir.glob("*.json"):
+        if stale.stem not in by_category:
+            stale.unlink()
+
+    log(f"  ✓ Index exportés : {len(by_category)} catégories, {len(by_priority)} priorités → {out_dir}")
+    return out_dir
+
+def publish_changeset(out_dir=None):
+    """Publie le changeset cumulé avec les index du site (index/changeset.json :
+    slugs ajoutés / modifiés / supprimés depuis le dernier export) et le remet à zéro."""
+    out_dir = Path(out_dir or INDEX_DIR)
+    if not CHANGESET_FILE.exists():
+        return None
+    target = out_dir / "changeset.json"
+    os.replace(CHANGESET_FILE, target)
+    log(f"  ✓ Changeset publié : {target}")
+    return target
+
+# ─── Sitemap ──────────────────────────────────────────────────────────────────
+
+def export_sitemap(pages, out_dir=None, site_url=SITE_URL, max_urls=MAX_URLS):
+    """Sitemaps gzip de `max_urls` URLs + index (sitemap.py), par priorité puis
+    volume observé ou estimé ; lastmod tiré du manifest (refresh_manifest au
+    préalable)."""
+    out_dir = Path(out_dir or SITEMAP_DIR)
+    lastmod = Manifest.load(MANIFEST_FILE).lastmod()
+    result = write_sitemaps(url_entries(ranked_slugs(score_pages(pages)), lastmod), out_dir, SITEMAP_STATE,
+                            site_url=site_url, max_urls=max_urls)
+    log(f"  ✓ Sitemap : {result['urls']} URLs en {result['shards']} fichiers "
+        f"({result['written']} réécrits, {result['shards'] - result['written']} inchangés"
+        + (f", {result['removed']} supprimés" if result["removed"] else "") + f") → {out_dir}", **result)
+    METRICS.set("sitemap_files_written", result["written"], help="Fichiers de sitemap réécrits")
+    return result
+
+# ─── Pages liées ──────────────────────────────────────────────────────────────
+
+def numeric(value):
+    """Valeur Haloscan exploitable (int/float), None pour None/"NA"."""
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+def page_rank_key(p):
+    return (PRIORITY_RANK.get(p["priority"], len(PRIORITY_RANK)), -(numeric(p["haloscan_volume"]) or 0), p["slug"])
+
+def compute_related(pages, k=8):
+    """Top-k pages liées par facets partagés, via un index inversé facet → pages.
+
+    Les clés d'index sont les facets de la page (catégorie incluse) et leurs
+    paires ; une clé pèse la somme des IDF de ses facets. Pour chaque page, on
+    parcourt ses clés de la plus spécifique à la plus générale et on prend les
+    voisins immédiats de la page dans chaque liste (listes triées par priorité
+    puis volume) : aucune comparaison paire à paire, coût ~O(pages × k).
+    """
+    slugs = sorted(pages, key=lambda s: page_rank_key(pages[s]))
+    key_ids, postings, page_keys = {}, [], []
+    for i, slug in enumerate(slugs):
+        p = pages[slug]
+        feats = [("category", p["category"])] + sorted((p.get("facets") or {}).items())
+        positions = []
+        for key in itertools.chain(((f,) for f in feats), itertools.combinations(feats, 2)):
+            kid = key_ids.get(key)
+            if kid is None:
+                kid = key_ids[key] = len(postings)
+                postings.append([])
+            positions.append((kid, len(postings[kid])))
+            postings[kid].append(i)
+        page_keys.append(positions)
+
+    n = len(slugs)
+    idf = {key[0]: math.log(n / len(postings[kid])) for key, kid in key_ids.items() if len(key) == 1}
+    weight = [0.0] * len(postings)
+    for key, kid in key_ids.items():
+        weight[kid] = -sum(idf[f] for f in key)
+
+    cap = max(1, k // 2)   # une même clé ne fournit pas plus de la moitié des liens
+    related = {}
+    for i, slug in enumerate(slugs):
+        keys = sorted((weight[kid], kid, pos) for kid, pos in page_keys[i])
+        picked, seen = [], {i}
+        for limit in (cap, k):
+            for _, kid, pos in keys:
+                posting = postings[kid]
+                # voisins de la page dans la liste, en bouclant en fin de liste
+                w = min(len(posting), limit + len(seen))
+                window = posting[pos + 1:pos + 1 + w]
+                if len(window) < w:
+                    window += posting[:w - len(window)]
+                taken = 0
+                for j in window:
+                    if j not in seen:
+                        seen.add(j)
+                        picked.append(j)
+                        taken += 1
+                        if taken >= limit or len(picked) >= k:
+                            break
+                if len(picked) >= k:
+                    break
+            if len(picked) >= k:
+                break
+        related[slug] = [slugs[j] for j in picked]
+    return {slug: related[slug] for slug in pages}
+
+def export_related(pages, out_dir=None, k=8):
+    """index/related.json : slug → slugs des pages liées ; renvoie ce mapping."""
+    out_dir = out_dir or INDEX_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    t0 = time.time()
+    related = compute_related(pages, k=k)
+    path = out_dir / "related.json"
+    path.write_text(json.dumps(related, ensure_ascii=False, separators=(",", ":")))
+    log(f"  ✓ Pages liées : {len(related)} pages × {k} en {time.time() - t0:.1f}s → {path}")
+    return related
+
+# ─── Fragments pré-rendus ─────────────────────────────────────────────────────
+
+def export_fragments(pages, related=None, jobs=1, out_dir=None):
+    """Fragments HTML par page (fragments.py) : seuls ceux dont les entrées ont
+    changé sont rendus, sur `jobs` process."""
+    out_dir = out_dir or FRAGMENTS_DIR
+    t0 = time.time()
+    if related is None:
+        related = compute_related(pages)
+    titles = {slug: pages[slug]["title"] for slug in pages}
+    inputs = {slug: render_inputs(pages[slug], [(r, titles[r]) for r in related.get(slug, ())])
+              for slug in pages}
+    stats = write_fragments(inputs, out_dir, jobs=jobs)
+    METRICS.set("fragments", stats["rendered"], help="Fragments de page rendus par le run", result="rendered")
+    METRICS.set("fragments", stats["kept"], result="kept")
+    log(f"  ✓ Fragments : {stats['rendered']} rendus, {stats['kept']} inchangés, {stats['removed']} supprimés "
+        f"en {time.time() - t0:.1f}s → {out_dir}", **stats)
+    return stats
+
 # ─── Stats ────────────────────────────────────────────────────────────────────
 
 def print_stats(pages):
-    from collections import Counter
-    cats = Counter(p["category"] for p in pages.values())
-    prios = Counter(p["priority"] for p in pages.values())
-    enriched = sum(1 for p in pages.values() if p["haloscan_volume"] is not None)
+    cats = pages.counts("category")
+    prios = pages.counts("priority")
+    enriched = pages.enriched_count()
 
     print(f"\n{'='*50}")
     print(f"TOTAL PAGES : {len(pages)}")
@@ -685,28 +1149,133 @@ def print_stats(pages):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--phase", default="all", choices=["all","systematic","haloscan","export","stats"])
+    parser.add_argument("--phase", default="all", choices=["all","systematic","plan","cluster","haloscan","daemon","score","export","sitemap","content","products","render","stats"])
     parser.add_argument("--limit", type=int, default=300, help="Nb max requêtes Haloscan")
+    parser.add_argument("--workers", type=int, default=1, help="Nb de requêtes Haloscan en parallèle")
+    parser.add_argument("--rps", type=rate_arg, default=2.0, help="Débit max Haloscan (requêtes/seconde, tous workers confondus)")
+    parser.add_argument("--batch-size", type=int, default=1, help="Keywords par requête (endpoint bulk si > 1)")
+    parser.add_argument("--cache-ttl", type=float, default=30, help="Durée de vie du cache Haloscan (jours)")
+    parser.add_argument("--cache-negative-ttl", type=float, default=3, help="Durée de vie des réponses vides en cache (jours)")
+    parser.add_argument("--daily-quota", type=int, default=3000, help="Démon : keywords Haloscan max par jour")
+    parser.add_argument("--once", action="store_true", help="Démon : s'arrêter quand la file est vide")
+    parser.add_argument("--full", action="store_true", help="Re-dérouler toutes les règles, même inchangées")
+    parser.add_argument("--jobs", type=int, default=1, help="Génération et rendu : nb de process (0 = tous les cœurs)")
+    parser.add_argument("--gzip", action="store_true", help="Exporter le CSV compressé (pages.csv.gz)")
+    parser.add_argument("--content-backend", default=os.environ.get("CONTENT_BACKEND", "openai"),
+                        help="Backend des descriptions : openai, stub, ou module:Classe")
+    parser.add_argument("--content-limit", type=int, default=0, help="Nb max de descriptions (0 = toutes)")
+    parser.add_argument("--content-priority", default="medium", choices=list(PRIORITY_RANK),
+                        help="Priorité minimale des pages à décrire")
+    parser.add_argument("--content-batch", type=int, default=20, help="Prompts par appel au backend")
+    parser.add_argument("--content-workers", type=int, default=4, help="Appels au backend en parallèle")
+    parser.add_argument("--products-limit", type=int, default=0, help="Nb max de requêtes produits (0 = toutes)")
+    parser.add_argument("--products-workers", type=int, default=4, help="Requêtes produits en parallèle")
+    parser.add_argument("--products-rps", type=rate_arg, default=2.0, help="Débit max de la passerelle produits (req/s)")
+    parser.add_argument("--products-ttl", type=float, default=7, help="Durée de vie des résultats produits (jours)")
+    parser.add_argument("--status", action="store_true",
+                        help="Afficher le résumé (status.json) sans charger le corpus ; --short, --json")
+    parser.add_argument("--select", action="store_true",
+                        help="Filtres → manifest de déploiement (selection.py), sans charger le corpus")
+    parser.add_argument("--retry-dead", action="store_true",
+                        help="Remettre les keywords dead-letter dans la file du démon, puis quitter")
     args = parser.parse_args()
 
-    pages = load_pages()
-    log(f"Pages existantes au démarrage : {len(pages)}")
+    if args.retry_dead:
+        queue = WorkQueue(QUEUE_FILE)
+        log(f"  → {queue.retry_dead()} keywords dead-letter remis en file — file : {queue.summary()}")
+        queue.close()
+        sys.exit(0)
+
+    if args.phase == "plan":
+        print_plan()
+        sys.exit(0)
+
+    METRICS.job = RUN["phase"] = args.phase
+
+    if args.phase == "daemon":
+        # Le démon charge le corpus lui-même, une fois son verrou pris
+        with phase("daemon"):
+            pages = run_daemon(workers=args.workers, rps=args.rps, batch_size=args.batch_size,
+                               daily_quota=args.daily_quota, once=args.once,
+                               cache_ttl=args.cache_ttl * DAY, negative_ttl=args.cache_negative_ttl * DAY)
+        if pages is None:
+            sys.exit(0)
+    else:
+        with phase("load"):
+            pages = load_pages()
+        log(f"Pages existantes au démarrage : {len(pages)}")
 
     if args.phase in ("all", "systematic"):
-        pages = generate_systematic(pages)
-        save_pages(pages)
-        export_csv(pages)
+        with phase("systematic"):
+            pages, changes = generate_incremental(pages, full=args.full, jobs=args.jobs or os.cpu_count())
+            if any(changes.values()):
+                export_csv(pages, compress=args.gzip)
+            else:
+                log("  → Aucun changement : pages.json et CSV inchangés")
+
+    if args.phase in ("all", "cluster"):
+        with phase("cluster"):
+            log("=== Quasi-doublons ===")
+            export_clusters(pages, find_clusters(pages))
 
     if args.phase in ("all", "haloscan"):
-        pages = enrich_haloscan(pages, limit=args.limit)
-        export_csv(pages)
+        with phase("haloscan"):
+            pages = enrich_haloscan(pages, limit=args.limit, workers=args.workers, rps=args.rps,
+                                    batch_size=args.batch_size,
+                                    cache_ttl=args.cache_ttl * DAY, negative_ttl=args.cache_negative_ttl * DAY)
 
-    if args.phase in ("all", "export"):
-        export_csv(pages)
+    if args.phase == "content":
+        try:
+            backend = make_backend(args.content_backend)
+        except ContentError as e:
+            log(f"  ✗ Backend de contenu « {args.content_backend} » : {e}", event="content_error", error=e.kind)
+            LOGGER.flush()
+            sys.exit(2)
+        with phase("content"):
+            pages = enrich_content(pages, backend, limit=args.content_limit,
+                                   min_priority=args.content_priority, batch_size=args.content_batch,
+                                   workers=args.content_workers)
+            export_csv(pages, compress=args.gzip)
+
+    if args.phase == "products":
+        if not PRODUCTS_API_URL:
+            log("  ✗ Produits : PRODUCTS_API_URL non défini (URL de la passerelle, ou du stub products_stub.py)",
+                event="product_error", error="config")
+            LOGGER.flush()
+            sys.exit(2)
+        with phase("products"):
+            fetch_products(pages, limit=args.products_limit, workers=args.products_workers,
+                           rps=args.products_rps, ttl=args.products_ttl * DAY)
+
+    if args.phase in ("all", "haloscan", "daemon", "score"):
+        with phase("score"):
+            pages = score_priorities(pages)
+            refresh_manifest(pages)
+            export_csv(pages, compress=args.gzip)
 
-    if args.phase == "stats":
-        print_stats(pages)
-    else:
-        print_stats(pages)
+    if args.phase in ("all", "export"):
+        with phase("export"):
+            refresh_manifest(pages)
+            export_csv(pages, compress=args.gzip)
+            export_indexes(pages)
+            related = export_related(pages)
+            export_fragments(pages, related, jobs=args.jobs or os.cpu_count())
+            export_sitemap(pages)
+            publish_changeset()
+
+    if args.phase == "render":
+        with phase("render"):
+            export_fragments(pages, jobs=args.jobs or os.cpu_count())
+
+    if args.phase == "sitemap":
+        with phase("sitemap"):
+            refresh_manifest(pages)
+            export_sitemap(pages)
+
+    print_stats(pages)
+    if args.phase != "stats":
+        save_status(pages, finished=True)
+        write_metrics(pages)
+        log(f"  ✓ Métriques : {METRICS_DIR / f'metrics-{args.phase}.prom'} (+ .json)")
 
     log("Job terminé.")
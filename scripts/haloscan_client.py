@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Client Haloscan en process — remplace l'appel `haloscan.py keyword <kw> highlights`
+lancé une fois par keyword.
+
+Un seul HaloscanClient par run : il garde un pool de connexions HTTP keep-alive
+(une par worker au plus), donc le coût par keyword se réduit à l'aller-retour
+réseau. L'URL de l'API se règle par variable d'environnement, ce qui permet de
+pointer le client sur le stub local (scripts/haloscan_stub.py) :
+
+  HALOSCAN_API_URL=http://127.0.0.1:8765 python3 generate_pages.py --phase haloscan
+
+fetch_many() interroge l'endpoint bulk (HALOSCAN_BULK_PATH) : un lot de
+keywords par requête, réponse {"items": [{"keyword", "results" | "error"}]}.
+"""
+
+import os
+import json
+import queue
+import http.client
+from dataclasses import dataclass
+from typing import Optional, Union
+from urllib.parse import urlsplit
+
+API_URL      = os.environ.get("HALOSCAN_API_URL", "https://api.haloscan.com")
+API_KEY      = os.environ.get("HALOSCAN_API_KEY", "")
+KEYWORD_PATH = os.environ.get("HALOSCAN_KEYWORD_PATH", "/api/keywords/overview")
+BULK_PATH    = os.environ.get("HALOSCAN_BULK_PATH", "/api/keywords/bulk")
+
+Metric = Union[int, float, str, None]
+
+
+class HaloscanError(Exception):
+    """Erreur HTTP ou réponse illisible de l'API Haloscan ; `kind` la classe
+    (http_429, invalid_json, keyword…) pour les métriques."""
+
+    def __init__(self, message, kind="api"):
+        super().__init__(message)
+        self.kind = kind
+
+
+def error_kind(error):
+    """Type d'erreur compté par les métriques : kind d'une HaloscanError, nom
+    de la classe sinon (TimeoutError, ConnectionRefusedError…)."""
+    return error.kind if isinstance(error, HaloscanError) else type(error).__name__
+
+
+@dataclass(frozen=True)
+class KeywordMetrics:
+    """Les trois champs lus dans results[0] de la réponse « highlights »."""
+    keyword: str
+    volume: Metric
+    allintitle: Metric
+    cpc: Metric
+
+    @classmethod
+    def from_response(cls, keyword: str, data: dict) -> Optional["KeywordMetrics"]:
+        results = data.get("results") or []
+        if not results:
+            return None
+        top = results[0]
+        return cls(keyword, top.get("volume"), top.get("allintitle"), top.get("cpc"))
+
+
+class ConnectionPool:
+    """Pool borné de connexions HTTP(S) persistantes vers un même hôte."""
+
+    def __init__(self, base_url: str, size: int = 8, timeout: float = 30):
+        parts = urlsplit(base_url)
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method: str, path: str, body: bytes, headers: dict):
+        try:
+            conn = self.idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            try:
+                conn.request(method, self.prefix + path, body=body, headers=headers)
+                resp = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # Connexion keep-alive fermée côté serveur : une seule relance
+                conn.close()
+                conn = self._connect()
+                conn.request(method, self.prefix + path, body=body, headers=headers)
+                resp = conn.getresponse()
+            payload = resp.read()
+        except Exception:
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            try:
+                self.idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+        return resp.status, payload
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class HaloscanClient:
+    """Client Haloscan partagé par tous les workers d'un run."""
+
+    def __init__(self, base_url: Optional[str] = None, api_key: str = API_KEY,
+                 pool_size: int = 8, timeout: float = 30):
+        self.pool = ConnectionPool(base_url or API_URL, size=pool_size, timeout=timeout)
+        self.headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "haloscan-api-key": api_key,
+        }
+
+    def post(self, path: str, payload: dict) -> dict:
+        body = json.dumps(payload).encode("utf-8")
+        status, raw = self.pool.request("POST", path, body, self.headers)
+        if status != 200:
+            raise HaloscanError(f"HTTP {status} sur {path}", kind=f"http_{status}")
+        try:
+            return json.loads(raw)
+        except ValueError as e:
+            raise HaloscanError(f"réponse JSON invalide sur {path}: {e}", kind="invalid_json") from e
+
+    def fetch(self, keyword: str) -> dict:
+        """Réponse brute de l'API pour un keyword."""
+        return self.post(KEYWORD_PATH, {"keyword": keyword, "requested_data": ["highlights"]})
+
+    def fetch_many(self, keywords: list) -> dict:
+        """Une requête bulk pour plusieurs keywords.
+
+        Renvoie keyword → réponse brute (même forme que fetch()) ou HaloscanError
+        pour les keywords en échec : un keyword raté n'invalide pas le lot. Une
+        erreur sur la requête entière lève HaloscanError.
+        """
+        data = self.post(BULK_PATH, {"keywords": list(keywords), "requested_data": ["highlights"]})
+        items = {}
+        for item in data.get("items") or []:
+            kw = item.get("keyword")
+            if "error" in item:
+                items[kw] = HaloscanError(str(item["error"]), kind="keyword")
+            else:
+                items[kw] = {"results": item.get("results") or []}
+        out = {}
+        for kw in keywords:
+            found = items.get(kw)
+            if found is None:
+                found = HaloscanError(f"'{kw}' absent de la réponse bulk", kind="bulk_missing")
+            out[kw] = found
+        return out
+
+    def close(self):
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Stub local de l'API Haloscan — pour tester et mesurer l'enrichissement sans
+réseau ni quota.
+
+Les métriques sont déterministes (dérivées d'un hash du keyword), donc deux
+runs contre le stub produisent le même corpus.
+
+Latence et taux d'erreur sont réglables pour les benchmarks. L'endpoint bulk
+(BULK_PATH) est servi aussi ; en bulk, les erreurs simulées touchent des
+keywords isolés du lot.
+
+Usage :
+  python3 haloscan_stub.py --port 8765
+  python3 haloscan_stub.py --port 8765 --latency 0.15 --error-rate 0.02
+  HALOSCAN_API_URL=http://127.0.0.1:8765 python3 generate_pages.py --phase haloscan
+"""
+
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from haloscan_client import KEYWORD_PATH, BULK_PATH
+
+
+def fake_metrics(keyword):
+    """Métriques synthétiques stables pour un keyword ; ~15% sans résultat."""
+    h = int.from_bytes(hashlib.sha1(keyword.lower().encode("utf-8")).digest()[:8], "big")
+    if h % 100 < 15:
+        return None
+    volume = (h >> 8) % 5000
+    kd = "NA" if h % 7 == 0 else (h >> 20) % 20000
+    cpc = round(((h >> 32) % 300) / 100, 2)
+    return {"keyword": keyword, "volume": volume, "allintitle": kd, "cpc": cpc}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, comme l'API réelle
+    latency = 0.0      # secondes ajoutées à chaque réponse
+    error_rate = 0.0   # part des requêtes qui répondent 500
+    rng = random.Random(0)
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send(400, {"error": "invalid json"})
+        if self.path not in (KEYWORD_PATH, BULK_PATH):
+            return self._send(404, {"error": f"unknown path {self.path}"})
+        if self.latency:
+            time.sleep(self.latency)
+        if self.path == BULK_PATH:
+            return self._bulk(payload.get("keywords") or [])
+        if self.failed():
+            return self._send(500, {"error": "stub: erreur simulée"})
+        top = fake_metrics(payload.get("keyword", ""))
+        self._send(200, {"results": [top] if top else []})
+
+    def failed(self):
+        return bool(self.error_rate) and self.rng.random() < self.error_rate
+
+    def _bulk(self, keywords):
+        """Lot de keywords : les erreurs simulées sont par keyword (échec partiel)."""
+        items = []
+        for kw in keywords:
+            if self.failed():
+                items.append({"keyword": kw, "error": "stub: erreur simulée"})
+            else:
+                top = fake_metrics(kw)
+                items.append({"keyword": kw, "results": [top] if top else []})
+        self._send(200, {"items": items})
+
+
+def make_handler(latency=0.0, error_rate=0.0, seed=0):
+    return type("StubHandler", (StubHandler,), {
+        "latency": latency, "error_rate": error_rate, "rng": random.Random(seed),
+    })
+
+
+def serve(host="127.0.0.1", port=0, latency=0.0, error_rate=0.0):
+    """Démarre le stub dans un thread ; renvoie le serveur (server.server_address)."""
+    server = ThreadingHTTPServer((host, port), make_handler(latency, error_rate))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Latence ajoutée par requête (secondes)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Part des requêtes en erreur 500 (0-1)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.latency, args.error_rate))
+    print(f"Stub Haloscan sur http://{args.host}:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
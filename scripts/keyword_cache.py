@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Cache disque (SQLite) des réponses Haloscan, indexé par keyword normalisé.
+
+Chaque entrée garde la réponse brute, sa date de fetch et sa date d'expiration.
+Les réponses « négatives » (aucun résultat, volume "NA") sont aussi
+mémorisées, avec un TTL plus court : un redémarrage du job ne re-interroge
+donc pas les mêmes keywords morts. Une erreur (429, timeout, 5xx…) ne dit
+rien du keyword : elle n'est gardée que quelques minutes (ERROR_TTL), le
+temps de ne pas la relancer dans le même run.
+
+Toute phase qui interroge Haloscan (enrichissement, refresh) passe par
+KeywordCache.get() avant le réseau.
+"""
+
+import json
+import time
+import sqlite3
+import threading
+import unicodedata
+
+DAY = 86400
+ERROR_TTL = 15 * 60   # erreurs transitoires : quelques minutes, pas le TTL négatif
+
+OK, EMPTY, ERROR = "ok", "empty", "error"
+
+
+def normalize_keyword(keyword):
+    """Clé de cache : NFC, minuscules, espaces compactés."""
+    return " ".join(unicodedata.normalize("NFC", keyword).lower().split())
+
+
+def response_status(data):
+    """OK si results[0] porte un volume exploitable, EMPTY sinon."""
+    results = data.get("results") or []
+    if not results or results[0].get("volume") in (None, "NA"):
+        return EMPTY
+    return OK
+
+
+class CacheEntry:
+    __slots__ = ("keyword", "status", "response", "error", "fetched_at")
+
+    def __init__(self, keyword, status, response, error, fetched_at):
+        self.keyword = keyword
+        self.status = status
+        self.response = response
+        self.error = error
+        self.fetched_at = fetched_at
+
+    @property
+    def negative(self):
+        return self.status != OK
+
+
+class KeywordCache:
+    """Cache keyword → réponse Haloscan avec TTL positif, négatif et d'erreur."""
+
+    def __init__(self, path, ttl=30 * DAY, negative_ttl=3 * DAY, error_ttl=ERROR_TTL):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.error_ttl = error_ttl
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(path), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS keywords (
+                keyword    TEXT PRIMARY KEY,
+                status     TEXT NOT NULL,
+                response   TEXT,
+                error      TEXT,
+                fetched_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )""")
+        self.db.commit()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def get(self, keyword, now=None):
+        """Entrée encore valide pour ce keyword, ou None (miss)."""
+        now = time.time() if now is None else now
+        with self.lock:
+            row = self.db.execute(
+                "SELECT status, response, error, fetched_at FROM keywords "
+                "WHERE keyword = ? AND expires_at > ?",
+                (normalize_keyword(keyword), now)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            status, response, error, fetched_at = row
+            if status == OK:
+                self.hits += 1
+            else:
+                self.negative_hits += 1
+        return CacheEntry(keyword, status, json.loads(response) if response else None, error, fetched_at)
+
+    def _store(self, keyword, status, response, error, now):
+        ttl = {OK: self.ttl, EMPTY: self.negative_ttl}.get(status, self.error_ttl)
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO keywords VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_keyword(keyword), status,
+                 json.dumps(response, ensure_ascii=False) if response is not None else None,
+                 error, now, now + ttl))
+            self.db.commit()
+
+    def put(self, keyword, response, now=None):
+        """Mémorise une réponse brute ; son statut (ok/empty) fixe le TTL."""
+        self._store(keyword, response_status(response), response, None,
+                    time.time() if now is None else now)
+
+    def put_error(self, keyword, error, now=None):
+        """Mémorise un échec de requête pour error_ttl seulement."""
+        self._store(keyword, ERROR, None, str(error), time.time() if now is None else now)
+
+    def purge_expired(self, now=None):
+        now = time.time() if now is None else now
+        with self.lock:
+            n = self.db.execute("DELETE FROM keywords WHERE expires_at <= ?", (now,)).rowcount
+            self.db.commit()
+        return n
+
+    @property
+    def lookups(self):
+        return self.hits + self.negative_hits + self.misses
+
+    def hit_rate(self):
+        return (self.hits + self.negative_hits) / self.lookups if self.lookups else 0.0
+
+    def summary(self):
+        return (f"{self.hits} hits, {self.negative_hits} hits négatifs, {self.misses} miss "
+                f"(taux {self.hit_rate():.0%})")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
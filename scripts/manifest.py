@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Manifest de génération : ce que chaque règle a produit, et l'empreinte de
+chaque page.
+
+  rules     règle → empreinte de ses entrées (dimensions, gabarits, filtres,
+              sous-règles) ; une règle dont l'empreinte n'a pas bougé n'est
+              pas re-déroulée
+  pages     slug → [règle, hash du contenu, lastmod] (règle null : page hors
+              règles ; lastmod : date du dernier changement de hash)
+  shadowed  règle → slugs qu'elle a produits mais perdus en collision
+  stamp     taille/date de pages.json et du journal au moment des hash
+
+Deux manifests successifs donnent le changeset du run (pages ajoutées,
+modifiées, supprimées) que le build du site consomme.
+"""
+
+import json
+import hashlib
+
+from page_store import FIELDS, content_hash
+
+VERSION = 1
+
+
+def _code_fingerprint(fn):
+    """Empreinte d'une fonction (priorité calculée, filtre where) : son bytecode
+    et ses constantes, pas son adresse."""
+    code = fn.__code__
+    return [code.co_code.hex(), repr(code.co_consts), repr(code.co_names)]
+
+def _rule_inputs(rule):
+    return {
+        "name": rule.name,
+        "category": rule.category,
+        "dims": [[d.name, [[f.key, f.label] for f in d.facets]] for d in rule.dims],
+        "pages": [[t.slug, t.title, t.category,
+                   _code_fingerprint(t.priority) if callable(t.priority) else t.priority]
+                  for t in rule.pages],
+        "where": _code_fingerprint(rule.where) if rule.where else None,
+        "children": [_rule_inputs(c) for c in rule.children],
+    }
+
+def rule_fingerprint(rule):
+    blob = json.dumps(_rule_inputs(rule), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+
+def page_hashes(pages):
+    """slug → empreinte du contenu publié de chaque page (tous ses champs)."""
+    if hasattr(pages, "content_hashes"):
+        return pages.content_hashes()
+    return {slug: content_hash(*(p.get(f) for f in FIELDS[:8]), tuple((p.get("facets") or {}).items()),
+                               tuple(sorted((k, v) for k, v in p.items() if k not in FIELDS)))
+            for slug, p in pages.items()}
+
+
+class Manifest:
+    def __init__(self, rules=None, pages=None, shadowed=None, stamp=None):
+        self.rules = rules or {}
+        self.pages = pages or {}
+        self.shadowed = shadowed or {}
+        self.stamp = stamp    # état du corpus sur disque quand les hash ont été pris
+
+    @classmethod
+    def load(cls, path):
+        if not path.exists():
+            return cls()
+        data = json.loads(path.read_text())
+        if data.get("version") != VERSION:
+            return cls()
+        return cls(data["rules"], {s: tuple(v) for s, v in data["pages"].items()}, data["shadowed"],
+                   data.get("stamp"))
+
+    def date_changes(self, previous, day):
+        """Complète chaque page d'un lastmod : celui de `previous` si son hash
+        n'a pas bougé, `day` sinon (nouvelle page, contenu modifié, ou manifest
+        antérieur aux lastmod)."""
+        for slug, (rule, h, *_) in self.pages.items():
+            prev = previous.pages.get(slug)
+            lastmod = prev[2] if prev is not None and prev[1] == h and len(prev) > 2 else day
+            self.pages[slug] = (rule, h, lastmod)
+
+    def lastmod(self):
+        """slug → date du dernier changement de contenu."""
+        return {slug: v[2] for slug, v in self.pages.items() if len(v) > 2}
+
+    def save(self, path):
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps({"version": VERSION, "rules": self.rules, "shadowed": self.shadowed,
+                                   "stamp": self.stamp, "pages": self.pages},
+                                  ensure_ascii=False, separators=(",", ":")))
+        tmp.replace(path)
+
+    def by_rule(self):
+        """règle → slugs qu'elle a produits, dans l'ordre du manifest."""
+        out = {}
+        for slug, (rule, *_) in self.pages.items():
+            if rule is not None:
+                out.setdefault(rule, []).append(slug)
+        return out
+
+
+def subtree_names(rule):
+    """Noms d'une règle et de toutes ses sous-règles."""
+    yield rule.name
+    for child in rule.children:
+        yield from subtree_names(child)
+
+
+def changeset(old, new):
+    """Slugs ajoutés / modifiés / supprimés entre deux manifests."""
+    added, modified = [], []
+    for slug, (_, h, *_) in new.pages.items():
+        prev = old.pages.get(slug)
+        if prev is None:
+            added.append(slug)
+        elif prev[1] != h:
+            modified.append(slug)
+    removed = [slug for slug in old.pages if slug not in new.pages]
+    return {"added": added, "modified": modified, "removed": removed}
+
+
+def merge_changes(pending, new):
+    """Cumule deux changesets successifs : ajouté puis supprimé s'annule,
+    supprimé puis ré-ajouté devient modifié."""
+    state = {s: "added" for s in pending.get("added", ())}
+    state.update({s: "modified" for s in pending.get("modified", ())})
+    state.update({s: "removed" for s in pending.get("removed", ())})
+    for slug in new["added"]:
+        state[slug] = "modified" if state.get(slug) == "removed" else "added"
+    for slug in new["modified"]:
+        state[slug] = state.get(slug, "modified")
+    for slug in new["removed"]:
+        if state.get(slug) == "added":
+            del state[slug]
+        else:
+            state[slug] = "removed"
+    out = {"added": [], "modified": [], "removed": []}
+    for slug, kind in state.items():
+        out[kind].append(slug)
+    return out
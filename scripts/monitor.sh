@@ -1,20 +1,17 @@
 #!/bin/bash
-# Monitor et restart le job poubelles si nécessaire
+# Cron : s'assure que le démon d'enrichissement Haloscan tourne.
+#
+# Le démon (--phase daemon) prend un verrou exclusif (enrich.lock) : une relance
+# pendant qu'il tourne sort aussitôt. Sa file persistante (haloscan_queue.sqlite)
+# garde leases, retries et quota du jour : après un crash, il reprend où il
+# s'était arrêté, sans re-interroger les keywords déjà traités.
+#
+# L'état du corpus vient de --status, qui ne lit que status.json (tenu à jour
+# à chaque sauvegarde) : pas de chargement de pages.json à chaque passage.
 LOG="$HOME/.openclaw/workspace/output/poubelles/haloscan_run.log"
-PID_FILE="$HOME/.openclaw/workspace/output/poubelles/haloscan.pid"
 PYTHON="/home/ubuntu/.venv/bin/python3"
 SCRIPT="$HOME/.openclaw/workspace/scripts/poubelles_pages.py"
+DAILY_QUOTA=3000
 
-if [ -f "$PID_FILE" ]; then
-    PID=$(cat "$PID_FILE")
-    if kill -0 "$PID" 2>/dev/null; then
-        echo "$(date) — Job Haloscan en cours (PID $PID), rien à faire" >> "$LOG"
-        exit 0
-    fi
-fi
-
-# Vérifier s'il reste des pages à enrichir
-REMAINING=$(${PYTHON} ${SCRIPT} --phase stats 2>/dev/null | grep "Enrichies" | awk '{print $3}')
-echo "$(date) — Job terminé ou absent. Relance..." >> "$LOG"
-nohup ${PYTHON} ${SCRIPT} --phase haloscan --limit 300 >> "$LOG" 2>&1 &
-echo $! > "$PID_FILE"
+echo "$(date) — $(${PYTHON} ${SCRIPT} --status --short 2>&1)" >> "$LOG"
+nohup ${PYTHON} ${SCRIPT} --phase daemon --workers 4 --rps 2 --daily-quota ${DAILY_QUOTA} >> "$LOG" 2>&1 &
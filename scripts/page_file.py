@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Accès direct à une page du corpus, sans parser pages.json.
+
+À chaque sauvegarde du corpus, le générateur écrit aussi une génération
+page_file/<génération>/ :
+
+  pages.jsonl   une page par ligne (JSON compact), dans l'ordre du corpus
+  pages.idx     index binaire trié par slug : pour chaque page, la position
+                du slug et celle de sa ligne dans pages.jsonl
+
+puis bascule page_file/CURRENT (nom de la génération) en un seul renommage :
+un lecteur ouvre toujours une paire écrite ensemble, jamais l'index d'une
+génération avec les données d'une autre. Les KEEP dernières générations sont
+gardées, pour les lecteurs qui viennent de lire le pointeur.
+
+Format de pages.idx (petit-boutiste) :
+
+  en-tête   MAGIC (8 octets), nombre d'entrées (uint64)
+  entrées   n × (offset du slug, longueur du slug, offset de la ligne,
+            longueur de la ligne) — uint64, uint32, uint64, uint32 —
+            triées par slug (octets UTF-8)
+  slugs     les slugs, bout à bout
+
+PageFile ouvre les deux fichiers en mmap : une recherche dichotomique sur les
+entrées (log2(n) comparaisons) puis une seule tranche de pages.jsonl. Rien
+n'est chargé en mémoire à l'ouverture : le coût d'une recherche ne dépend
+pas de la taille du corpus.
+
+Usage :
+  python3 page_file.py poubelle-cuisine          # page en JSON
+  python3 page_file.py --count
+"""
+
+import os
+import sys
+import json
+import mmap
+import shutil
+import struct
+import argparse
+from pathlib import Path
+
+BASE_DIR   = Path(__file__).parent.parent
+OUTPUT_DIR = Path(os.environ.get("POUBELLES_OUTPUT_DIR", BASE_DIR / "output" / "poubelles"))
+PAGE_FILE_DIR = OUTPUT_DIR / "page_file"
+DATA_NAME  = "pages.jsonl"
+INDEX_NAME = "pages.idx"
+CURRENT    = "CURRENT"
+KEEP       = 2   # générations gardées (courante + précédente)
+
+MAGIC  = b"PGIDX\x00\x01\x00"
+HEADER = struct.Struct("<8sQ")
+ENTRY  = struct.Struct("<QIQI")
+
+
+def current_generation(root=PAGE_FILE_DIR):
+    """Nom de la génération publiée (page_file/CURRENT), ou None."""
+    try:
+        return (root / CURRENT).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+def write_page_file(pages, root=PAGE_FILE_DIR):
+    """Écrit pages.jsonl et pages.idx d'un PageStore dans une nouvelle
+    génération, puis la publie (CURRENT) ; supprime les générations au-delà
+    des KEEP dernières. Renvoie le nombre de pages."""
+    root.mkdir(parents=True, exist_ok=True)
+    previous = current_generation(root)
+    gen = f"g{int(previous[1:]) + 1 if previous else 1:06d}"
+    gen_dir = root / gen
+    if gen_dir.exists():
+        shutil.rmtree(gen_dir)   # génération d'un run interrompu avant publication
+    gen_dir.mkdir()
+
+    entries = []
+    with open(gen_dir / DATA_NAME, "wb") as f:
+        offset = 0
+        buf = []
+        for slug, line in pages.json_lines():
+            line = line.encode("utf-8")
+            buf.append(line)
+            entries.append((slug.encode("utf-8"), offset, len(line)))
+            offset += len(line) + 1
+            if len(buf) >= 4096:
+                f.write(b"\n".join(buf) + b"\n")
+                buf.clear()
+        if buf:
+            f.write(b"\n".join(buf) + b"\n")
+    entries.sort()
+
+    with open(gen_dir / INDEX_NAME, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(entries)))
+        key_offset = HEADER.size + ENTRY.size * len(entries)
+        for key, rec_offset, rec_len in entries:
+            f.write(ENTRY.pack(key_offset, len(key), rec_offset, rec_len))
+            key_offset += len(key)
+        for key, _, _ in entries:
+            f.write(key)
+
+    tmp = root / (CURRENT + ".tmp")
+    tmp.write_text(gen)
+    os.replace(tmp, root / CURRENT)
+    kept = {f"g{int(gen[1:]) - i:06d}" for i in range(KEEP)}
+    for old in root.iterdir():
+        if old.is_dir() and old.name not in kept:
+            shutil.rmtree(old, ignore_errors=True)
+    return len(entries)
+
+
+class PageFile:
+    """Lecteur de pages.jsonl + pages.idx : pf.get(slug) → page (dict) ou None."""
+
+    def __init__(self, root=PAGE_FILE_DIR):
+        for attempt in range(3):
+            gen = current_generation(root)
+            if gen is None:
+                raise FileNotFoundError(f"{root / CURRENT} : aucune génération publiée")
+            try:
+                # Les deux fichiers sont ouverts avant toute nouvelle lecture du
+                # pointeur : ils viennent de la même génération
+                with open(root / gen / INDEX_NAME, "rb") as fi, open(root / gen / DATA_NAME, "rb") as fd:
+                    self.index = mmap.mmap(fi.fileno(), 0, access=mmap.ACCESS_READ)
+                    self.data = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) \
+                        if os.fstat(fd.fileno()).st_size else b""
+                break
+            except FileNotFoundError:
+                if attempt == 2:
+                    raise   # génération supprimée entre-temps : on relit le pointeur
+        self.generation = gen
+        magic, self.count = HEADER.unpack_from(self.index, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{root / gen / INDEX_NAME} : en-tête inconnu")
+
+    def _entry(self, i):
+        return ENTRY.unpack_from(self.index, HEADER.size + i * ENTRY.size)
+
+    def _find(self, slug):
+        key = slug.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key_off, key_len, rec_off, rec_len = self._entry(mid)
+            probe = self.index[key_off:key_off + key_len]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return rec_off, rec_len
+        return None
+
+    def raw(self, slug):
+        """Ligne JSON de la page (bytes), ou None."""
+        found = self._find(slug)
+        if found is None:
+            return None
+        rec_off, rec_len = found
+        return self.data[rec_off:rec_off + rec_len]
+
+    def get(self, slug):
+        raw = self.raw(slug)
+        return None if raw is None else json.loads(raw)
+
+    def __contains__(self, slug):
+        return self._find(slug) is not None
+
+    def __len__(self):
+        return self.count
+
+    def slugs(self):
+        """Slugs dans l'ordre de l'index (tri par octets)."""
+        for i in range(self.count):
+            key_off, key_len, _, _ = self._entry(i)
+            yield self.index[key_off:key_off + key_len].decode("utf-8")
+
+    def close(self):
+        self.index.close()
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Une page du corpus par son slug, via pages.idx")
+    parser.add_argument("slug", nargs="?")
+    parser.add_argument("--count", action="store_true", help="Nombre de pages indexées")
+    args = parser.parse_args()
+
+    if current_generation() is None:
+        print(f"Pas d'index ({PAGE_FILE_DIR / CURRENT}) : lancer une phase du générateur", file=sys.stderr)
+        sys.exit(1)
+    with PageFile() as pf:
+        if args.count or not args.slug:
+            print(len(pf))
+            sys.exit(0)
+        page = pf.get(args.slug)
+        if page is None:
+            print(f"Slug inconnu : {args.slug}", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(page, ensure_ascii=False, indent=2))
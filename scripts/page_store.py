@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Stockage compact du corpus de pages, en colonnes.
+
+PageStore garde l'API d'un dict slug → page (pages[slug]["haloscan_volume"] = x,
+pages.values(), pages.items()…) mais ne crée aucun dict par page :
+
+  - slug / titre / description : listes de str,
+  - catégorie / priorité : codes entiers (array) vers une table de valeurs,
+  - volume / KD : array('q'), CPC : array('d'), avec deux sentinelles
+    explicites — MISSING (None, pas encore enrichi) et NA ("NA" renvoyé
+    par Haloscan),
+  - facets : tuple de paires (dimension, clé) internées.
+
+pages[slug] renvoie une PageView (vue sur une ligne), modifiable comme un dict.
+Les stats et exports lisent directement les colonnes (counts, slugs_by,
+write_json).
+"""
+
+import json
+from array import array
+from hashlib import blake2b
+from collections import Counter
+from collections.abc import MutableMapping
+from json.encoder import encode_basestring
+
+FIELDS = ("slug", "category", "title", "description", "priority",
+          "haloscan_volume", "haloscan_kd", "haloscan_cpc", "facets")
+METRICS = {"haloscan_volume": "q", "haloscan_kd": "q", "haloscan_cpc": "d"}
+
+MISSING = -1   # None : page pas encore enrichie
+NA      = -2   # "NA" : Haloscan n'a pas de valeur pour ce keyword
+
+
+def content_hash(slug, category, title, description, priority, volume, kd, cpc, facets=(), extras=()):
+    """Empreinte (16 hex) du contenu d'une page ; `facets` et `extras` en tuples de paires."""
+    blob = "\x1f".join((slug, category, title, description, priority,
+                        repr(volume), repr(kd), repr(cpc), repr(tuple(facets)), repr(tuple(extras))))
+    return blake2b(blob.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class Codes:
+    """Table d'internement valeur ↔ code entier."""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        c = self.codes.get(value)
+        if c is None:
+            c = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return c
+
+
+class PageView(MutableMapping):
+    """Une page du store, vue comme un dict."""
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, field):
+        return self._store._get(self._row, field)
+
+    def __setitem__(self, field, value):
+        self._store._set(self._row, field, value)
+
+    def __delitem__(self, field):
+        self._store._del(self._row, field)
+
+    def __iter__(self):
+        yield from FIELDS
+        yield from self._store._extras.get(self._row, ())
+
+    def __len__(self):
+        return len(FIELDS) + len(self._store._extras.get(self._row, ()))
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class PageStore(MutableMapping):
+    """Corpus slug → page stocké en colonnes."""
+
+    def __init__(self, pages=None):
+        self._index = {}
+        self._alive = bytearray()
+        self._slug = []
+        self._title = []
+        self._description = []
+        self._category = array("I")
+        self._priority = array("B")
+        self._metrics = {f: array(t) for f, t in METRICS.items()}
+        self._facets = []
+        self.categories = Codes()
+        self.priorities = Codes()
+        self._facet_keys = {}
+        self._overrides = {}   # (row, champ) → valeur non représentable en colonne
+        self._extras = {}      # row → champs hors schéma
+        if pages:
+            self.update(pages)
+
+    # ── Lignes ───────────────────────────────────────────────────────────────
+
+    def append(self, slug, category, title, description="", priority="medium", facets=None):
+        """Ajoute une page non enrichie."""
+        row = len(self._slug)
+        self._index[slug] = row
+        self._alive.append(1)
+        self._slug.append(slug)
+        self._title.append(title)
+        self._description.append(description)
+        self._category.append(self.categories.code(category))
+        self._priority.append(self.priorities.code(priority))
+        for col in self._metrics.values():
+            col.append(MISSING)
+        self._facets.append(self._intern_facets(facets))
+        return row
+
+    def extend(self, slugs, categories, titles, priorities, facets):
+        """Ajoute en lot des pages non enrichies et sans description, colonne par
+        colonne (slugs nouveaux) ; chemin rapide de la génération."""
+        start, n = len(self._slug), len(slugs)
+        self._index.update(zip(slugs, range(start, start + n)))
+        self._alive.extend(b"\x01" * n)
+        self._slug.extend(slugs)
+        self._title.extend(titles)
+        self._description.extend([""] * n)
+        self._category.extend(map(self.categories.code, categories))
+        self._priority.extend(map(self.priorities.code, priorities))
+        for col in self._metrics.values():
+            col.extend(array(col.typecode, [MISSING]) * n)
+        self._facets.extend(map(self._intern_facets, facets))
+
+    def _intern_facets(self, facets):
+        if not facets:
+            return ()
+        items = tuple(facets.items() if isinstance(facets, dict) else facets)
+        return self._facet_keys.setdefault(items, items)
+
+    def _get(self, row, field):
+        if (row, field) in self._overrides:
+            return self._overrides[(row, field)]
+        if field == "slug":
+            return self._slug[row]
+        if field == "title":
+            return self._title[row]
+        if field == "description":
+            return self._description[row]
+        if field == "category":
+            return self.categories.values[self._category[row]]
+        if field == "priority":
+            return self.priorities.values[self._priority[row]]
+        if field in self._metrics:
+            v = self._metrics[field][row]
+            return None if v == MISSING else "NA" if v == NA else v
+        if field == "facets":
+            return dict(self._facets[row])
+        return self._extras[row][field]
+
+    def _set(self, row, field, value):
+        self._overrides.pop((row, field), None)
+        if field == "slug":
+            if value != self._slug[row]:
+                raise ValueError("le slug d'une page ne se modifie pas ; supprimer puis réinsérer")
+        elif field == "title":
+            self._title[row] = value
+        elif field == "description":
+            self._description[row] = value
+        elif field == "category":
+            self._category[row] = self.categories.code(value)
+        elif field == "priority":
+            self._priority[row] = self.priorities.code(value)
+        elif field in self._metrics:
+            col = self._metrics[field]
+            if value is None:
+                col[row] = MISSING
+            elif value == "NA":
+                col[row] = NA
+            elif type(value) is (int if col.typecode == "q" else float) and value >= 0:
+                col[row] = value
+            elif col.typecode == "d" and type(value) is int and value >= 0:
+                col[row] = float(value)         # CPC entier (3 → 3.0)
+            elif col.typecode == "q" and type(value) is float and value >= 0 and value.is_integer():
+                col[row] = int(value)           # volume / KD flottant entier (1200.0 → 1200)
+            else:
+                # flottant non entier en colonne entière, chaîne inattendue… : gardé tel quel
+                col[row] = NA
+                self._overrides[(row, field)] = value
+        elif field == "facets":
+            self._facets[row] = self._intern_facets(value)
+        else:
+            self._extras.setdefault(row, {})[field] = value
+
+    def _del(self, row, field):
+        if field in FIELDS:
+            raise TypeError("les champs du schéma d'une page ne se suppriment pas")
+        extras = self._extras.get(row, {})
+        del extras[field]
+        if not extras:
+            self._extras.pop(row, None)
+
+    # ── API dict ─────────────────────────────────────────────────────────────
+
+    def __getitem__(self, slug):
+        return PageView(self, self._index[slug])
+
+    def __setitem__(self, slug, page):
+        row = self._index.get(slug)
+        if row is None:
+            row = self.append(slug, page["category"], page["title"],
+                              page.get("description", ""), page.get("priority", "medium"))
+        for field, value in page.items():
+            if field != "slug":
+                self._set(row, field, value)
+
+    def __delitem__(self, slug):
+        row = self._index.pop(slug)
+        self._alive[row] = 0
+
+    def __contains__(self, slug):
+        return slug in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def rows(self):
+        """Numéros de ligne vivants, dans l'ordre d'insertion."""
+        return (row for row, alive in enumerate(self._alive) if alive)
+
+    # ── Lecture en colonnes ──────────────────────────────────────────────────
+
+    def counts(self, field):
+        """Counter valeur → nb de pages pour category / priority."""
+        codes, table = (self._category, self.categories) if field == "category" \
+            else (self._priority, self.priorities)
+        if len(self._index) == len(self._slug):
+            c = Counter(codes)
+        else:
+            c = Counter(codes[r] for r in self.rows())
+        return Counter({table.values[k]: n for k, n in c.items()})
+
+    def slugs_by(self, field):
+        """valeur → slugs (ordre du corpus) pour category / priority."""
+        codes, table = (self._category, self.categories) if field == "category" \
+            else (self._priority, self.priorities)
+        out = {}
+        for row in self.rows():
+            out.setdefault(table.values[codes[row]], []).append(self._slug[row])
+        return out
+
+    def column(self, field):
+        """Colonne brute, indexée par numéro de ligne (lignes supprimées
+        comprises, cf. rows()) : (codes, valeurs) pour category / priority,
+        array avec MISSING / NA pour les métriques."""
+        if field == "category":
+            return self._category, self.categories.values
+        if field == "priority":
+            return self._priority, self.priorities.values
+        return self._metrics[field]
+
+    def metric_overrides(self, field):
+        """Ligne → valeur numérique d'une métrique gardée hors colonne (flottant
+        non entier en colonne entière…), que column() ne voit pas."""
+        return {row: v for (row, f), v in self._overrides.items()
+                if f == field and self._alive[row] and type(v) in (int, float)}
+
+    def row_slugs(self):
+        """Slug de chaque ligne (None pour une ligne supprimée)."""
+        return [slug if alive else None for slug, alive in zip(self._slug, self._alive)]
+
+    def content_hashes(self):
+        """slug → content_hash de chaque page, lu en colonnes."""
+        cats, prios = self.categories.values, self.priorities.values
+        vol, kd, cpc = (self._metrics[f] for f in METRICS)
+
+        def decode(v):
+            return None if v == MISSING else "NA" if v == NA else v
+
+        out = {}
+        for row in self.rows():
+            if self._overrides or row in self._extras:
+                view = PageView(self, row)
+                out[self._slug[row]] = content_hash(
+                    *(view[f] for f in FIELDS[:8]), tuple(view["facets"].items()),
+                    tuple(sorted(self._extras.get(row, {}).items())))
+                continue
+            out[self._slug[row]] = content_hash(
+                self._slug[row], cats[self._category[row]], self._title[row], self._description[row],
+                prios[self._priority[row]], decode(vol[row]), decode(kd[row]), decode(cpc[row]),
+                self._facets[row])
+        return out
+
+    def enriched_count(self):
+        col = self._metrics["haloscan_volume"]
+        return sum(1 for row in self.rows() if col[row] != MISSING or (row, "haloscan_volume") in self._overrides)
+
+    # ── Sérialisation ────────────────────────────────────────────────────────
+
+    def _encoded_rows(self, pretty=False):
+        """(slug, page en JSON) de chaque ligne vivante, dans l'ordre du corpus,
+        encodée colonne par colonne : compacte sur une ligne, ou (`pretty`) au
+        format de json.dumps(indent=2) d'une page imbriquée dans le corpus."""
+        if pretty:
+            nl, nl_facet = "\n    ", "\n      "
+            sep, colon, close = "," + nl, ": ", "\n  }"
+
+            def dump(value):
+                return json.dumps(value, ensure_ascii=False, indent=2).replace("\n", nl)
+        else:
+            nl = nl_facet = ""
+            sep, colon, close = ",", ":", "}"
+
+            def dump(value):
+                return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+        cats = [encode_basestring(v) for v in self.categories.values]
+        prios = [encode_basestring(v) for v in self.priorities.values]
+        metric_cols = [(sep + '"' + f_ + '"' + colon, f_, self._metrics[f_]) for f_ in METRICS]
+        k_slug, k_cat, k_title, k_desc, k_prio, k_facets = (
+            (sep if f_ != "slug" else "{" + nl) + '"' + f_ + '"' + colon
+            for f_ in ("slug", "category", "title", "description", "priority", "facets"))
+
+        for row in self.rows():
+            slug = self._slug[row]
+            parts = [k_slug, encode_basestring(slug),
+                     k_cat, cats[self._category[row]],
+                     k_title, encode_basestring(self._title[row]),
+                     k_desc, encode_basestring(self._description[row]),
+                     k_prio, prios[self._priority[row]]]
+            for key, field, col in metric_cols:
+                v = col[row]
+                if (row, field) in self._overrides:
+                    enc = dump(self._overrides[(row, field)])
+                elif v == MISSING:
+                    enc = "null"
+                elif v == NA:
+                    enc = '"NA"'
+                else:
+                    enc = repr(v)
+                parts += (key, enc)
+            facets = self._facets[row]
+            parts += (k_facets, "{" + nl_facet + ("," + nl_facet).join(
+                encode_basestring(k) + colon + encode_basestring(v) for k, v in facets) + nl + "}"
+                if facets else "{}")
+            for field, value in self._extras.get(row, {}).items():
+                parts += (sep, encode_basestring(field), colon, dump(value))
+            parts.append(close)
+            yield slug, "".join(parts)
+
+    def json_lines(self):
+        """(slug, page en JSON compact sur une ligne) dans l'ordre du corpus ;
+        même contenu que json.dumps(dict(page), separators=(",", ":"))."""
+        return self._encoded_rows()
+
+    def write_json(self, f):
+        """Écrit le corpus au format exact de json.dumps(pages, ensure_ascii=False, indent=2),
+        colonne par colonne, sans dict intermédiaire."""
+        if not self._index:
+            f.write("{}")
+            return
+        first = True
+        buf = []
+        for slug, page in self._encoded_rows(pretty=True):
+            buf.append(("{\n  " if first else ",\n  ") + encode_basestring(slug) + ": " + page)
+            first = False
+            if len(buf) > 4096:
+                f.write("".join(buf))
+                buf.clear()
+        buf.append("\n}")
+        f.write("".join(buf))
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Données produits pour l'affiliation (Amazon PA-API, Leroy Merlin).
+
+Chaque page est ramenée à une requête de recherche canonique, tirée de ses
+facettes : le nom du produit (titre sans les libellés de facettes ni les mots
+éditoriaux), puis les libellés des facettes dans un ordre fixe. Les facettes
+qui définissent le produit (volume, matériau, mécanisme…) entrent dans la
+requête ; celles qui ne font qu'affiner (couleur, usage, style, ville) n'y
+entrent que si la page n'a aucune facette produit. « Poubelle blanc 100L »,
+« Poubelle 100L cuisine » et « Poubelle 100L » partagent ainsi une requête :
+les appels suivent le nombre de requêtes uniques, pas le nombre de pages.
+
+Les recherches passent par une passerelle HTTP (PRODUCTS_API_URL) qui parle
+aux API marchandes ; la réponse est {"products": [{"id", "source", "title",
+"price", "url", "image"}]}. Le stub local (products_stub.py) sert le même
+contrat. PRODUCTS_API_URL n'a pas de valeur par défaut : un run sans
+passerelle explicite échoue au lieu d'écrire les fiches d'un stub.
+
+ProductStore (SQLite) garde :
+  products   id → fiche produit
+  queries    requête → ids, avec date d'expiration (une requête fraîche n'est
+             pas redemandée)
+  links      slug → requête ; slug → ids s'en déduit
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+
+from haloscan_client import ConnectionPool
+from keyword_cache import DAY, normalize_keyword
+
+API_URL     = os.environ.get("PRODUCTS_API_URL", "")
+API_KEY     = os.environ.get("PRODUCTS_API_KEY", "")
+SEARCH_PATH = os.environ.get("PRODUCTS_SEARCH_PATH", "/api/products/search")
+SOURCES     = ("amazon", "leroymerlin")
+PER_QUERY   = 10
+
+# Ordre des facettes dans la requête : facettes produit, puis d'affinage
+PRODUCT_DIMS = ("marque", "fonction", "accessoire", "mecanisme", "compartiments", "nbacs",
+                "materiau", "volume")
+REFINE_DIMS  = ("couleur", "caracteristique", "style", "usage")
+NOISE = frozenset("""
+    a à au aux avec ce ces d de des du en et il l la le les pour qu quel quelle un une
+    avis choisir comment comparatif complet faut guide meilleur meilleure meilleurs
+    meilleures pas cher prix savoir top
+""".split())
+_WORD = re.compile(r"\w+")
+
+
+class ProductError(Exception):
+    """Erreur HTTP ou réponse illisible de la passerelle produits ; `kind`
+    la classe pour les métriques (comme HaloscanError)."""
+
+    def __init__(self, message, kind="api"):
+        super().__init__(message)
+        self.kind = kind
+
+
+# ─── Requêtes canoniques ──────────────────────────────────────────────────────
+
+def _words(text):
+    return _WORD.findall(normalize_keyword(text))
+
+def canonical_query(page, labels):
+    """Requête de recherche de la page ; `labels` : (dimension, clé) → libellé
+    (content.facet_labels)."""
+    facets = page["facets"]
+    facet_words = {w for dim, key in facets.items() for w in _words(labels.get((dim, key), key))}
+    terms = [w for w in _words(page["title"]) if w not in facet_words and w not in NOISE]
+    dims = [d for d in PRODUCT_DIMS if d in facets] or [d for d in REFINE_DIMS if d in facets]
+    for dim in dims:
+        terms.extend(_words(labels.get((dim, facets[dim]), facets[dim])))
+    return " ".join(dict.fromkeys(terms))
+
+def query_groups(pages, slugs, labels):
+    """requête → slugs, dans l'ordre de `slugs`."""
+    groups = {}
+    for slug in slugs:
+        groups.setdefault(canonical_query(pages[slug], labels), []).append(slug)
+    return groups
+
+
+# ─── Client ───────────────────────────────────────────────────────────────────
+
+class ProductClient:
+    """Client de la passerelle produits partagé par tous les workers d'un run."""
+
+    def __init__(self, base_url=None, api_key=API_KEY, pool_size=8, timeout=30):
+        base_url = base_url or API_URL
+        if not base_url:
+            raise ProductError("PRODUCTS_API_URL non défini (passerelle produits, ou stub : "
+                               "http://127.0.0.1:8766)", kind="config")
+        self.pool = ConnectionPool(base_url, size=pool_size, timeout=timeout)
+        self.headers = {"Content-Type": "application/json", "Accept": "application/json",
+                        "Authorization": f"Bearer {api_key}"}
+
+    def search(self, query, limit=PER_QUERY, sources=SOURCES):
+        """Produits trouvés pour `query` (liste de fiches, éventuellement vide)."""
+        body = json.dumps({"query": query, "sources": list(sources), "limit": limit}).encode("utf-8")
+        status, raw = self.pool.request("POST", SEARCH_PATH, body, self.headers)
+        if status != 200:
+            raise ProductError(f"HTTP {status} sur {SEARCH_PATH}", kind=f"http_{status}")
+        try:
+            products = json.loads(raw)["products"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise ProductError(f"réponse JSON invalide sur {SEARCH_PATH}: {e}", kind="invalid_json") from e
+        return [p for p in products if p.get("id")]
+
+    def close(self):
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ─── Table produits ───────────────────────────────────────────────────────────
+
+class ProductStore:
+    """Produits par ID, résultats par requête (avec TTL) et liens page → requête."""
+
+    def __init__(self, path, ttl=7 * DAY):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(path), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS products (
+                id         TEXT PRIMARY KEY,
+                source     TEXT,
+                data       TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS queries (
+                query       TEXT PRIMARY KEY,
+                product_ids TEXT NOT NULL,
+                fetched_at  REAL NOT NULL,
+                expires_at  REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS links (
+                slug  TEXT PRIMARY KEY,
+                query TEXT NOT NULL
+            );""")
+        self.db.commit()
+
+    def fresh_queries(self, now=None):
+        now = time.time() if now is None else now
+        with self.lock:
+            return {q for q, in self.db.execute("SELECT query FROM queries WHERE expires_at > ?", (now,))}
+
+    def put_results(self, query, products, now=None):
+        """Enregistre les produits d'une requête (fiches mises à jour par ID)."""
+        now = time.time() if now is None else now
+        with self.lock:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?)",
+                [(p["id"], p.get("source"), json.dumps(p, ensure_ascii=False), now) for p in products])
+            self.db.execute("INSERT OR REPLACE INTO queries VALUES (?, ?, ?, ?)",
+                            (query, json.dumps([p["id"] for p in products]), now, now + self.ttl))
+            self.db.commit()
+
+    def set_links(self, groups):
+        """Remplace les liens page → requête (requête → slugs)."""
+        with self.lock:
+            self.db.execute("DELETE FROM links")
+            self.db.executemany("INSERT INTO links VALUES (?, ?)",
+                                ((slug, q) for q, slugs in groups.items() for slug in slugs))
+            self.db.commit()
+
+    def page_products(self):
+        """slug → ids produits (pages dont la requête a des résultats)."""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT l.slug, q.product_ids FROM links l JOIN queries q ON q.query = l.query").fetchall()
+        out = {}
+        for slug, ids in rows:
+            ids = json.loads(ids)
+            if ids:
+                out[slug] = ids
+        return out
+
+    def products(self, ids=None):
+        """id → fiche, pour `ids` (toutes si None)."""
+        with self.lock:
+            rows = self.db.execute("SELECT id, data FROM products").fetchall()
+        wanted = None if ids is None else set(ids)
+        return {pid: json.loads(data) for pid, data in rows if wanted is None or pid in wanted}
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Stub local de la passerelle produits — pour tester et mesurer la phase
+produits sans réseau ni clés d'API marchandes.
+
+Les produits sont déterministes (dérivés d'un hash de la requête) et tirés
+d'un catalogue fini : des requêtes différentes se partagent des IDs, comme
+avec les vraies API. Latence et taux d'erreur sont réglables.
+
+Usage :
+  python3 products_stub.py --port 8766
+  python3 products_stub.py --port 8766 --latency 0.2 --error-rate 0.02
+  PRODUCTS_API_URL=http://127.0.0.1:8766 python3 generate_pages.py --phase products
+"""
+
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from products import SEARCH_PATH, SOURCES
+
+CATALOG = 20_000   # IDs possibles par source
+
+
+def fake_products(query, sources=SOURCES, limit=10):
+    """Fiches synthétiques stables pour une requête ; ~5% sans résultat."""
+    h = int.from_bytes(hashlib.sha1(query.lower().encode("utf-8")).digest()[:8], "big")
+    if h % 100 < 5:
+        return []
+    rng = random.Random(h)
+    out = []
+    for i in range(min(limit, 3 + h % 8)):
+        source = sources[i % len(sources)]
+        n = rng.randrange(CATALOG)
+        out.append({
+            "id": f"{source}:{n:06d}",
+            "source": source,
+            "title": f"{query.capitalize()} — modèle {n}",
+            "price": round(rng.uniform(8, 400), 2),
+            "url": f"https://example.invalid/{source}/{n}",
+            "image": f"https://example.invalid/{source}/{n}.jpg",
+        })
+    return out
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, comme l'API réelle
+    latency = 0.0      # secondes ajoutées à chaque réponse
+    error_rate = 0.0   # part des requêtes qui répondent 500
+    rng = random.Random(0)
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send(400, {"error": "invalid json"})
+        if self.path != SEARCH_PATH:
+            return self._send(404, {"error": f"unknown path {self.path}"})
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            return self._send(500, {"error": "stub: erreur simulée"})
+        self._send(200, {"products": fake_products(payload.get("query", ""),
+                                                   tuple(payload.get("sources") or SOURCES),
+                                                   int(payload.get("limit") or 10))})
+
+
+def make_handler(latency=0.0, error_rate=0.0, seed=0):
+    return type("StubHandler", (StubHandler,), {
+        "latency": latency, "error_rate": error_rate, "rng": random.Random(seed),
+    })
+
+
+def serve(host="127.0.0.1", port=0, latency=0.0, error_rate=0.0):
+    """Démarre le stub dans un thread ; renvoie le serveur (server.server_address)."""
+    server = ThreadingHTTPServer((host, port), make_handler(latency, error_rate))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0, help="Latence ajoutée par requête (secondes)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Part des requêtes en erreur 500 (0-1)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.latency, args.error_rate))
+    print(f"Stub produits sur http://{args.host}:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
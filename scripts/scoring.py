@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Scoring du corpus : estimation des métriques Haloscan des pages non enrichies
+et file d'enrichissement classée par valeur attendue.
+
+Chaque page porte des caractéristiques (catégorie, facets) et une base :
+pour le volume, le volume typique de sa priorité de règle (PRIORITY_PRIOR) ;
+pour KD et CPC, la moyenne des pages enrichies. Chaque caractéristique reçoit
+l'écart moyen à leur base des pages enrichies qui la portent, rétréci vers 0
+(a priori de poids SHRINK) ; l'estimation d'une page est sa base plus la
+moyenne de ces écarts, pondérée par leur nombre d'observations. Volume et KD
+sont moyennés en log, le CPC tel quel.
+
+Les pages enrichies en premier sont les têtes de requête : une base commune
+tirée d'elles ferait passer toute page sans données pour une tête. Avec la
+base par priorité, une page « low » sans caractéristique observée reste au
+volume d'une page « low ».
+
+  valeur attendue = volume × (CPC + CPC_FLOOR) / log2(2 + KD)
+
+Les estimations ne sont pas stockées dans le corpus : elles classent la file
+d'enrichissement et, à priorité égale, les pages à décrire, les requêtes
+produits et le sitemap (ranked_slugs). La priorité d'une page ne bouge que
+sur un volume Haloscan observé.
+
+Le calcul se fait en tableaux NumPy (bincount sur les paires page ×
+caractéristique) ; sans NumPy, une implémentation en Python pur produit les
+mêmes estimations, plus lentement.
+"""
+
+import math
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel
+    np = None
+
+SHRINK = 5.0       # poids de l'a priori global, en nombre d'observations
+CPC_FLOOR = 0.1    # un keyword sans CPC garde une valeur (trafic organique)
+
+PRIORITY_RANK = {"top": 0, "high": 1, "medium": 2, "low": 3}
+# Seuils de volume mensuel observé → priorité
+PRIORITY_BANDS = (("top", 1000), ("high", 200), ("medium", 30))
+# Volume de base d'une page sans données, par priorité de règle (milieu
+# géométrique de sa tranche de PRIORITY_BANDS)
+PRIORITY_PRIOR = {"top": 2000, "high": 450, "medium": 75, "low": 10}
+QUEUE_FLOOR = "high"   # priorité minimale des pages de la file d'enrichissement
+
+
+def observed(value, na=None):
+    """Valeur Haloscan exploitable ; "NA" → `na`, None/autres → None."""
+    if value == "NA":
+        return na
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+class Scores:
+    """Métriques réelles ou estimées, alignées sur `slugs` (ordre du corpus)."""
+
+    def __init__(self, slugs, priorities, enriched, volume, kd, cpc, n_observed):
+        self.slugs = slugs
+        self.priorities = priorities    # rang de priorité (PRIORITY_RANK)
+        self.enriched = enriched        # page déjà enrichie (booléens)
+        self.volume = volume            # NaN si aucune donnée dans le corpus
+        self.kd = kd
+        self.cpc = cpc
+        self.n_observed = n_observed    # pages enrichies ayant servi à l'estimation
+
+    def value(self, i):
+        v, kd, cpc = self.volume[i], self.kd[i], self.cpc[i]
+        if math.isnan(v):
+            return 0.0
+        kd = 0.0 if math.isnan(kd) else kd
+        cpc = 0.0 if math.isnan(cpc) else cpc
+        return v * (cpc + CPC_FLOOR) / math.log2(2 + kd)
+
+
+# ─── Extraction ───────────────────────────────────────────────────────────────
+
+def _extract(pages):
+    """slugs, priorités, paires (page, caractéristique), observations par
+    métrique et base de volume (log) de chaque page."""
+    slugs, priorities, rows, cols, base = [], [], [], [], []
+    feature_ids = {}
+    obs = {"volume": [], "kd": [], "cpc": []}
+    nan = float("nan")
+    for i, (slug, p) in enumerate(pages.items()):
+        slugs.append(slug)
+        priorities.append(PRIORITY_RANK.get(p["priority"], len(PRIORITY_RANK)))
+        base.append(math.log1p(PRIORITY_PRIOR.get(p["priority"], PRIORITY_PRIOR["low"])))
+        for feat in [("category", p["category"])] + list((p.get("facets") or {}).items()):
+            fid = feature_ids.setdefault(feat, len(feature_ids))
+            rows.append(i)
+            cols.append(fid)
+        volume = observed(p["haloscan_volume"], na=0)   # NA : keyword inconnu → pas de volume
+        kd, cpc = observed(p["haloscan_kd"]), observed(p["haloscan_cpc"])
+        obs["volume"].append(nan if volume is None else math.log1p(volume))
+        obs["kd"].append(nan if kd is None else math.log1p(kd))
+        obs["cpc"].append(nan if cpc is None else float(cpc))
+    enriched = [v == v for v in obs["volume"]]   # NaN ≠ NaN
+    return slugs, priorities, rows, cols, len(feature_ids), obs, enriched, base
+
+
+# ─── Estimation ───────────────────────────────────────────────────────────────
+
+def _estimate_numpy(rows, cols, n_features, y, base=None):
+    rows, cols, y = np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64), np.asarray(y)
+    has = ~np.isnan(y)
+    if not has.any():
+        return y
+    base = np.full(len(y), y[has].mean()) if base is None else np.asarray(base)
+    known = has[rows]
+    n = np.bincount(cols[known], minlength=n_features)
+    s = np.bincount(cols[known], weights=(y - base)[rows[known]], minlength=n_features)
+    mean = s / (n + SHRINK)     # écart moyen à la base, rétréci vers 0
+    w = n / (n + SHRINK)
+    num = np.bincount(rows, weights=(w * mean)[cols], minlength=len(y))
+    den = np.bincount(rows, weights=w[cols], minlength=len(y))
+    delta = np.zeros(len(y))
+    np.divide(num, den, out=delta, where=den > 0)
+    return np.where(has, y, base + delta)
+
+def _estimate_python(rows, cols, n_features, y, base=None):
+    known = [v for v in y if v == v]
+    if not known:
+        return list(y)
+    if base is None:
+        base = [sum(known) / len(known)] * len(y)
+    n, s = [0] * n_features, [0.0] * n_features
+    for r, c in zip(rows, cols):
+        if y[r] == y[r]:
+            n[c] += 1
+            s[c] += y[r] - base[r]
+    w = [nf / (nf + SHRINK) for nf in n]
+    mean = [sf / (nf + SHRINK) for sf, nf in zip(s, n)]
+    num, den = [0.0] * len(y), [0.0] * len(y)
+    for r, c in zip(rows, cols):
+        num[r] += w[c] * mean[c]
+        den[r] += w[c]
+    return [v if v == v else base[i] + (num[i] / den[i] if den[i] > 0 else 0.0) for i, v in enumerate(y)]
+
+
+def score_pages(pages):
+    """Scores du corpus : métriques réelles quand elles existent, estimées sinon."""
+    slugs, priorities, rows, cols, n_features, obs, enriched, base = _extract(pages)
+    estimate = _estimate_numpy if np is not None else _estimate_python
+    est = {m: estimate(rows, cols, n_features, y, base if m == "volume" else None) for m, y in obs.items()}
+    if np is not None:
+        volume, kd = np.expm1(est["volume"]).tolist(), np.expm1(est["kd"]).tolist()
+        cpc = np.asarray(est["cpc"], dtype=float).tolist()
+    else:
+        volume, kd, cpc = ([math.expm1(v) for v in est["volume"]],
+                           [math.expm1(v) for v in est["kd"]], est["cpc"])
+    return Scores(slugs, priorities, enriched, volume, kd, cpc, sum(enriched))
+
+
+# ─── Utilisation ──────────────────────────────────────────────────────────────
+
+def enrichment_queue(scores, min_priority=QUEUE_FLOOR):
+    """Slugs non enrichis de priorité `min_priority` ou mieux (top et high par
+    défaut, comme la file d'origine), par valeur attendue décroissante ; à
+    égalité (corpus sans données), par priorité puis ordre du corpus."""
+    floor = PRIORITY_RANK[min_priority]
+    todo = [i for i, e in enumerate(scores.enriched) if not e and scores.priorities[i] <= floor]
+    todo.sort(key=lambda i: (-scores.value(i), scores.priorities[i], i))
+    return [scores.slugs[i] for i in todo]
+
+def ranked_slugs(scores):
+    """Corpus par priorité, puis volume (observé ou estimé) décroissant, puis
+    ordre du corpus ; sans aucune donnée, par priorité puis ordre du corpus."""
+    def key(i):
+        v = scores.volume[i]
+        return scores.priorities[i], -v if v == v else 0.0, i   # NaN : corpus sans données
+    return [scores.slugs[i] for i in sorted(range(len(scores.slugs)), key=key)]
+
+
+def priority_for(volume):
+    """Priorité que justifie un volume observé, ou None sous le dernier seuil."""
+    for priority, threshold in PRIORITY_BANDS:
+        if volume >= threshold:
+            return priority
+    return None
+
+def rescore_priorities(pages, scores):
+    """Promeut les pages enrichies dont le volume Haloscan observé dépasse les
+    seuils de PRIORITY_BANDS. Une estimation ne change jamais la priorité, et
+    rien n'est rétrogradé : la priorité des règles reste un plancher. Renvoie
+    un Counter (ancienne, nouvelle) → nb de pages."""
+    promoted = Counter()
+    for i, slug in enumerate(scores.slugs):
+        if not scores.enriched[i]:
+            continue
+        target = priority_for(scores.volume[i])
+        if target is None:
+            continue
+        page = pages[slug]
+        current = page["priority"]
+        if PRIORITY_RANK[target] < PRIORITY_RANK.get(current, len(PRIORITY_RANK)):
+            page["priority"] = target
+            promoted[(current, target)] += 1
+    return promoted
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Sélection de pages par filtres, pour les lots de déploiement.
+
+Le générateur écrit à chaque sauvegarde du corpus un index de sélection
+(select.idx) ; --select n'ouvre que ce fichier — ni taxonomie, ni corpus :
+
+  category, priority   un bitmap par valeur (entier Python, bit n = ligne n)
+  volume, kd, cpc      lignes triées par valeur + bitmaps cumulés par tranche
+                       (lignes de rang >= k × tranche) : un intervalle de
+                       valeurs = deux bitmaps cumulés, corrigés sur au plus
+                       une tranche (1/64e du corpus)
+
+Les filtres se combinent en ET, par opérations sur les bitmaps :
+
+  category~cache-poubelle*    motif (fnmatch)
+  category=composteur,abri    une valeur parmi plusieurs
+  priority>=high              top et high (ordre : top > high > medium > low)
+  volume>500   kd<20   cpc>=0.5
+  field!=valeur
+
+Les pages sans valeur (non enrichies, "NA") ne passent aucun filtre numérique.
+Le résultat est le manifest de déploiement (index/deploy.json), lu par
+src/lib/pages.ts à la place de la liste DEPLOY_SLUGS.
+
+Usage :
+  python3 selection.py 'category~cache-poubelle*' 'priority>=high'   # ou generate_pages.py --select …
+  python3 selection.py 'volume>500' 'kd<20' --dry-run
+  python3 selection.py all                                           # tout le corpus
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import pickle
+import argparse
+from array import array
+from itertools import accumulate
+from bisect import bisect_left, bisect_right
+from fnmatch import fnmatchcase
+from pathlib import Path
+from datetime import datetime
+
+from status import PRIORITIES
+
+BASE_DIR    = Path(__file__).parent.parent
+OUTPUT_DIR  = Path(os.environ.get("POUBELLES_OUTPUT_DIR", BASE_DIR / "output" / "poubelles"))
+INDEX_FILE  = OUTPUT_DIR / "select.idx"
+DEPLOY_FILE = OUTPUT_DIR / "index" / "deploy.json"
+
+VERSION = 1
+BINS = 64
+NUMERIC = {"volume": "haloscan_volume", "kd": "haloscan_kd", "cpc": "haloscan_cpc"}
+CODED = ("category", "priority")
+EXPR = re.compile(r"^\s*(\w+)\s*(~|>=|<=|!=|=|>|<)\s*(.+?)\s*$")
+_BITS = [tuple(b for b in range(8) if byte >> b & 1) for byte in range(256)]
+
+
+class SelectError(ValueError):
+    """Expression de filtre invalide."""
+
+
+# ─── Bitmaps ──────────────────────────────────────────────────────────────────
+
+def bitmap(rows, n):
+    """Bitmap (int) des numéros de ligne `rows`, sur `n` lignes."""
+    buf = bytearray((n + 7) // 8)
+    for r in rows:
+        buf[r >> 3] |= 1 << (r & 7)
+    return int.from_bytes(buf, "little")
+
+def bitmap_rows(bm, n):
+    """Numéros de ligne des bits à 1, dans l'ordre."""
+    for i, byte in enumerate(bm.to_bytes((n + 7) // 8, "little")):
+        if byte:
+            base = i * 8
+            for b in _BITS[byte]:
+                yield base + b
+
+
+# ─── Construction ─────────────────────────────────────────────────────────────
+
+def build_index(pages):
+    """Index de sélection d'un PageStore, lu en colonnes."""
+    slugs = pages.row_slugs()
+    n = len(slugs)
+    alive = (1 << n) - 1 if len(pages) == n else bitmap((r for r, s in enumerate(slugs) if s is not None), n)
+    index = {"version": VERSION, "n": n, "alive": alive}
+
+    for field in CODED:
+        codes, values = pages.column(field)
+        rows = [[] for _ in values]
+        for r, c in enumerate(codes):
+            rows[c].append(r)
+        index[field] = {v: bitmap(rs, n) for v, rs in zip(values, rows) if rs}
+
+    for name, field in NUMERIC.items():
+        col = pages.column(field)
+        typecode = col.typecode
+        extra = pages.metric_overrides(field)
+        if extra:
+            # valeurs hors colonne (PageStore._overrides) : colonne flottante recomposée
+            col = array("d", col)
+            for r, v in extra.items():
+                col[r] = v
+            typecode = "d"
+        order = sorted((r for r in range(n) if col[r] >= 0), key=col.__getitem__)
+        step = max(1, -(-len(order) // BINS))
+        # ge[b] : lignes de rang >= b × step ; ge[-1] vide
+        ge = [0] * (-(-len(order) // step) + 1)
+        for b in range(len(ge) - 2, -1, -1):
+            ge[b] = ge[b + 1] | bitmap(order[b * step:(b + 1) * step], n)
+        index[name] = {"values": array(typecode, (col[r] for r in order)),
+                       "rows": array("I", order), "step": step, "ge": ge}
+
+    encoded = [(s or "").encode("utf-8") for s in slugs]
+    index["slugs"] = b"\n".join(encoded)
+    index["offsets"] = array("Q", accumulate((len(s) + 1 for s in encoded), initial=0))
+    return index
+
+def write_index(pages, path=INDEX_FILE):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(build_index(pages), f, pickle.HIGHEST_PROTOCOL)
+    tmp.replace(path)
+
+def read_index(path=INDEX_FILE):
+    with open(path, "rb") as f:
+        index = pickle.load(f)
+    if index.get("version") != VERSION:
+        raise SelectError(f"{path} : version d'index inconnue, relancer une phase du générateur")
+    return index
+
+
+# ─── Filtres ──────────────────────────────────────────────────────────────────
+
+def _from_rank(num, p, n):
+    """Bitmap des lignes de rang >= p dans l'ordre trié de la colonne : bitmap
+    cumulé de la tranche suivante + le reste de la tranche de p."""
+    b = -(-p // num["step"])
+    return num["ge"][b] | bitmap(num["rows"][p:b * num["step"]], n)
+
+def _rank_range(num, lo, hi, n):
+    """Bitmap des lignes de rang [lo, hi)."""
+    if lo >= hi:
+        return 0
+    return _from_rank(num, lo, n) & ~_from_rank(num, hi, n)
+
+def parse(expr):
+    m = EXPR.match(expr)
+    if not m:
+        raise SelectError(f"expression illisible : {expr!r} (ex. priority>=high, volume>500)")
+    field, op, value = m.groups()
+    if field not in CODED and field not in NUMERIC:
+        raise SelectError(f"champ inconnu : {field} (champs : {', '.join(CODED + tuple(NUMERIC))})")
+    if field in NUMERIC:
+        if op == "~":
+            raise SelectError(f"{field} : ~ ne s'applique qu'à category et priority")
+        try:
+            value = float(value)
+        except ValueError:
+            raise SelectError(f"{field} : valeur numérique attendue, pas {value!r}") from None
+    return field, op, value
+
+def evaluate(index, field, op, value):
+    """Bitmap des lignes qui passent le filtre."""
+    if field in NUMERIC:
+        num = index[field]
+        values = num["values"]
+        lo, hi = bisect_left(values, value), bisect_right(values, value)
+        ranges = {">": [(hi, len(values))], ">=": [(lo, len(values))],
+                  "<": [(0, lo)], "<=": [(0, hi)], "=": [(lo, hi)],
+                  "!=": [(0, lo), (hi, len(values))]}[op]
+        out = 0
+        for a, b in ranges:
+            out |= _rank_range(num, a, b, index["n"])
+        return out
+
+    bitmaps = index[field]
+    if op == "~":
+        keep = [v for v in bitmaps if fnmatchcase(v, value)]
+    elif op in ("=", "!="):
+        wanted = set(value.split(","))
+        keep = [v for v in bitmaps if (v in wanted) == (op == "=")]
+    elif field == "priority":
+        if value not in PRIORITIES:
+            raise SelectError(f"priorité inconnue : {value} ({', '.join(PRIORITIES)})")
+        # top > high > medium > low : >= high garde les rangs <= celui de high
+        rank = {p: i for i, p in enumerate(PRIORITIES)}
+        test = {">": lambda r: r < rank[value], ">=": lambda r: r <= rank[value],
+                "<": lambda r: r > rank[value], "<=": lambda r: r >= rank[value]}[op]
+        keep = [v for v in bitmaps if test(rank.get(v, len(PRIORITIES)))]
+    else:
+        raise SelectError(f"{field} : opérateurs ~, =, != seulement")
+    out = 0
+    for v in keep:
+        out |= bitmaps[v]
+    return out
+
+def select(index, exprs):
+    """Bitmap des pages qui passent tous les filtres (ET) ; « all » = tout."""
+    bm = index["alive"]
+    for expr in exprs:
+        if expr != "all":
+            bm &= evaluate(index, *parse(expr))
+    return bm
+
+def slugs_of(index, bm):
+    blob, offsets = index["slugs"], index["offsets"]
+    return [blob[offsets[r]:offsets[r + 1] - 1].decode("utf-8") for r in bitmap_rows(bm, index["n"])]
+
+
+# ─── Manifest de déploiement ──────────────────────────────────────────────────
+
+def write_deploy(slugs, exprs, path=DEPLOY_FILE):
+    """index/deploy.json ; slugs null = tout le corpus (filtre « all » seul)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    everything = all(e == "all" for e in exprs)
+    manifest = {"generated_at": datetime.now().isoformat(timespec="seconds"),
+                "filters": list(exprs), "count": len(slugs),
+                "slugs": None if everything else slugs}
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=1))
+    tmp.replace(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sélection de pages (select.idx) → manifest de déploiement")
+    parser.add_argument("exprs", nargs="+", metavar="FILTRE",
+                        help="category~cache-poubelle*, priority>=high, volume>500, kd<20… (ET) ; all = tout")
+    parser.add_argument("--dry-run", action="store_true", help="Compter sans écrire le manifest")
+    parser.add_argument("--out", type=Path, default=DEPLOY_FILE, help="Manifest de déploiement")
+    args = parser.parse_args(argv)
+
+    if not INDEX_FILE.exists():
+        print(f"Pas d'index de sélection ({INDEX_FILE}) : lancer une phase du générateur", file=sys.stderr)
+        return 1
+    index = read_index()
+    t0 = time.perf_counter()
+    try:
+        bm = select(index, args.exprs)
+    except SelectError as e:
+        print(f"Filtre invalide : {e}", file=sys.stderr)
+        return 2
+    elapsed = (time.perf_counter() - t0) * 1000
+    print(f"{bm.bit_count()} pages sur {index['alive'].bit_count()} ({elapsed:.1f} ms) : {' ET '.join(args.exprs)}")
+    if not args.dry_run:
+        slugs = slugs_of(index, bm)
+        write_deploy(slugs, args.exprs, args.out)
+        print(f"Manifest de déploiement : {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Génération parallèle : les règles à dérouler sont découpées en tranches
+(une par valeur de leur première dimension, cf. Rule.split) et réparties sur
+un pool de process. Chaque worker écrit sa tranche dans un fichier (pages en
+colonnes, pickle) ; le process principal relit les tranches dans l'ordre série
+— règle par règle, tranche par tranche — et les passe à add_page, qui garde
+la première page de chaque slug comme en série : sortie identique octet pour
+octet.
+
+Les gabarits contiennent des lambdas (priorités, filtres where) : les workers
+héritent des règles par fork au lieu de les recevoir sérialisées. Sans fork
+(Windows), la génération reste série.
+"""
+
+import os
+import pickle
+import shutil
+import tempfile
+import multiprocessing
+
+_SPLITS = {}     # n° de règle → tranches, calculées avant le fork et héritées par les workers
+
+
+def rule_records(rule):
+    """Pages d'une règle sous forme de tuples (catégorie, slug, titre, priorité,
+    règle, facets) ; facets = ((dimension, clé), ...)."""
+    for page in rule.expand():
+        yield (page.category, page.slug, page.title, page.priority, page.rule,
+               tuple((dim, f.key) for dim, f in page.facets.items()))
+
+
+def _expand_shard(task):
+    rule_no, shard_no, path = task
+    rule = _SPLITS[rule_no][shard_no]
+    # En colonnes : moins d'objets à relire (et à suivre par le GC) qu'une liste de tuples
+    columns = [list(col) for col in zip(*rule_records(rule))]
+    with open(path, "wb") as f:
+        pickle.dump(columns, f, pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+class ShardPool:
+    """Déroule en parallèle les règles `todo` (indices dans `rules`) ;
+    records(n) rend les pages de la règle n dans l'ordre série. Les règles
+    doivent être consommées dans l'ordre croissant de `todo`."""
+
+    def __init__(self, rules, todo, jobs, tmp_root=None):
+        self.pool = None
+        self.todo = list(todo)
+        if jobs <= 1 or not self.todo or "fork" not in multiprocessing.get_all_start_methods():
+            return
+        global _SPLITS
+        _SPLITS = {n: rules[n].split() for n in self.todo}
+        self.tmp = tempfile.mkdtemp(prefix="shards-", dir=tmp_root)
+        self.tasks = [(n, s) for n in self.todo for s in range(len(_SPLITS[n]))]
+        self.pool = multiprocessing.get_context("fork").Pool(jobs)
+        self.results = self.pool.imap(
+            _expand_shard,
+            [(n, s, os.path.join(self.tmp, f"{n:04d}-{s:05d}.pkl")) for n, s in self.tasks])
+        self.next = 0
+
+    @property
+    def parallel(self):
+        return self.pool is not None
+
+    def records(self, rule_no):
+        while self.next < len(self.tasks) and self.tasks[self.next][0] == rule_no:
+            self.next += 1
+            path = next(self.results)
+            with open(path, "rb") as f:
+                columns = pickle.load(f)
+            os.unlink(path)
+            yield from zip(*columns)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            shutil.rmtree(self.tmp, ignore_errors=True)
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
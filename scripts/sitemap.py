@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Sitemaps XML du site, en flux depuis le corpus.
+
+Les URLs partent dans l'ordre des priorités (top, high, medium, low ; volume
+observé ou estimé décroissant à priorité égale) et sont découpées en fichiers de MAX_URLS URLs
+au plus (limite du protocole : 50 000), compressés en gzip :
+
+  sitemap.xml              index : un <sitemap> par fichier, lastmod = le plus récent de ses URLs
+  sitemap-0001.xml.gz      <urlset> de MAX_URLS URLs au plus
+  sitemap-0002.xml.gz      …
+
+Un fichier d'état (hors du répertoire publié) garde l'empreinte de chaque
+fichier.
+
+Le XML est écrit URL par URL dans le flux gzip, jamais construit en mémoire.
+lastmod vient du manifest (date du dernier changement de hash de la page).
+Un fichier dont les URLs et lastmod n'ont pas changé depuis le run précédent
+n'est pas réécrit (même empreinte) : son mtime et son ETag restent stables.
+
+Les fichiers sont à servir à la racine du site (public/ de Next.js) : un
+sitemap ne peut lister que des URLs de son répertoire.
+"""
+
+import os
+import gzip
+import json
+import itertools
+from hashlib import blake2b
+from xml.sax.saxutils import escape
+
+SITE_URL = os.environ.get("POUBELLES_SITE_URL", "https://cache-poubelle.fr").rstrip("/")
+MAX_URLS = 50_000
+INDEX_NAME = "sitemap.xml"
+XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+def shard_name(n):
+    return f"sitemap-{n:04d}.xml.gz"
+
+def url_entries(slugs, lastmod):
+    """(slug, lastmod | None) dans l'ordre de `slugs` (scoring.ranked_slugs)."""
+    for slug in slugs:
+        yield slug, lastmod.get(slug)
+
+
+def _digest(site_url, entries):
+    h = blake2b(site_url.encode("utf-8"), digest_size=16)
+    for slug, day in entries:
+        h.update(f"\n{slug}\t{day or ''}".encode("utf-8"))
+    return h.hexdigest()
+
+def _write_shard(path, site_url, entries):
+    """<urlset> écrit entrée par entrée dans le flux gzip (mtime 0 : octets stables)."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as raw, gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as gz:
+        gz.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{XMLNS}">\n'.encode("utf-8"))
+        for slug, day in entries:
+            line = f"<url><loc>{escape(f'{site_url}/{slug}')}</loc>"
+            if day:
+                line += f"<lastmod>{day}</lastmod>"
+            gz.write((line + "</url>\n").encode("utf-8"))
+        gz.write(b"</urlset>\n")
+    tmp.replace(path)
+
+def write_sitemaps(entries, out_dir, state_path, site_url=SITE_URL, max_urls=MAX_URLS):
+    """Écrit les fichiers du sitemap et l'index dans `out_dir` ; seuls les
+    fichiers dont le contenu change sont réécrits (empreintes dans
+    `state_path`). Renvoie {urls, shards, written, removed}."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        previous = json.loads(state_path.read_text())
+    except (OSError, ValueError):
+        previous = {}
+
+    shards, written, urls = {}, 0, 0
+    entries = iter(entries)
+    for n in itertools.count(1):
+        chunk = list(itertools.islice(entries, max_urls))   # une tranche en mémoire, pas le XML
+        if not chunk:
+            break
+        name = shard_name(n)
+        digest = _digest(site_url, chunk)
+        days = [d for _, d in chunk if d]
+        shards[name] = {"digest": digest, "urls": len(chunk), "lastmod": max(days) if days else None}
+        urls += len(chunk)
+        if previous.get(name, {}).get("digest") != digest or not (out_dir / name).exists():
+            _write_shard(out_dir / name, site_url, chunk)
+            written += 1
+
+    removed = 0
+    for stale in out_dir.glob("sitemap-*.xml.gz"):
+        if stale.name not in shards:
+            stale.unlink()
+            removed += 1
+
+    lines = [f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{XMLNS}">']
+    for name, info in shards.items():
+        lastmod = f"<lastmod>{info['lastmod']}</lastmod>" if info["lastmod"] else ""
+        lines.append(f"<sitemap><loc>{escape(f'{site_url}/{name}')}</loc>{lastmod}</sitemap>")
+    lines.append("</sitemapindex>\n")
+    index = "\n".join(lines)
+    index_path = out_dir / INDEX_NAME
+    if not index_path.exists() or index_path.read_text(encoding="utf-8") != index:
+        tmp = index_path.with_name(index_path.name + ".tmp")
+        tmp.write_text(index, encoding="utf-8")
+        tmp.replace(index_path)
+
+    state_path.write_text(json.dumps(shards, indent=2))
+    return {"urls": urls, "shards": len(shards), "written": written, "removed": removed}
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Résumé du corpus (status.json), réécrit par le générateur à chaque
+sauvegarde de pages.json : totaux, pages par priorité et par catégorie,
+pages enrichies / restantes, état de la file du démon, dernier run.
+
+--status ne lit que ce fichier — ni taxonomie, ni corpus — : la supervision
+coûte la même chose quelle que soit la taille du corpus. Ce module n'importe
+que la bibliothèque standard.
+
+Usage :
+  python3 status.py                 # ou generate_pages.py --status
+  python3 status.py --short         # une ligne (monitor.sh)
+  python3 status.py --json
+"""
+
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+BASE_DIR    = Path(__file__).parent.parent
+OUTPUT_DIR  = Path(os.environ.get("POUBELLES_OUTPUT_DIR", BASE_DIR / "output" / "poubelles"))
+STATUS_FILE = OUTPUT_DIR / "status.json"
+
+PRIORITIES = ("top", "high", "medium", "low")
+
+
+def write_status(status, path=STATUS_FILE):
+    """Écrit le résumé dans un fichier temporaire puis le renomme."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(status, ensure_ascii=False, indent=2))
+    tmp.replace(path)
+
+def read_status(path=STATUS_FILE):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def run_state(run):
+    """« terminé », « en cours » ou « interrompu » (process disparu sans finir)."""
+    if run.get("finished_at"):
+        return "terminé"
+    return "en cours" if run.get("pid") and _alive(run["pid"]) else "interrompu"
+
+def _hhmm(ts):
+    return datetime.fromisoformat(ts).strftime("%d/%m %H:%M") if ts else "—"
+
+
+def format_short(status):
+    queue = status.get("queue") or {}
+    run = status.get("run") or {}
+    line = (f"{status['total']} pages, {status['enriched']} enrichies, {status['remaining']} restantes")
+    if queue:
+        line += (f" — file : {queue.get('pending', 0)} en attente, {queue.get('leased', 0)} en cours, "
+                 f"{queue.get('dead', 0)} dead-letter")
+    if run:
+        line += f" — dernier run : {run['phase']} {run_state(run)} ({_hhmm(run.get('started_at'))})"
+    return line
+
+def format_status(status):
+    """Même présentation que print_stats, plus la file et les runs."""
+    lines = [f"\n{'='*50}",
+             f"TOTAL PAGES : {status['total']}",
+             f"Enrichies Haloscan : {status['enriched']}",
+             f"Restant à enrichir : {status['remaining']}",
+             "\nPar priorité :"]
+    for prio in PRIORITIES:
+        lines.append(f"  {prio:8s} : {status['by_priority'].get(prio, 0)}")
+    lines.append("\nTop 10 catégories :")
+    for cat, count in sorted(status["by_category"].items(), key=lambda kv: -kv[1])[:10]:
+        lines.append(f"  {cat:40s} : {count}")
+    queue = status.get("queue")
+    if queue:
+        lines.append("\nFile du démon :")
+        for state in ("pending", "leased", "done", "dead"):
+            lines.append(f"  {state:8s} : {queue.get(state, 0)}")
+    lines.append("")
+    run = status.get("run")
+    if run:
+        lines.append(f"Run {run['phase']} (pid {run.get('pid')}) : {run_state(run)}, "
+                     f"démarré {_hhmm(run.get('started_at'))}, fini {_hhmm(run.get('finished_at'))}")
+    last = status.get("last_finished")
+    if last and last != run:
+        lines.append(f"Dernier run terminé : {last['phase']}, fini {_hhmm(last.get('finished_at'))}")
+    lines.append(f"Résumé mis à jour : {_hhmm(status.get('updated_at'))}")
+    lines.append(f"{'='*50}\n")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Résumé du corpus, lu depuis status.json")
+    parser.add_argument("--short", action="store_true", help="Une seule ligne")
+    parser.add_argument("--json", action="store_true", help="Le fichier tel quel")
+    args = parser.parse_args(argv)
+
+    status = read_status()
+    if status is None:
+        print(f"Pas de résumé ({STATUS_FILE}) : lancer une phase du générateur", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(status, ensure_ascii=False, indent=2))
+    elif args.short:
+        print(format_short(status))
+    else:
+        print(format_status(status))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
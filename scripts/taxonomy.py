@@ -0,0 +1,690 @@
+#!/usr/bin/env python3
+"""
+Taxonomie déclarative — dimensions, règles de combinaison et gabarits de pages.
+
+Chaque Rule déclare :
+  - les dimensions croisées (produit cartésien paresseux via itertools.product),
+  - un prédicat `where` optionnel qui élague les combinaisons interdites,
+  - un ou plusieurs gabarits Page (slug, titre, priorité, catégorie),
+  - des règles enfants, évaluées pour chaque combinaison du parent (ce qui
+    conserve l'ordre d'émission des anciennes boucles imbriquées).
+
+Dans un gabarit, `{usage}` donne la forme slug de la clé du facet (normalisée
+une seule fois, à la déclaration de la dimension) et `{usage.label}` son
+libellé (pour le titre).
+
+plan(RULES) compte les pages produites par chaque règle sans rien générer ;
+generate_pages.py --phase plan l'affiche.
+"""
+
+import re
+import itertools
+import unicodedata
+from functools import lru_cache
+from collections import namedtuple
+
+# ─── Slugs ────────────────────────────────────────────────────────────────────
+
+# Ce que la décomposition NFKD ne ramène pas à l'ASCII, plus la ponctuation
+# qui disparaît ou devient un tiret.
+_SLUG_TABLE = str.maketrans({
+    "œ": "oe", "æ": "ae", "ß": "ss", "ø": "o", "ł": "l", "đ": "d",
+    "'": None, "’": None, "`": None,
+    " ": "-", "_": "-", "/": "-", "\u00a0": "-",
+})
+_NON_SLUG = re.compile(r"[^a-z0-9]+")
+
+@lru_cache(maxsize=None)
+def slug_part(text):
+    """Forme slug d'un fragment : minuscules, sans accents, [a-z0-9] séparés par des tirets."""
+    text = unicodedata.normalize("NFKD", text.strip().lower().translate(_SLUG_TABLE))
+    text = text.encode("ascii", "ignore").decode("ascii")
+    return _NON_SLUG.sub("-", text).strip("-")
+
+def make_slug(*parts):
+    return "-".join(slug_part(p) for p in parts if p)
+
+# ─── Moteur ───────────────────────────────────────────────────────────────────
+
+class Facet(namedtuple("Facet", "dim key label slug")):
+    """Une valeur de dimension ; se formate en la forme slug de sa clé."""
+    __slots__ = ()
+
+    def __format__(self, spec):
+        return format(self.slug, spec)
+
+    @property
+    def cap(self):
+        return self.label.capitalize()
+
+class Dimension:
+    def __init__(self, name, values):
+        self.name = name
+        self.facets = tuple(Facet(name, k, v, slug_part(k)) for k, v in values.items())
+
+    def subset(self, keys):
+        """Sous-ensemble autorisé, dans l'ordre de la dimension."""
+        keys = set(keys)
+        return Dimension(self.name, {f.key: f.label for f in self.facets if f.key in keys})
+
+    def __len__(self):
+        return len(self.facets)
+
+class Page:
+    """Gabarit de page ; priority peut être une fonction de la combinaison."""
+    __slots__ = ("slug", "title", "priority", "category")
+
+    def __init__(self, slug, title, priority="medium", category=None):
+        self.slug = slug
+        self.title = title
+        self.priority = priority
+        self.category = category
+
+GeneratedPage = namedtuple("GeneratedPage", "category slug title priority rule facets")
+
+class Rule:
+    def __init__(self, name, category, dims=(), pages=(), where=None, children=(), label=None):
+        self.name = name
+        self.category = category
+        self.dims = tuple(dims)
+        self.pages = tuple(pages)
+        self.where = where
+        self.children = tuple(children)
+        self.label = label or name
+
+    def combos(self, env=None):
+        """Combinaisons autorisées (dict dimension → Facet), parent inclus."""
+        env = env or {}
+        names = [d.name for d in self.dims]
+        for values in itertools.product(*(d.facets for d in self.dims)):
+            combo = dict(env)
+            combo.update(zip(names, values))
+            if self.where is None or self.where(combo):
+                yield combo
+
+    def count_combos(self, env=None):
+        if self.where is None:
+            n = 1
+            for d in self.dims:
+                n *= len(d)
+            return n
+        return sum(1 for _ in self.combos(env))
+
+    def expand(self, env=None):
+        """Pages de la règle et de ses enfants, générées à la demande."""
+        for combo in self.combos(env):
+            for tpl in self.pages:
+                priority = tpl.priority(combo) if callable(tpl.priority) else tpl.priority
+                yield GeneratedPage(tpl.category or self.category,
+                                    tpl.slug.format(**combo), tpl.title.format(**combo),
+                                    priority, self.name, combo)
+            for child in self.children:
+                yield from child.expand(combo)
+
+    def split(self):
+        """Une sous-règle par valeur de la première dimension : déroulées dans
+        l'ordre, elles produisent exactement les pages de la règle."""
+        if not self.dims or len(self.dims[0]) <= 1:
+            return [self]
+        lead, rest = self.dims[0], self.dims[1:]
+        return [Rule(self.name, self.category, (lead.subset([f.key]),) + rest, self.pages,
+                     self.where, self.children, self.label) for f in lead.facets]
+
+def plan(rules):
+    """[(rule, nb de pages)] pour chaque règle et sous-règle, avant dédoublonnage."""
+    report = []
+
+    def visit(rule, envs):
+        n = sum(rule.count_combos(env) for env in envs())
+        report.append((rule, n * len(rule.pages)))
+        for child in rule.children:
+            visit(child, lambda: (c for env in envs() for c in rule.combos(env)))
+
+    for rule in rules:
+        visit(rule, lambda: [{}])
+    return report
+
+def static(name, category, entries, priority, label=None):
+    """Règle sans dimension : une liste (slug, titre) écrite à la main."""
+    return Rule(name, category, pages=[Page(make_slug(s), t, priority) for s, t in entries], label=label)
+
+# ─── Taxonomie complète ───────────────────────────────────────────────────────
+
+# Types principaux
+TYPES_PRINCIPAUX = {
+    "poubelle": "Poubelle",
+    "corbeille": "Corbeille à papier",
+    "bac": "Bac",
+    "container": "Container",
+    "poubelle-roulante": "Poubelle roulante",
+}
+
+# Usages / fonctions
+USAGES = {
+    "cuisine":           "cuisine",
+    "salle-de-bain":     "salle de bain",
+    "bureau":            "bureau",
+    "salon":             "salon",
+    "chambre":           "chambre",
+    "garage":            "garage",
+    "jardin":            "jardin",
+    "exterieur":         "extérieur",
+    "terrasse":          "terrasse",
+    "cave":              "cave",
+    "van":               "van",
+    "camping-car":       "camping-car",
+    "camping":           "camping",
+    "bateaux":           "bateau",
+    "restaurant":        "restaurant",
+    "hotel":             "hôtel",
+    "bureau-open-space": "open space",
+    "ecole":             "école",
+    "hopital":           "hôpital",
+    "collectivites":     "collectivités",
+    "industrie":         "industrie",
+}
+
+# Usages fonctionnels (type de déchet)
+FONCTIONS = {
+    "ordures-menageres":   "ordures ménagères",
+    "tri-selectif":        "tri sélectif",
+    "recyclage-papier":    "recyclage papier",
+    "recyclage-plastique": "recyclage plastique",
+    "recyclage-verre":     "recyclage verre",
+    "compost":             "compost",
+    "biodechets":          "biodéchets",
+    "carton":              "carton",
+    "metal":               "métal",
+    "alimentaire":         "déchets alimentaires",
+    "sanitaire":           "déchets sanitaires",
+    "couches":             "couches bébé",
+    "medical":             "déchets médicaux",
+    "electronique":        "DEEE",
+}
+
+# Matériaux
+MATERIAUX = {
+    "plastique":  "plastique",
+    "inox":       "inox",
+    "acier":      "acier",
+    "bambou":     "bambou",
+    "bois":       "bois",
+    "rotin":      "rotin",
+    "osier":      "osier",
+    "metal":      "métal",
+    "aluminium":  "aluminium",
+    "cuir":       "cuir",
+    "tissu":      "tissu",
+    "silicone":   "silicone",
+    "beton":      "béton",
+    "resine":     "résine",
+    "pierre":     "pierre",
+    "chrome":     "chrome",
+    "zinc":       "zinc",
+}
+
+# Couleurs
+COULEURS = {
+    "blanc":    "blanc",
+    "noir":     "noir",
+    "gris":     "gris",
+    "beige":    "beige",
+    "marron":   "marron",
+    "rouge":    "rouge",
+    "bleu":     "bleu",
+    "vert":     "vert",
+    "rose":     "rose",
+    "jaune":    "jaune",
+    "orange":   "orange",
+    "violet":   "violet",
+    "or":       "or",
+    "cuivre":   "cuivre",
+    "argent":   "argent",
+    "turquoise":"turquoise",
+    "nude":     "nude",
+    "anthracite":"anthracite",
+    "taupe":    "taupe",
+    "emeraude": "émeraude",
+}
+
+# Volumes / tailles
+VOLUMES = {
+    "1l": "1L", "2l": "2L", "3l": "3L", "5l": "5L",
+    "7l": "7L", "8l": "8L", "10l": "10L", "12l": "12L",
+    "15l": "15L", "16l": "16L", "20l": "20L", "25l": "25L",
+    "30l": "30L", "40l": "40L", "50l": "50L", "60l": "60L",
+    "70l": "70L", "80l": "80L", "90l": "90L", "100l": "100L",
+    "120l": "120L", "140l": "140L", "180l": "180L",
+    "240l": "240L", "360l": "360L", "600l": "600L", "1100l": "1100L",
+}
+
+# Mécanismes d'ouverture
+MECANISMES = {
+    "pedale":        "à pédale",
+    "automatique":   "automatique",
+    "capteur":       "à capteur",
+    "balancier":     "à balancier",
+    "push":          "à couvercle push",
+    "couvercle":     "avec couvercle",
+    "sans-couvercle":"sans couvercle",
+    "rabattable":    "à couvercle rabattable",
+    "coulissant":    "coulissant",
+}
+
+# Nombre de compartiments
+COMPARTIMENTS = {
+    "1-bac": "1 bac", "2-bacs": "2 bacs",
+    "3-bacs": "3 bacs", "4-bacs": "4 bacs", "5-bacs": "5 bacs",
+}
+
+# Styles design
+STYLES = {
+    "design":       "design",
+    "minimaliste":  "minimaliste",
+    "scandinave":   "scandinave",
+    "industriel":   "industriel",
+    "vintage":      "vintage",
+    "retro":        "rétro",
+    "moderne":      "moderne",
+    "luxe":         "luxe",
+    "fantaisie":    "fantaisie",
+    "enfant":       "pour enfant",
+    "fun":          "fun",
+    "deco":         "décoratif",
+    "transparent":  "transparent",
+    "personnalisable":"personnalisable",
+}
+
+# Caractéristiques spéciales
+CARACTERISTIQUES = {
+    "anti-odeur":       "anti-odeur",
+    "filtre-charbon":   "filtre à charbon",
+    "etanche":          "étanche",
+    "avec-roues":       "avec roues",
+    "empilable":        "empilable",
+    "compresseur":      "avec compresseur",
+    "demontable":       "démontable",
+    "silencieux":       "silencieux",
+    "verrouillable":    "verrouillable",
+    "mural":            "mural",
+    "encastrable":      "encastrable",
+    "pliant":           "pliable",
+    "suspendu":         "suspendu",
+    "portable":         "portable",
+}
+
+# Marques (affiliation)
+MARQUES = {
+    "brabantia":    "Brabantia",
+    "simplehuman":  "simplehuman",
+    "joseph-joseph":"Joseph Joseph",
+    "ikea":         "IKEA",
+    "addis":        "Addis",
+    "curver":       "Curver",
+    "authentics":   "Authentics",
+    "wesco":        "Wesco",
+    "burak":        "Burak",
+    "rotho":        "Rotho",
+    "sulo":         "Sulo",
+    "vileda":       "Vileda",
+    "elletipi":     "Elletipi",
+    "umbra":        "Umbra",
+    "alessi":       "Alessi",
+    "magis":        "Magis",
+}
+
+# Produits connexes / cache-poubelle
+CACHE_POUBELLE_MATERIAUX = {
+    "bois":    "bois", "metal": "métal", "pvc": "PVC",
+    "resine":  "résine", "beton": "béton", "osier": "osier",
+    "rotin":   "rotin", "bambou": "bambou", "acier": "acier",
+    "grillage":"grillage", "parpaing": "parpaing",
+}
+
+CACHE_POUBELLE_NBACS = {
+    "1-bac": "1 bac", "2-bacs": "2 bacs",
+    "3-bacs": "3 bacs", "4-bacs": "4 bacs",
+}
+
+# Accessoires
+ACCESSOIRES = {
+    "sac-poubelle":           "sac poubelle",
+    "sac-compostable":        "sac compostable",
+    "sac-biodegradable":      "sac biodégradable",
+    "filtre-a-charbon":       "filtre à charbon",
+    "chariot-poubelle":       "chariot poubelle",
+    "support-poubelle":       "support poubelle",
+    "couvercle-remplacement": "couvercle de remplacement",
+    "pedal-remplacement":     "pédale de remplacement",
+    "bac-interieur":          "bac intérieur",
+    "notice-tri":             "notice de tri",
+    "autocollant-tri":        "autocollant tri sélectif",
+    "seau-compost":           "seau compost",
+    "composteur":             "composteur",
+    "vermicomposteur":        "vermicomposteur",
+    "bac-collecte":           "bac de collecte",
+}
+
+# Sacs poubelle (dimensions)
+SAC_VOLUMES = ["10l","15l","20l","25l","30l","35l","40l","45l","50l",
+               "60l","70l","80l","100l","110l","130l","150l","240l"]
+
+
+# Cache-poubelle × usage (ordre éditorial, pas celui de USAGES)
+CACHE_POUBELLE_USAGES = {
+    "exterieur": "extérieur", "jardin": "jardin",
+    "terrasse":  "terrasse",  "garage": "garage",
+}
+
+# Pages locales / géographiques
+VILLES = [
+    "paris","lyon","marseille","toulouse","nice","nantes","bordeaux",
+    "strasbourg","lille","rennes","reims","saint-etienne","toulon",
+    "grenoble","dijon","angers","nimes","villeurbanne","le-mans",
+    "aix-en-provence","clermont-ferrand","brest","limoges","tours",
+    "amiens","metz","besancon","perpignan","orleans","rouen",
+    "mulhouse","caen","nancy","argenteuil","montreuil","versailles"
+]
+
+# ─── Pages éditoriales (listes fixes) ─────────────────────────────────────────
+
+COMPARATIFS = [
+    ("comparatif-poubelle-cuisine", "Comparatif poubelles de cuisine"),
+    ("comparatif-poubelle-tri", "Comparatif poubelles de tri sélectif"),
+    ("comparatif-poubelle-automatique", "Comparatif poubelles automatiques"),
+    ("comparatif-poubelle-compost", "Comparatif poubelles à compost"),
+    ("comparatif-poubelle-inox", "Comparatif poubelles inox"),
+    ("comparatif-poubelle-bambou", "Comparatif poubelles bambou"),
+    ("comparatif-poubelle-pedale", "Comparatif poubelles à pédale"),
+    ("comparatif-cache-poubelle", "Comparatif cache-poubelle extérieur"),
+    ("comparatif-simplehuman-brabantia", "Comparatif simplehuman vs Brabantia"),
+    ("comparatif-poubelle-enfant", "Comparatif poubelles enfant"),
+    ("comparatif-composteur-interieur", "Comparatif composteurs intérieurs"),
+    ("comparatif-bac-roulant", "Comparatif bacs roulants"),
+]
+
+GUIDES = [
+    ("comment-choisir-poubelle-cuisine", "Comment choisir sa poubelle de cuisine"),
+    ("comment-choisir-poubelle-tri", "Comment choisir une poubelle de tri sélectif"),
+    ("comment-choisir-cache-poubelle", "Comment choisir un cache-poubelle"),
+    ("quelle-taille-poubelle-cuisine", "Quelle taille de poubelle pour la cuisine ?"),
+    ("quelle-taille-poubelle-salle-de-bain", "Quelle taille de poubelle pour la salle de bain ?"),
+    ("comment-recycler-plastique", "Comment recycler le plastique"),
+    ("comment-recycler-verre", "Comment recycler le verre"),
+    ("comment-recycler-papier", "Comment recycler le papier"),
+    ("comment-composter", "Comment composter chez soi"),
+    ("loi-agec-biodechets", "Loi AGEC : biodéchets obligatoires — ce qu'il faut savoir"),
+    ("guide-tri-selectif-maison", "Guide du tri sélectif à la maison"),
+    ("couleurs-bacs-poubelles-france", "Couleurs des bacs poubelles en France"),
+    ("trier-dechets-appartement", "Comment trier ses déchets en appartement"),
+    ("compost-appartement", "Faire son compost en appartement"),
+    ("poubelle-bac-roulant-difference", "Différence entre poubelle et bac roulant"),
+    ("nettoyer-poubelle", "Comment nettoyer sa poubelle"),
+    ("poubelle-anti-odeur-test", "Poubelles anti-odeur : quelles sont les meilleures ?"),
+    ("poubelle-automatique-vaut-il", "Poubelle automatique : ça vaut vraiment le coup ?"),
+    ("matiere-poubelle-guide", "Quel matériau choisir pour sa poubelle ?"),
+    ("entretien-bac-roulant", "Comment entretenir son bac roulant"),
+    ("volume-poubelle-personne", "Quel volume de poubelle selon le nombre de personnes ?"),
+    ("poubelle-cuisine-meilleure-marque", "Quelle est la meilleure marque de poubelle cuisine ?"),
+    ("poubelle-design-pas-cher", "Poubelle design pas chère : les meilleures options"),
+    ("biodechets-obligations-2024", "Biodéchets : obligations 2024 (loi AGEC)"),
+    ("fabriquer-cache-poubelle-diy", "Fabriquer un cache-poubelle soi-même"),
+    ("installer-cache-poubelle", "Comment installer un cache-poubelle extérieur"),
+    ("poubelle-professionnelle-guide", "Choisir sa poubelle professionnelle"),
+    ("poubelle-hopital-normes", "Poubelles hôpital : normes et obligations"),
+    ("poubelle-restaurant-reglementation", "Poubelles restaurant : réglementation"),
+    ("composteur-vs-vermicomposteur", "Composteur vs vermicomposteur : que choisir ?"),
+    ("bac-compost-interieur-exterieur", "Compost intérieur ou extérieur : lequel choisir ?"),
+    ("poubelle-cuisine-encastrable", "Poubelle de cuisine encastrable : guide"),
+    ("poubelle-sous-evier", "Poubelle sous évier : les meilleures"),
+    ("poubelle-mural-cuisine", "Poubelle murale pour cuisine"),
+    ("bac-roulant-120l-240l", "Bac roulant 120L ou 240L : que choisir ?"),
+    ("poubelle-noire-jaune-verte", "Poubelle noire, jaune ou verte : à quoi ça correspond ?"),
+]
+
+# Questions (PAA — People Also Ask)
+QUESTIONS = [
+    ("quelle-poubelle-sdb", "Quelle poubelle pour la salle de bain ?"),
+    ("poubelle-sdb-taille", "Quelle taille de poubelle pour la salle de bain ?"),
+    ("poubelle-cuisine-30l-assez", "30 litres suffisent pour une poubelle cuisine ?"),
+    ("poubelle-automatique-hygienique", "La poubelle automatique est-elle plus hygiénique ?"),
+    ("bambou-poubelle-ecologique", "La poubelle en bambou est-elle vraiment écologique ?"),
+    ("inox-ou-plastique-poubelle", "Poubelle inox ou plastique : laquelle choisir ?"),
+    ("poubelle-pedale-ou-capteur", "Poubelle à pédale ou capteur : quelle différence ?"),
+    ("comment-eviter-mauvaises-odeurs", "Comment éviter les mauvaises odeurs de poubelle ?"),
+    ("poubelle-tri-cuisine-pratique", "Comment organiser le tri sélectif dans la cuisine ?"),
+    ("quelle-couleur-bac-recyclage", "Quelle couleur pour le bac de recyclage ?"),
+    ("poubelle-compost-odeur", "La poubelle à compost sent-elle mauvais ?"),
+    ("sac-poubelle-30l-dimensions", "Dimensions d'un sac poubelle 30L ?"),
+    ("cache-poubelle-exterieur-diy", "Comment faire un cache-poubelle extérieur soi-même ?"),
+    ("quelle-poubelle-van", "Quelle poubelle pour un van ?"),
+    ("poubelle-bureau-quelle-taille", "Quelle taille de poubelle pour le bureau ?"),
+    ("bac-jaune-quoi-dedans", "Que met-on dans le bac jaune ?"),
+    ("poubelle-noire-que-mettre", "Que mettre dans la poubelle noire ?"),
+    ("verre-poubelle-verte", "Le verre va-t-il dans la poubelle verte ?"),
+    ("poubelle-camping-car-quelle", "Quelle poubelle pour camping-car ?"),
+    ("poubelle-hopital-couleur", "Quelles sont les couleurs des poubelles à l'hôpital ?"),
+]
+
+SAISONNIER = [
+    ("poubelle-noel-promo", "Promo poubelle Noël"),
+    ("poubelle-soldes", "Poubelle : les meilleures offres des soldes"),
+    ("poubelle-black-friday", "Poubelle Black Friday"),
+    ("poubelle-saint-valentin", "Poubelle Saint-Valentin"),
+    ("poubelle-demenagement", "Quelle poubelle choisir pour un déménagement"),
+    ("poubelle-cuisine-renovation", "Quelle poubelle pour une cuisine rénovée"),
+    ("poubelle-jardin-ete", "Poubelle jardin été : les meilleures options"),
+    ("poubelle-pas-chere-budget", "Poubelle pas chère : les meilleures options budget"),
+    ("poubelle-haut-de-gamme", "Poubelles haut de gamme : les meilleures"),
+]
+
+# Variantes BE/CH (si expansion)
+INTERNATIONAL = [
+    ("poubelle-belgique", "Poubelle Belgique : guide complet"),
+    ("poubelle-suisse", "Poubelle Suisse : guide complet"),
+    ("sac-poubelle-officiel-belgique", "Sac poubelle officiel Belgique"),
+    ("taxe-dechets-suisse", "Taxe déchets en Suisse : ce qu'il faut savoir"),
+]
+
+# ─── Dimensions ───────────────────────────────────────────────────────────────
+
+USAGE        = Dimension("usage", USAGES)
+FONCTION     = Dimension("fonction", FONCTIONS)
+MATERIAU     = Dimension("materiau", MATERIAUX)
+COULEUR      = Dimension("couleur", COULEURS)
+VOLUME       = Dimension("volume", VOLUMES)
+MECANISME    = Dimension("mecanisme", MECANISMES)
+COMPARTIMENT = Dimension("compartiments", COMPARTIMENTS)
+STYLE        = Dimension("style", STYLES)
+CARAC        = Dimension("caracteristique", CARACTERISTIQUES)
+MARQUE       = Dimension("marque", MARQUES)
+CP_MATERIAU  = Dimension("materiau", CACHE_POUBELLE_MATERIAUX)
+CP_NBACS     = Dimension("nbacs", CACHE_POUBELLE_NBACS)
+CP_USAGE     = Dimension("usage", CACHE_POUBELLE_USAGES)
+ACCESSOIRE   = Dimension("accessoire", ACCESSOIRES)
+SAC_VOLUME   = Dimension("volume", {v: v.upper() for v in SAC_VOLUMES})
+VILLE        = Dimension("ville", {v: v.replace("-", " ").title() for v in VILLES})
+
+# ─── Règles ───────────────────────────────────────────────────────────────────
+# L'ordre des règles fixe l'ordre d'insertion : en cas de collision de slug,
+# la première règle gagne (add_page).
+
+RULES = [
+    Rule("type-usage", "type-usage", [USAGE], [
+        Page("poubelle-{usage}", "Poubelle {usage.label}", "high"),
+        Page("corbeille-{usage}", "Corbeille {usage.label}", "medium"),
+    ], label="Type × Usage"),
+
+    Rule("volume", "volume", [VOLUME], [
+        Page("poubelle-{volume}", "Poubelle {volume.label}", "high"),
+        Page("bac-{volume}", "Bac {volume.label}", "low"),
+    ], label="Volumes"),
+
+    Rule("volume-usage", "volume-usage", [VOLUME, USAGE], [
+        Page("poubelle-{volume}-{usage}", "Poubelle {volume.label} {usage.label}", "high"),
+    ], label="Volume × Usage"),
+
+    Rule("volume-mecanisme", "volume-mecanisme", [VOLUME, MECANISME], [
+        Page("poubelle-{volume}-{mecanisme}", "Poubelle {volume.label} {mecanisme.label}", "medium"),
+    ], label="Volume × Mécanisme"),
+
+    Rule("couleur", "couleur", [COULEUR], [
+        Page("poubelle-{couleur}", "Poubelle {couleur.label}", "medium"),
+        Page("corbeille-{couleur}", "Corbeille {couleur.label}", "low"),
+    ], label="Couleurs"),
+
+    Rule("couleur-usage", "couleur-usage", [COULEUR, USAGE], [
+        Page("poubelle-{couleur}-{usage}", "Poubelle {couleur.label} {usage.label}", "low"),
+    ], label="Couleur × Usage"),
+
+    Rule("couleur-volume", "couleur-volume", [COULEUR, VOLUME], [
+        Page("poubelle-{couleur}-{volume}", "Poubelle {couleur.label} {volume.label}", "low"),
+    ], label="Couleur × Volume"),
+
+    Rule("materiau", "materiau", [MATERIAU], [
+        Page("poubelle-{materiau}", "Poubelle {materiau.label}", "medium"),
+        Page("corbeille-{materiau}", "Corbeille {materiau.label}", "low"),
+    ], label="Matériaux"),
+
+    Rule("materiau-usage", "materiau-usage", [MATERIAU, USAGE], [
+        Page("poubelle-{materiau}-{usage}", "Poubelle {materiau.label} {usage.label}", "medium"),
+    ], label="Matériau × Usage"),
+
+    Rule("materiau-volume", "materiau-volume", [MATERIAU, VOLUME], [
+        Page("poubelle-{materiau}-{volume}", "Poubelle {materiau.label} {volume.label}", "low"),
+    ], label="Matériau × Volume"),
+
+    Rule("materiau-couleur", "materiau-couleur", [MATERIAU, COULEUR], [
+        Page("poubelle-{materiau}-{couleur}", "Poubelle {materiau.label} {couleur.label}", "low"),
+    ], label="Matériau × Couleur"),
+
+    Rule("mecanisme", "mecanisme", [MECANISME], [
+        Page("poubelle-{mecanisme}", "Poubelle {mecanisme.label}", "high"),
+    ], label="Mécanismes"),
+
+    Rule("mecanisme-usage", "mecanisme-usage", [MECANISME, USAGE], [
+        Page("poubelle-{mecanisme}-{usage}", "Poubelle {mecanisme.label} {usage.label}", "medium"),
+    ], label="Mécanisme × Usage"),
+
+    Rule("tri-compartiments", "tri-compartiments", [COMPARTIMENT], [
+        Page("poubelle-tri-{compartiments}", "Poubelle de tri sélectif {compartiments.label}", "high"),
+    ], children=[
+        Rule("tri-compartiments-usage", "tri-compartiments-usage",
+             [USAGE.subset(["cuisine", "bureau", "garage", "exterieur", "collectivites"])], [
+            Page("poubelle-tri-{compartiments}-{usage}",
+                 "Poubelle tri sélectif {compartiments.label} {usage.label}", "high"),
+        ]),
+    ], label="Tri sélectif × Compartiments"),
+
+    Rule("fonction", "fonction", [FONCTION], [
+        Page("poubelle-{fonction}", "Poubelle {fonction.label}", "high"),
+    ], children=[
+        Rule("fonction-usage", "fonction-usage", [USAGE], [
+            Page("poubelle-{fonction}-{usage}", "Poubelle {fonction.label} {usage.label}", "medium"),
+        ]),
+        Rule("fonction-volume", "fonction-volume", [VOLUME], [
+            Page("poubelle-{fonction}-{volume}", "Poubelle {fonction.label} {volume.label}", "medium"),
+        ]),
+    ], label="Fonctions × Usage"),
+
+    Rule("style", "style", [STYLE], [
+        Page("poubelle-{style}", "Poubelle {style.label}", "medium"),
+    ], children=[
+        Rule("style-usage", "style-usage", [USAGE], [
+            Page("poubelle-{style}-{usage}", "Poubelle {style.label} {usage.label}", "low"),
+        ]),
+        Rule("style-materiau", "style-materiau", [MATERIAU], [
+            Page("poubelle-{style}-{materiau}", "Poubelle {style.label} {materiau.label}", "low"),
+        ]),
+    ], label="Styles"),
+
+    Rule("caracteristique", "caracteristique", [CARAC], [
+        Page("poubelle-{caracteristique}", "Poubelle {caracteristique.label}", "medium"),
+    ], children=[
+        Rule("caracteristique-usage", "caracteristique-usage", [USAGE], [
+            Page("poubelle-{caracteristique}-{usage}", "Poubelle {caracteristique.label} {usage.label}", "low"),
+        ]),
+    ], label="Caractéristiques"),
+
+    Rule("marque", "marque", [MARQUE], [
+        Page("poubelle-{marque}", "Poubelle {marque.label}", "medium"),
+        Page("avis-{marque}", "Avis {marque.label} — guide complet", "medium", category="marque-avis"),
+    ], children=[
+        Rule("marque-usage", "marque-usage",
+             [USAGE.subset(["cuisine", "bureau", "salle-de-bain", "exterieur"])], [
+            Page("poubelle-{marque}-{usage}", "Poubelle {marque.label} {usage.label}", "medium"),
+        ]),
+    ], label="Marques"),
+
+    # Cache-poubelle (sous-niche prioritaire)
+    static("cache-poubelle", "cache-poubelle", [
+        ("cache-poubelle", "Cache-poubelle"),
+        ("cache-poubelle-exterieur", "Cache-poubelle extérieur"),
+        ("cache-poubelle-jardin", "Cache-poubelle jardin"),
+        ("abri-poubelle", "Abri poubelle"),
+        ("abri-bac-roulant", "Abri bac roulant"),
+    ], "top", label="Cache-poubelle"),
+
+    Rule("cache-poubelle-materiau", "cache-poubelle-materiau", [CP_MATERIAU], [
+        Page("cache-poubelle-{materiau}", "Cache-poubelle {materiau.label}", "high"),
+        Page("cache-poubelle-exterieur-{materiau}", "Cache-poubelle extérieur {materiau.label}", "high"),
+        Page("abri-poubelle-{materiau}", "Abri poubelle {materiau}", "high"),
+    ], label="Cache-poubelle × Matériau"),
+
+    Rule("cache-poubelle-nbacs", "cache-poubelle-nbacs", [CP_NBACS], [
+        Page("cache-poubelle-{nbacs}", "Cache-poubelle {nbacs.label}", "high"),
+        Page("cache-poubelle-exterieur-{nbacs}", "Cache-poubelle extérieur {nbacs.label}", "high"),
+        Page("abri-poubelle-{nbacs}", "Abri poubelle {nbacs.label}", "high"),
+    ], children=[
+        Rule("cache-poubelle-materiau-nbacs", "cache-poubelle-materiau-nbacs", [CP_MATERIAU], [
+            Page("cache-poubelle-{materiau}-{nbacs}", "Cache-poubelle {materiau.label} {nbacs.label}", "high"),
+            Page("abri-poubelle-{materiau}-{nbacs}", "Abri poubelle {materiau.label} {nbacs.label}", "medium"),
+        ]),
+    ], label="Cache-poubelle × Nb bacs"),
+
+    Rule("cache-poubelle-usage-materiau", "cache-poubelle-usage-materiau", [CP_USAGE, CP_MATERIAU], [
+        Page("cache-poubelle-{usage}-{materiau}", "Cache-poubelle {usage.label} {materiau.label}", "medium"),
+    ], label="Cache-poubelle × Usage"),
+
+    Rule("accessoire", "accessoire", [ACCESSOIRE], [
+        Page("{accessoire}", "{accessoire.cap}", "medium"),
+    ], label="Accessoires"),
+
+    Rule("sac-volume", "sac-volume", [SAC_VOLUME], [
+        Page("sac-poubelle-{volume}", "Sac poubelle {volume.label}", "medium"),
+        Page("sac-compostable-{volume}", "Sac compostable {volume.label}", "medium"),
+        Page("sac-biodegradable-{volume}", "Sac biodégradable {volume.label}", "low"),
+    ], label="Sacs × Volume"),
+
+    # Comparatifs
+    static("comparatif", "comparatif", COMPARATIFS, "high", label="Comparatifs"),
+    Rule("comparatif-usage", "comparatif", [USAGE], [
+        Page("comparatif-poubelle-{usage}", "Comparatif poubelles {usage.label}", "high"),
+    ]),
+    Rule("comparatif-volume", "comparatif", [VOLUME.subset(["10l", "20l", "30l", "50l", "80l", "120l"])], [
+        Page("comparatif-poubelle-{volume}", "Comparatif poubelles {volume.label}", "high"),
+    ]),
+    Rule("comparatif-marque", "comparatif", [MARQUE], [
+        Page("meilleure-poubelle-{marque}", "Meilleure poubelle {marque.label}", "high"),
+    ]),
+
+    # Guides informationnels
+    static("guide", "guide", GUIDES, "high", label="Guides informationnels"),
+    Rule("guide-usage", "guide", [USAGE], [
+        Page("guide-poubelle-{usage}", "Guide poubelle {usage.label}", "high"),
+    ]),
+    Rule("guide-fonction", "guide", [FONCTION], [
+        Page("guide-{fonction}", "Guide {fonction.label}", "high"),
+    ]),
+
+    static("question-paa", "question-paa", QUESTIONS, "medium", label="Questions PAA"),
+
+    Rule("local", "local", [VILLE], [
+        Page("collecte-dechets-{ville}", "Collecte des déchets à {ville.label}", "low"),
+        Page("jours-collecte-{ville}", "Jours de collecte des ordures à {ville.label}", "low"),
+        Page("bac-roulant-{ville}", "Commander un bac roulant à {ville.label}", "low"),
+    ], label="Pages locales"),
+
+    static("saisonnalite", "saisonnalite", SAISONNIER, "low", label="Saisonnalité"),
+    static("international", "international", INTERNATIONAL, "low", label="Variantes BE/CH"),
+]
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Logs structurés et métriques du pipeline.
+
+Logger : un événement = une ligne JSON ({"ts", "msg", "phase", champs…})
+dans progress.jsonl. Les lignes sont gardées en mémoire et écrites par
+paquets (toutes les `flush_every` lignes ou `flush_interval` secondes, et à
+la sortie du process) : plus d'ouverture de fichier par message. La console
+garde le format lisible « [HH:MM:SS] message ».
+
+Metrics : compteurs, jauges et histogrammes étiquetés, écrits en fin de
+run (et périodiquement par le démon) sous deux formes :
+
+  metrics-<job>.prom   format texte Prometheus (textfile collector de
+                       node_exporter), écrit atomiquement
+  metrics-<job>.json   résumé lisible : durées de phase, pages par règle,
+                       latences (p50/p95/p99), erreurs par type, quota, cache
+"""
+
+import sys
+import json
+import time
+import atexit
+import threading
+from bisect import bisect_left
+from datetime import datetime
+
+# Latences Haloscan (secondes)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PREFIX = "poubelles_"
+
+
+# ─── Logs ─────────────────────────────────────────────────────────────────────
+
+class Logger:
+    """Log JSON lines bufferisé ; `context` est ajouté à chaque ligne."""
+
+    def __init__(self, path, flush_every=200, flush_interval=2.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.context = {}
+        self.buffer = []
+        self.flushed_at = time.monotonic()
+        self.lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def log(self, msg, **fields):
+        now = datetime.now()
+        print(f"[{now.strftime('%H:%M:%S')}] {msg}", flush=True)
+        record = {"ts": now.isoformat(timespec="milliseconds"), "msg": msg.strip(), **self.context, **fields}
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self.lock:
+            self.buffer.append(line)
+            due = (len(self.buffer) >= self.flush_every
+                   or time.monotonic() - self.flushed_at >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            lines, self.buffer = self.buffer, []
+            self.flushed_at = time.monotonic()
+            if lines:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+
+# ─── Métriques ────────────────────────────────────────────────────────────────
+
+class Histogram:
+    """Histogramme à seaux cumulés, à la Prometheus."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # dernier seau : +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Borne haute du seau qui contient le quantile q (None si vide)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}" if items else ""
+
+def _quantile(histogram, q):
+    value = histogram.quantile(q)
+    return "+Inf" if value == float("inf") else value
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """Registre de métriques : name → {labels → valeur | Histogram}."""
+
+    def __init__(self, job):
+        self.job = job
+        self.kinds = {}      # name → (type Prometheus, aide)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def _series(self, name, kind, help):
+        if name not in self.kinds:
+            self.kinds[name] = (kind, help)
+            self.values[name] = {}
+        return self.values[name]
+
+    def inc(self, name, value=1, help="", **labels):
+        with self.lock:
+            series = self._series(name, "counter", help)
+            key = _labels(labels)
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name, value, help="", **labels):
+        with self.lock:
+            self._series(name, "gauge", help)[_labels(labels)] = value
+
+    def observe(self, name, value, help="", buckets=LATENCY_BUCKETS, **labels):
+        with self.lock:
+            series = self._series(name, "histogram", help)
+            key = _labels(labels)
+            if key not in series:
+                series[key] = Histogram(buckets)
+            series[key].observe(value)
+
+    def get(self, name, **labels):
+        return self.values.get(name, {}).get(_labels(labels))
+
+    # ── Export ───────────────────────────────────────────────────────────────
+
+    def prometheus(self):
+        """Texte au format d'exposition Prometheus ; chaque série porte task=<job>
+        (le label job est celui de la cible qui scrape node_exporter)."""
+        job = (("task", self.job),)
+        out = []
+        with self.lock:
+            for name, (kind, help) in sorted(self.kinds.items()):
+                full = PREFIX + name
+                if help:
+                    out.append(f"# HELP {full} {help}")
+                out.append(f"# TYPE {full} {kind}")
+                for key, value in sorted(self.values[name].items()):
+                    if kind != "histogram":
+                        out.append(f"{full}{_format_labels(key, job)} {_number(value)}")
+                        continue
+                    seen = 0
+                    for bound, n in zip(value.buckets + (float("inf"),), value.counts):
+                        seen += n
+                        out.append(f"{full}_bucket{_format_labels(key, job + (('le', _number(bound)),))} {seen}")
+                    out.append(f"{full}_sum{_format_labels(key, job)} {_number(value.sum)}")
+                    out.append(f"{full}_count{_format_labels(key, job)} {value.count}")
+        return "\n".join(out) + "\n"
+
+    def summary(self):
+        """Résumé JSON-sérialisable ; les histogrammes donnent count, moyenne et quantiles."""
+        out = {"job": self.job, "written_at": datetime.now().isoformat(timespec="seconds")}
+        with self.lock:
+            for name, (kind, _) in sorted(self.kinds.items()):
+                entries = {}
+                for key, value in sorted(self.values[name].items()):
+                    if kind == "histogram":
+                        value = {"count": value.count,
+                                 "mean": round(value.sum / value.count, 4) if value.count else None,
+                                 **{f"p{int(q * 100)}": _quantile(value, q) for q in (0.5, 0.95, 0.99)}}
+                    if not key:
+                        entries = value    # série sans étiquette : la valeur seule
+                        break
+                    entries[",".join(f"{k}={v}" for k, v in key)] = value
+                out[name] = entries
+        return out
+
+    def write(self, directory):
+        """metrics-<job>.prom et metrics-<job>.json, chacun écrit puis renommé."""
+        directory.mkdir(parents=True, exist_ok=True)
+        for suffix, text in ((".prom", self.prometheus()),
+                             (".json", json.dumps(self.summary(), ensure_ascii=False, indent=2, default=str))):
+            path = directory / f"metrics-{self.job}{suffix}"
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_text(text, encoding="utf-8")
+            tmp.replace(path)
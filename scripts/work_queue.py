@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+File de travail persistante (SQLite) du démon d'enrichissement Haloscan.
+
+Une ligne par keyword à interroger, avec les slugs qui l'attendent et son
+score (valeur attendue, cf. scoring). Cycle de vie :
+
+  pending ──lease──▶ leased ──complete──▶ done
+     ▲                  │
+     └──fail (backoff)──┤
+                        └──fail × max_attempts──▶ dead (dead-letter)
+
+Un lease appartient à un propriétaire et expire après `lease_ttl` : un
+process mort ne bloque pas ses items au-delà. Le quota quotidien compte les
+keywords réellement envoyés à Haloscan (table quota, une ligne par jour).
+"""
+
+import json
+import time
+import sqlite3
+import threading
+from datetime import date
+
+from keyword_cache import normalize_keyword
+
+PENDING, LEASED, DONE, DEAD = "pending", "leased", "done", "dead"
+
+
+def read_counts(path):
+    """État → nb d'items, en lecture seule (sans rien créer ni verrouiller) ;
+    None si la file n'existe pas."""
+    if not path.exists():
+        return None
+    db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return dict(db.execute("SELECT state, COUNT(*) FROM items GROUP BY state").fetchall())
+    except sqlite3.Error:
+        return None
+    finally:
+        db.close()
+
+
+class QueueItem:
+    __slots__ = ("keyword", "title", "slugs", "attempts")
+
+    def __init__(self, keyword, title, slugs, attempts):
+        self.keyword = keyword
+        self.title = title
+        self.slugs = slugs
+        self.attempts = attempts
+
+
+class WorkQueue:
+    """File keyword → slugs avec leases, retries bornés et dead-letter."""
+
+    def __init__(self, path, lease_ttl=600, max_attempts=5, backoff=60, backoff_cap=6 * 3600):
+        self.lease_ttl = lease_ttl
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_cap = backoff_cap
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA busy_timeout=30000")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS items (
+                keyword     TEXT PRIMARY KEY,
+                title       TEXT NOT NULL,
+                slugs       TEXT NOT NULL,
+                score       REAL NOT NULL DEFAULT 0,
+                state       TEXT NOT NULL DEFAULT 'pending',
+                attempts    INTEGER NOT NULL DEFAULT 0,
+                not_before  REAL NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_until REAL,
+                last_error  TEXT,
+                updated_at  REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS items_ready ON items (state, score DESC);
+            CREATE TABLE IF NOT EXISTS quota (
+                day  TEXT PRIMARY KEY,
+                used INTEGER NOT NULL
+            );""")
+
+    def _write(self, fn):
+        """Transaction d'écriture exclusive (BEGIN IMMEDIATE) : deux process ne
+        peuvent pas prendre le même item."""
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self.db)
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+            return result
+
+    # ── Alimentation ─────────────────────────────────────────────────────────
+
+    def enqueue(self, entries, now=None):
+        """Ajoute ou met à jour des items (title, slugs, score). Les items pending
+        prennent le nouveau score et les nouveaux slugs ; done/dead/leased sont
+        laissés tels quels. Renvoie le nombre d'items ajoutés."""
+        now = time.time() if now is None else now
+
+        def run(db):
+            added = 0
+            for title, slugs, score in entries:
+                key = normalize_keyword(title)
+                cur = db.execute(
+                    "INSERT OR IGNORE INTO items (keyword, title, slugs, score, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)", (key, title, json.dumps(slugs), score, now))
+                if cur.rowcount:
+                    added += 1
+                else:
+                    db.execute("UPDATE items SET slugs = ?, score = ? WHERE keyword = ? AND state = ?",
+                               (json.dumps(slugs), score, key, PENDING))
+            return added
+        return self._write(run)
+
+    # ── Leases ───────────────────────────────────────────────────────────────
+
+    def lease(self, owner, n, now=None):
+        """Prend jusqu'à `n` items prêts (pending hors backoff, ou lease expiré),
+        par score décroissant."""
+        now = time.time() if now is None else now
+        if n <= 0:
+            return []
+
+        def run(db):
+            rows = db.execute(
+                "SELECT keyword, title, slugs, attempts FROM items "
+                "WHERE (state = ? AND not_before <= ?) OR (state = ? AND lease_until <= ?) "
+                "ORDER BY score DESC, keyword LIMIT ?",
+                (PENDING, now, LEASED, now, n)).fetchall()
+            db.executemany(
+                "UPDATE items SET state = ?, lease_owner = ?, lease_until = ?, updated_at = ? WHERE keyword = ?",
+                [(LEASED, owner, now + self.lease_ttl, now, r[0]) for r in rows])
+            return [QueueItem(k, t, json.loads(s), a) for k, t, s, a in rows]
+        return self._write(run)
+
+    def _finish(self, keyword, owner, sets, params):
+        def run(db):
+            return db.execute(
+                f"UPDATE items SET {sets}, lease_owner = NULL, lease_until = NULL "
+                "WHERE keyword = ? AND state = ? AND lease_owner = ?",
+                (*params, keyword, LEASED, owner)).rowcount == 1
+        return self._write(run)
+
+    def complete(self, item, owner, now=None):
+        """Item traité. False si le lease avait été perdu (expiré et repris)."""
+        now = time.time() if now is None else now
+        return self._finish(item.keyword, owner, "state = ?, last_error = NULL, updated_at = ?", (DONE, now))
+
+    def fail(self, item, owner, error, now=None):
+        """Échec : nouvel essai après backoff exponentiel, ou dead-letter après
+        `max_attempts`. Renvoie le nouvel état."""
+        now = time.time() if now is None else now
+        attempts = item.attempts + 1
+        if attempts >= self.max_attempts:
+            state, not_before = DEAD, 0
+        else:
+            state, not_before = PENDING, now + min(self.backoff_cap, self.backoff * 2 ** (attempts - 1))
+        self._finish(item.keyword, owner,
+                     "state = ?, attempts = ?, not_before = ?, last_error = ?, updated_at = ?",
+                     (state, attempts, not_before, str(error), now))
+        return state
+
+    def release(self, owner=None):
+        """Rend les items leasés (d'un propriétaire, ou tous) sans compter d'essai."""
+        def run(db):
+            if owner is None:
+                return db.execute("UPDATE items SET state = ?, lease_owner = NULL, lease_until = NULL "
+                                  "WHERE state = ?", (PENDING, LEASED)).rowcount
+            return db.execute("UPDATE items SET state = ?, lease_owner = NULL, lease_until = NULL "
+                              "WHERE state = ? AND lease_owner = ?", (PENDING, LEASED, owner)).rowcount
+        return self._write(run)
+
+    def retry_dead(self):
+        """Remet les items dead-letter en file, compteur d'essais à zéro."""
+        return self._write(lambda db: db.execute(
+            "UPDATE items SET state = ?, attempts = 0, not_before = 0 WHERE state = ?",
+            (PENDING, DEAD)).rowcount)
+
+    # ── Quota ────────────────────────────────────────────────────────────────
+
+    def spend(self, n, day=None):
+        day = day or date.today().isoformat()
+        self._write(lambda db: db.execute(
+            "INSERT INTO quota VALUES (?, ?) ON CONFLICT(day) DO UPDATE SET used = used + excluded.used",
+            (day, n)))
+
+    def quota_used(self, day=None):
+        day = day or date.today().isoformat()
+        with self.lock:
+            row = self.db.execute("SELECT used FROM quota WHERE day = ?", (day,)).fetchone()
+        return row[0] if row else 0
+
+    # ── État ─────────────────────────────────────────────────────────────────
+
+    def counts(self):
+        with self.lock:
+            return dict(self.db.execute("SELECT state, COUNT(*) FROM items GROUP BY state").fetchall())
+
+    def next_ready_at(self):
+        """Date du prochain item en backoff, ou None."""
+        with self.lock:
+            row = self.db.execute("SELECT MIN(not_before) FROM items WHERE state = ?", (PENDING,)).fetchone()
+        return row[0]
+
+    def dead_letters(self, limit=20):
+        with self.lock:
+            return self.db.execute(
+                "SELECT title, attempts, last_error FROM items WHERE state = ? "
+                "ORDER BY updated_at DESC LIMIT ?", (DEAD, limit)).fetchall()
+
+    def summary(self):
+        c = self.counts()
+        return (f"{c.get(PENDING, 0)} en attente, {c.get(LEASED, 0)} en cours, "
+                f"{c.get(DONE, 0)} faits, {c.get(DEAD, 0)} dead-letter")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
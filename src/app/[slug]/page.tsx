@@ -1,6 +1,6 @@
 import { notFound } from 'next/navigation';
 import Link from 'next/link';
-import { getAllSlugs, getPage, getPagesByCategory } from '@/lib/pages';
+import { getAllSlugs, getFragment, getPage, getRelatedPages } from '@/lib/pages';
 import type { Metadata } from 'next';
 
 export function generateStaticParams() {
@@ -11,7 +11,7 @@ type Props = { params: Promise<{ slug: string }> };
 
 export async function generateMetadata({ params }: Props): Promise<Metadata> {
   const { slug } = await params;
-  const page = getPage(slug);
+  const page = getFragment(slug) ?? getPage(slug);
   if (!page) return {};
   return {
     title: page.title,
@@ -24,9 +24,34 @@ export default async function SlugPage({ params }: Props) {
   const page = getPage(slug);
   if (!page) notFound();
 
-  const related = getPagesByCategory(page.category)
-    .filter((p) => p.slug !== slug)
-    .slice(0, 8);
+  const placeholder = (
+    <div className="article-placeholder">
+      <p>
+        Contenu a venir &mdash; cette page sera enrichie avec des comparatifs produits, guides
+        d&apos;achat et liens d&apos;affiliation.
+      </p>
+    </div>
+  );
+
+  // Fragments pré-rendus par le pipeline : le build ne fait que les assembler
+  const fragment = getFragment(slug);
+  if (fragment) {
+    return (
+      <>
+        <nav className="breadcrumb">
+          <Link href="/">Accueil</Link> &rsaquo; <span>{page.category}</span> &rsaquo;{' '}
+          <span>{page.title}</span>
+        </nav>
+        <article>
+          <div dangerouslySetInnerHTML={{ __html: fragment.header }} />
+          {placeholder}
+        </article>
+        {fragment.related && <div dangerouslySetInnerHTML={{ __html: fragment.related }} />}
+      </>
+    );
+  }
+
+  const related = getRelatedPages(slug);
 
   return (
     <>
@@ -51,17 +76,12 @@ export default async function SlugPage({ params }: Props) {
           </div>
         </header>
 
-        <div className="article-placeholder">
-          <p>
-            Contenu a venir &mdash; cette page sera enrichie avec des comparatifs produits, guides
-            d&apos;achat et liens d&apos;affiliation.
-          </p>
-        </div>
+        {placeholder}
       </article>
 
       {related.length > 0 && (
         <section className="related-section">
-          <h2>Dans la meme categorie</h2>
+          <h2>Pages similaires</h2>
           <ul className="page-list">
             {related.map((r) => (
               <li key={r.slug}>
@@ -1,4 +1,11 @@
-import pagesData from '../../data/pages.json';
+import fs from 'fs';
+import path from 'path';
+// Index précalculés par scripts/generate_pages.py (export_indexes)
+import categoryIndex from '../../data/index/categories.json';
+import priorityIndex from '../../data/index/priorities.json';
+import categoryCounts from '../../data/index/category_counts.json';
+import relatedIndex from '../../data/index/related.json';
+import deployManifest from '../../data/index/deploy.json';
 
 export interface PageData {
   slug: string;
@@ -9,53 +16,103 @@ export interface PageData {
   haloscan_volume: number | string | null;
   haloscan_kd: number | string | null;
   haloscan_cpc: number | string | null;
+  facets?: Record<string, string>;
 }
 
-const pages = pagesData as unknown as Record<string, PageData>;
-
-// Limit SSG to top-priority pages for initial deployment
-const DEPLOY_SLUGS: string[] | null = [
-  'cache-poubelle',
-  'cache-poubelle-exterieur',
-  'cache-poubelle-jardin',
-  'abri-poubelle',
-  'poubelle-cuisine',
-  'poubelle-salle-de-bain',
-  'poubelle-bureau',
-  'poubelle-tri-selectif',
-  'poubelle-compost',
-  'composteur-appartement',
-  'poubelle-automatique',
-  'poubelle-50l-cuisine',
-];
+const SHARD_DIR = path.join(process.cwd(), 'data', 'index', 'shards');
+const FRAGMENT_DIR = path.join(process.cwd(), 'data', 'index', 'fragments');
+
+// Fragment HTML pré-rendu par scripts/generate_pages.py (export_fragments)
+export interface PageFragment {
+  slug: string;
+  title: string;
+  description: string;
+  header: string;
+  related: string;
+}
+
+const slugsByCategory = categoryIndex as Record<string, string[]>;
+const slugsByPriority = priorityIndex as Record<string, string[]>;
+const relatedSlugs = relatedIndex as Record<string, string[]>;
+
+// Shards chargés à la demande : une catégorie n'est lue qu'une fois par build
+const shards = new Map<string, Record<string, PageData>>();
+
+function loadShard(category: string): Record<string, PageData> {
+  let shard = shards.get(category);
+  if (!shard) {
+    shard = JSON.parse(
+      fs.readFileSync(path.join(SHARD_DIR, `${category}.json`), 'utf-8'),
+    ) as Record<string, PageData>;
+    shards.set(category, shard);
+  }
+  return shard;
+}
+
+let categoryBySlug: Map<string, string> | null = null;
+
+function categoryOf(slug: string): string | undefined {
+  if (!categoryBySlug) {
+    categoryBySlug = new Map();
+    for (const [category, slugs] of Object.entries(slugsByCategory)) {
+      for (const s of slugs) categoryBySlug.set(s, category);
+    }
+  }
+  return categoryBySlug.get(slug);
+}
+
+// Pages à déployer : manifest écrit par `generate_pages.py --select` (null = tout le corpus)
+const DEPLOY_SLUGS: string[] | null = (deployManifest as { slugs: string[] | null }).slugs;
 
 export function getAllSlugs(): string[] {
-  if (DEPLOY_SLUGS) return DEPLOY_SLUGS.filter((s) => s in pages);
-  return Object.keys(pages);
+  if (DEPLOY_SLUGS) return DEPLOY_SLUGS.filter((s) => categoryOf(s) !== undefined);
+  return Object.values(slugsByCategory).flat();
 }
 
 export function getPage(slug: string): PageData | undefined {
-  return pages[slug];
+  const category = categoryOf(slug);
+  return category ? loadShard(category)[slug] : undefined;
 }
 
 export function getPagesByCategory(category: string): PageData[] {
-  return Object.values(pages).filter((p) => p.category === category);
+  const slugs = slugsByCategory[category];
+  if (!slugs) return [];
+  const shard = loadShard(category);
+  return slugs.map((s) => shard[s]);
+}
+
+// Pages liées par facets partagés, calculées par le générateur (export_related)
+export function getRelatedPages(slug: string): PageData[] {
+  return (relatedSlugs[slug] ?? [])
+    .map((s) => getPage(s))
+    .filter((p): p is PageData => p !== undefined);
 }
 
 export function getPagesByPriority(priority: PageData['priority']): PageData[] {
-  return Object.values(pages).filter((p) => p.priority === priority);
+  return (slugsByPriority[priority] ?? []).map((s) => getPage(s) as PageData);
 }
 
 export function getAllCategories(): { category: string; count: number }[] {
-  const cats: Record<string, number> = {};
-  for (const p of Object.values(pages)) {
-    cats[p.category] = (cats[p.category] || 0) + 1;
-  }
-  return Object.entries(cats)
-    .map(([category, count]) => ({ category, count }))
-    .sort((a, b) => b.count - a.count);
+  return categoryCounts;
 }
 
 export function getAllPages(): PageData[] {
-  return Object.values(pages);
+  return Object.keys(slugsByCategory).flatMap(getPagesByCategory);
+}
+
+let fragmentIndex: Record<string, string> | null | undefined;
+
+// Fragment de la page, ou undefined si le générateur n'en a pas produit
+export function getFragment(slug: string): PageFragment | undefined {
+  if (fragmentIndex === undefined) {
+    const indexPath = path.join(FRAGMENT_DIR, 'index.json');
+    fragmentIndex = fs.existsSync(indexPath)
+      ? (JSON.parse(fs.readFileSync(indexPath, 'utf-8')) as Record<string, string>)
+      : null;
+  }
+  const digest = fragmentIndex?.[slug];
+  if (!digest) return undefined;
+  return JSON.parse(
+    fs.readFileSync(path.join(FRAGMENT_DIR, digest.slice(0, 2), `${digest}.json`), 'utf-8'),
+  ) as PageFragment;
 }
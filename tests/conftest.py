@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Les scripts s'importent entre eux par nom de module (from haloscan_client import …)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
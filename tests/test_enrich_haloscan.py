@@ -0,0 +1,77 @@
+"""enrich_haloscan par lots (endpoint bulk) contre le stub local : keywords
+partagés entre plusieurs slugs, keyword en échec au milieu d'un lot."""
+
+import functools
+from itertools import count
+
+import pytest
+
+from haloscan_client import HaloscanClient
+from haloscan_stub import StubHandler, fake_metrics, serve
+from keyword_cache import ERROR, OK, KeywordCache
+from page_store import PageStore
+
+
+@pytest.fixture(scope="module")
+def pipeline(tmp_path_factory):
+    """generate_pages importé sur un répertoire de sortie jetable (chemins lus à l'import)."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("POUBELLES_OUTPUT_DIR", str(tmp_path_factory.mktemp("poubelles")))
+        import generate_pages
+    return generate_pages
+
+
+def keywords_with_results(n):
+    """n keywords auxquels le stub répond avec des métriques."""
+    found = (f"poubelle lot {i}" for i in count())
+    return [kw for kw, _ in zip((kw for kw in found if fake_metrics(kw)), range(n))]
+
+
+FAILING = "poubelle lot en panne"
+
+
+class FailsOneKeyword(StubHandler):
+    def _bulk(self, keywords):
+        items = []
+        for kw in keywords:
+            if kw == FAILING:
+                items.append({"keyword": kw, "error": "stub: erreur simulée"})
+            else:
+                items.append({"keyword": kw, "results": [fake_metrics(kw)]})
+        self._send(200, {"items": items})
+
+
+@pytest.fixture
+def stub_client(monkeypatch, pipeline):
+    server = serve()
+    server.RequestHandlerClass = FailsOneKeyword
+    host, port = server.server_address
+    monkeypatch.setattr(pipeline, "HaloscanClient", functools.partial(HaloscanClient, f"http://{host}:{port}"))
+    yield
+    server.shutdown()
+
+
+def test_batch_shares_keywords_and_isolates_a_failure(pipeline, stub_client):
+    shared, *others = keywords_with_results(4)
+    pages = PageStore()
+    # Deux slugs, un même keyword normalisé : une seule requête pour les deux
+    pages.append("shared-a", "cache-poubelle", shared, priority="high")
+    pages.append("shared-b", "cache-poubelle", shared.upper().replace(" ", "  "), priority="high")
+    for i, kw in enumerate(others):
+        pages.append(f"other-{i}", "cache-poubelle", kw, priority="high")
+    pages.append("broken", "cache-poubelle", FAILING, priority="high")
+
+    pipeline.enrich_haloscan(pages, limit=50, batch_size=10)
+
+    volume = fake_metrics(shared)["volume"]
+    assert pages["shared-a"]["haloscan_volume"] == pages["shared-b"]["haloscan_volume"] == volume
+    for i, kw in enumerate(others):
+        assert pages[f"other-{i}"]["haloscan_volume"] == fake_metrics(kw)["volume"]
+    assert pages["broken"]["haloscan_volume"] is None
+
+    cache = KeywordCache(pipeline.CACHE_FILE)
+    try:
+        assert cache.get(FAILING).status == ERROR
+        assert all(cache.get(kw).status == OK for kw in [shared, *others])
+    finally:
+        cache.close()
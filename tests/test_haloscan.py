@@ -0,0 +1,87 @@
+"""Client Haloscan (bulk) et types d'erreur, contre le stub local."""
+
+import pytest
+
+from haloscan_client import HaloscanClient, HaloscanError, error_kind
+from haloscan_stub import StubHandler, fake_metrics, serve
+
+
+@pytest.fixture
+def stub():
+    """Démarre le stub (options de serve(), handler éventuel) ; rend un client."""
+    started = []
+
+    def start(handler=None, **options):
+        server = serve(**options)
+        if handler is not None:
+            server.RequestHandlerClass = handler
+        host, port = server.server_address
+        client = HaloscanClient(f"http://{host}:{port}", pool_size=2)
+        started.append((server, client))
+        return client
+
+    yield start
+    for server, client in started:
+        client.close()
+        server.shutdown()
+
+
+KEYWORDS = [f"poubelle test {i}" for i in range(40)]
+
+
+# ─── fetch_many ───────────────────────────────────────────────────────────────
+
+def test_fetch_many_returns_every_keyword(stub):
+    client = stub()
+    out = client.fetch_many(KEYWORDS)
+    assert list(out) == KEYWORDS
+    for kw, data in out.items():
+        top = fake_metrics(kw)
+        assert data == {"results": [top] if top else []}
+
+
+def test_fetch_many_partial_failure_keeps_the_rest_of_the_batch(stub):
+    client = stub(error_rate=0.5)
+    out = client.fetch_many(KEYWORDS)
+    failed = {kw for kw, data in out.items() if isinstance(data, Exception)}
+    assert 0 < len(failed) < len(KEYWORDS)
+    for kw, data in out.items():
+        if kw in failed:
+            assert isinstance(data, HaloscanError) and data.kind == "keyword"
+        else:
+            top = fake_metrics(kw)
+            assert data == {"results": [top] if top else []}
+
+
+class DropsLastKeyword(StubHandler):
+    def _bulk(self, keywords):
+        super()._bulk(keywords[:-1])
+
+
+def test_fetch_many_keyword_missing_from_response(stub):
+    client = stub(DropsLastKeyword)
+    out = client.fetch_many(KEYWORDS[:3])
+    assert isinstance(out[KEYWORDS[2]], HaloscanError)
+    assert out[KEYWORDS[2]].kind == "bulk_missing"
+    assert not isinstance(out[KEYWORDS[0]], Exception)
+
+
+class BulkUnavailable(StubHandler):
+    def _bulk(self, keywords):
+        self._send(503, {"error": "stub: indisponible"})
+
+
+def test_fetch_many_whole_request_failure_raises(stub):
+    client = stub(BulkUnavailable)
+    with pytest.raises(HaloscanError) as exc:
+        client.fetch_many(KEYWORDS[:3])
+    assert exc.value.kind == "http_503"
+
+
+# ─── error_kind ───────────────────────────────────────────────────────────────
+
+def test_error_kind():
+    assert error_kind(HaloscanError("HTTP 429", kind="http_429")) == "http_429"
+    assert error_kind(HaloscanError("?")) == "api"
+    assert error_kind(TimeoutError()) == "TimeoutError"
+    assert error_kind(ConnectionRefusedError()) == "ConnectionRefusedError"
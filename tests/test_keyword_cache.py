@@ -0,0 +1,46 @@
+"""Cache keyword : TTL par statut (OK, EMPTY, ERROR) et purge des expirés."""
+
+import pytest
+
+from haloscan_client import HaloscanError
+from keyword_cache import DAY, EMPTY, ERROR, OK, KeywordCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = KeywordCache(tmp_path / "cache.sqlite", ttl=30 * DAY, negative_ttl=3 * DAY, error_ttl=600)
+    yield c
+    c.close()
+
+
+def test_cache_positive_ttl(cache):
+    cache.put("Poubelle  Cuisine", {"results": [{"volume": 30}]}, now=0)
+    entry = cache.get("poubelle cuisine", now=29 * DAY)
+    assert entry.status == OK and not entry.negative
+    assert cache.get("poubelle cuisine", now=31 * DAY) is None
+
+
+def test_cache_negative_ttl(cache):
+    cache.put("inconnu", {"results": []}, now=0)
+    cache.put("sans volume", {"results": [{"volume": "NA"}]}, now=0)
+    for kw in ("inconnu", "sans volume"):
+        entry = cache.get(kw, now=2 * DAY)
+        assert entry.status == EMPTY and entry.negative
+        assert cache.get(kw, now=3 * DAY + 1) is None
+    assert (cache.hits, cache.negative_hits, cache.misses) == (0, 2, 2)
+
+
+def test_cache_transient_errors_expire_in_minutes(cache):
+    cache.put_error("throttled", HaloscanError("HTTP 429", kind="http_429"), now=0)
+    entry = cache.get("throttled", now=60)
+    assert entry.status == ERROR and entry.response is None
+    assert cache.get("throttled", now=601) is None
+
+
+def test_purge_expired_keeps_live_entries(cache):
+    cache.put("poubelle cuisine", {"results": [{"volume": 30}]}, now=0)
+    cache.put("inconnu", {"results": []}, now=0)
+    cache.put_error("throttled", HaloscanError("HTTP 429", kind="http_429"), now=0)
+    assert cache.purge_expired(now=4 * DAY) == 2
+    assert cache.get("poubelle cuisine", now=4 * DAY).status == OK
+    assert cache.get("inconnu", now=0) is None